@@ -1,6 +1,9 @@
+import re
+
 from django.contrib.auth import authenticate, get_user_model
 from django.contrib.auth.models import AnonymousUser
-from django.test import RequestFactory, TestCase
+from django.core.cache import cache
+from django.test import Client, RequestFactory, TestCase
 
 from accounts import views
 
@@ -13,6 +16,7 @@ class AccountsBaseTestCase(TestCase):
     """
     def setUp(self):
         self.factory = RequestFactory()
+        cache.clear()
 
     @classmethod
     def setUpClass(cls):
@@ -161,3 +165,31 @@ class RegisterViewTestCase(AccountsBaseTestCase):
         with self.assertTemplateUsed('accounts/register.html'):
             response = views.register(request)
             self.assertEqual(response.status_code, 200)
+
+
+class AnonymousPageCacheTestCase(AccountsBaseTestCase):
+    """Tests for the page cache of the auth pages
+
+    Args:
+        AccountsBaseTestCase (object): a subclass of django.test.TestCase
+    """
+    def test_login_page_cached_with_own_csrf_token(self):
+        """Test that a cached login page carries a CSRF token that
+        works for the visitor it is served to
+        """
+        Client().get('/accounts/login/')
+
+        client = Client(enforce_csrf_checks=True)
+        with self.assertNumQueries(0):
+            response = client.get('/accounts/login/')
+        self.assertIsNone(response.context)
+        token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"',
+            response.content.decode()).group(1)
+
+        response = client.post('/accounts/login/', {
+            'csrfmiddlewaretoken': token,
+            'username': 'alvin@mukuna.com',
+            'password': 'alvinpassword',
+        })
+        self.assertRedirects(response, '/books/',
+            fetch_redirect_response=False)
@@ -2,10 +2,14 @@ from django.contrib import messages
 from django.contrib.auth import views as auth_views
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import redirect, render
+from django.utils.decorators import method_decorator
+
+from core.decorators import cache_anonymous_page
 
 from .forms import CustomUserCreationForm, UserProfileForm
 
 
+@method_decorator(cache_anonymous_page(), name='dispatch')
 class LoginView(auth_views.LoginView):
     template_name = 'accounts/login.html'
 
@@ -14,10 +18,12 @@ class LogoutView(auth_views.LogoutView):
     template_name = 'accounts/logout.html'
 
 
+@method_decorator(cache_anonymous_page(), name='dispatch')
 class PasswordResetView(auth_views.PasswordResetView):
     template_name = 'accounts/password_reset.html'
 
 
+@method_decorator(cache_anonymous_page(), name='dispatch')
 class PasswordResetDoneView(auth_views.PasswordResetDoneView):
     template_name = 'accounts/password_reset_done.html'
 
@@ -25,10 +31,12 @@ class PasswordResetDoneView(auth_views.PasswordResetDoneView):
 class PasswordResetConfirmView(auth_views.PasswordResetConfirmView):
     template_name = 'accounts/password_reset_confirm.html'
 
+@method_decorator(cache_anonymous_page(), name='dispatch')
 class PasswordResetCompleteView(auth_views.PasswordResetCompleteView):
     template_name = 'accounts/password_reset_complete.html'
 
 
+@cache_anonymous_page()
 def register(request):
     if request.method == 'POST':
         form = CustomUserCreationForm(request.POST)
@@ -0,0 +1,129 @@
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+
+from core.models import Tag
+
+
+def _category(resource, request):
+    return {'name': resource.category.name, 'slug': resource.category.slug}
+
+
+def _tags(resource, request):
+    return [{'name': tag.name, 'slug': tag.slug}
+        for tag in resource.tags.all()]
+
+
+def _authors(resource, request):
+    return [{'id': author.pk, 'name': author.get_full_name()}
+        for author in resource.authors.all()]
+
+
+def _file_url(name):
+    def get_url(resource, request):
+        file = getattr(resource, name)
+        return request.build_absolute_uri(file.url) if file else None
+    return get_url
+
+
+class ResourceSerializer:
+    """Converts resources into JSON-ready dictionaries
+
+    Each field maps to the function producing its value and to the
+    columns and relations it needs, so that a sparse fieldset only
+    loads what it returns.
+
+    Args:
+        fields (list, optional): Names of the fields to return.
+            Defaults to all of them.
+
+    Raises:
+        ValueError: If an unknown field is requested
+    """
+    fields = {
+        'slug': (lambda r, request: r.slug, ['slug']),
+        'title': (lambda r, request: r.title, ['title']),
+        'summary': (lambda r, request: r.summary, ['summary']),
+        'category': (_category, ['category__name', 'category__slug']),
+        'tags': (_tags, []),
+        'authors': (_authors, []),
+        'date_posted': (lambda r, request: r.date_posted, ['date_posted']),
+        'last_edit': (lambda r, request: r.last_edit, ['last_edit']),
+        'url': (lambda r, request: request.build_absolute_uri(
+            r.get_absolute_url()), ['slug']),
+    }
+
+    def __init__(self, fields=None):
+        if fields:
+            unknown = set(fields) - set(self.fields)
+            if unknown:
+                raise ValueError('Unknown fields: {}'.format(
+                    ', '.join(sorted(unknown))))
+            self.selected = [name for name in self.fields if name in fields]
+        else:
+            self.selected = list(self.fields)
+
+    def get_queryset(self, queryset):
+        """Restricts a queryset to the columns the selected fields use"""
+        columns = ['date_posted']
+        for name in self.selected:
+            columns += self.fields[name][1]
+        if 'category' in self.selected:
+            queryset = queryset.select_related('category')
+        if 'tags' in self.selected:
+            queryset = queryset.prefetch_related(
+                Prefetch('tags', queryset=Tag.objects.only('name', 'slug')))
+        if 'authors' in self.selected:
+            queryset = queryset.prefetch_related(
+                Prefetch('authors', queryset=get_user_model().objects.only(
+                    'first_name', 'last_name')))
+        return queryset.only(*columns)
+
+    def to_dict(self, resource, request):
+        return {name: self.fields[name][0](resource, request)
+            for name in self.selected}
+
+
+def _download_url(book, request):
+    # files are served through the download view, which requires a
+    # login and counts downloads, rather than from storage directly
+    if not book.file_upload:
+        return None
+    return request.build_absolute_uri(book.get_download_url())
+
+
+class BookSerializer(ResourceSerializer):
+    fields = dict(ResourceSerializer.fields, **{
+        'cover_image': (_file_url('cover_image'), ['cover_image']),
+        'file': (_download_url, ['slug', 'file_upload']),
+        'file_size': (lambda r, request: r.file_size, ['file_size']),
+        'content_type': (lambda r, request: r.content_type,
+            ['content_type']),
+    })
+
+
+class VideoSerializer(ResourceSerializer):
+    fields = dict(ResourceSerializer.fields, **{
+        'video_url': (lambda r, request: r.url, ['url']),
+        'thumbnail_url': (lambda r, request: r.thumbnail_url,
+            ['thumbnail_url']),
+        'embed_url': (lambda r, request: r.embed_url, ['embed_url']),
+    })
+
+
+def stream_json(objects):
+    """Encodes a list of results incrementally
+
+    Args:
+        objects (iterable): JSON-ready dictionaries
+
+    Yields:
+        str: Pieces of a ``{"results": [...]}`` JSON document
+    """
+    encoder = DjangoJSONEncoder()
+    yield '{"results": ['
+    separator = ''
+    for obj in objects:
+        yield separator + encoder.encode(obj)
+        separator = ', '
+    yield ']}'
@@ -0,0 +1,41 @@
+from django.test import SimpleTestCase
+from django.urls import resolve, reverse
+
+
+class APIURLsTestCase(SimpleTestCase):
+    """
+    Test URL configuration of the API
+    """
+    def test_book_urls(self):
+        """
+        Test that the book API URLs resolve to the correct views
+        """
+        self.assertEqual(resolve(reverse('api_books')).func.__name__,
+            'BookListAPIView')
+        self.assertEqual(resolve(reverse('api_book',
+            kwargs={'slug': 'the-hydroponics-handbook'})).func.__name__,
+            'BookDetailAPIView')
+
+    def test_video_urls(self):
+        """
+        Test that the video API URLs resolve to the correct views
+        """
+        self.assertEqual(resolve(reverse('api_videos')).func.__name__,
+            'VideoListAPIView')
+        self.assertEqual(resolve(reverse('api_video',
+            kwargs={'slug': 'the-gift'})).func.__name__,
+            'VideoDetailAPIView')
+
+    def test_suggest_url(self):
+        """
+        Test that the suggestion API URL resolves to the correct view
+        """
+        self.assertEqual(resolve(reverse('api_suggest')).func.__name__,
+            'SuggestAPIView')
+
+    def test_latest_url(self):
+        """
+        Test that the latest API URL resolves to the correct view
+        """
+        self.assertEqual(resolve(reverse('api_latest')).func.__name__,
+            'LatestAPIView')
@@ -0,0 +1,253 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from books.models import Book
+from core.models import Category, Tag
+from videos.models import Video
+
+
+class APIViewsTestCase(TestCase):
+    """
+    Sets up data to be shared across tests for api.views
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        cls.kelvin = cls.User.objects.create_superuser(
+            first_name = 'Kelvin',
+            last_name = 'Murage',
+            email='kelvin@murage.com',
+            password='kelvinpassword'
+        )
+        cls.christine = cls.User.objects.create_user(
+            first_name = 'Christine',
+            last_name = 'Kyalo',
+            email = 'christine@kyalo.com',
+            phone_number = '+254 723 456 789',
+            password = 'christinepassword'
+        )
+        cls.spiritual = Category.objects.create(
+            name='Spiritual',
+            slug='spiritual'
+        )
+        cls.faith = Tag.objects.create(
+            name='Faith',
+            slug='faith'
+        )
+        for i in range(5):
+            book = Book.objects.create(
+                title='Prayer Devotion {}'.format(i),
+                category=cls.spiritual,
+                slug='prayer-devotion-{}'.format(i),
+                file_upload='prayer-devotion-{}.pdf'.format(i)
+            )
+            book.authors.add(cls.kelvin)
+            book.tags.add(cls.faith)
+        cls.the_gift = Video.objects.create(
+            title='The Gift',
+            category=cls.spiritual,
+            slug='the-gift',
+            url='https://youtu.be/rAKLiE658m0'
+        )
+
+    def login(self, email='christine@kyalo.com',
+        password='christinepassword'):
+        self.client.login(email=email, password=password)
+
+
+class ResourceListAPIViewTestCase(APIViewsTestCase):
+    """
+    Tests for the resource list API views
+    """
+    def test_requires_authentication(self):
+        """
+        Test that anonymous requests get a 401 JSON error
+        """
+        response = self.client.get('/api/books/')
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('detail', response.json())
+
+    def test_book_list(self):
+        """
+        Test that books are listed newest first with their
+        related objects
+        """
+        self.login()
+        response = self.client.get('/api/books/')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([book['slug'] for book in data['results']],
+            ['prayer-devotion-{}'.format(i) for i in range(4, -1, -1)])
+        book = data['results'][0]
+        self.assertEqual(book['category'],
+            {'name': 'Spiritual', 'slug': 'spiritual'})
+        self.assertEqual(book['tags'], [{'name': 'Faith', 'slug': 'faith'}])
+        self.assertEqual(book['authors'],
+            [{'id': self.kelvin.pk, 'name': 'Kelvin Murage'}])
+        self.assertTrue(book['url'].endswith('/books/prayer-devotion-4/'))
+        self.assertIsNone(data['next'])
+
+    def test_book_file_served_by_download_view(self):
+        """
+        Test that book files link to the download view rather than to
+        storage, so that downloads are counted
+        """
+        self.login()
+        response = self.client.get('/api/books/?fields=file')
+        self.assertEqual(response.json()['results'][0]['file'],
+            'http://testserver/books/prayer-devotion-4/download/')
+
+    def test_sparse_fieldsets(self):
+        """
+        Test that only the requested fields are returned
+        """
+        self.login()
+        response = self.client.get('/api/videos/?fields=title,embed_url')
+        self.assertEqual(response.json()['results'], [{
+            'title': 'The Gift',
+            'embed_url':
+                'https://www.youtube.com/embed/rAKLiE658m0?wmode=opaque',
+        }])
+
+        response = self.client.get('/api/videos/?fields=title,nope')
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_pagination(self):
+        """
+        Test that following the next links walks every book
+        with a constant number of queries
+        """
+        self.login()
+        slugs = []
+        url = '/api/books/?limit=2&fields=slug,tags'
+        while url:
+            # session, user, books and tags
+            with self.assertNumQueries(4):
+                data = self.client.get(url).json()
+            slugs += [book['slug'] for book in data['results']]
+            url = data['next']
+        self.assertEqual(slugs,
+            ['prayer-devotion-{}'.format(i) for i in range(4, -1, -1)])
+
+    def test_export_all(self):
+        """
+        Test that staff can stream every book and members can't
+        """
+        self.login()
+        response = self.client.get('/api/books/?limit=all')
+        self.assertEqual(response.status_code, 403)
+
+        self.login('kelvin@murage.com', 'kelvinpassword')
+        response = self.client.get('/api/books/?limit=all&fields=slug')
+        self.assertTrue(response.streaming)
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(data['results']), 5)
+
+
+class ResourceDetailAPIViewTestCase(APIViewsTestCase):
+    """
+    Tests for the resource detail API views
+    """
+    def test_video_detail(self):
+        """
+        Test that a video is looked up by its slug
+        """
+        self.login()
+        response = self.client.get('/api/videos/the-gift/')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['title'], 'The Gift')
+        self.assertEqual(data['video_url'], 'https://youtu.be/rAKLiE658m0')
+
+    def test_missing_book(self):
+        """
+        Test that a missing book results in a 404 JSON error
+        """
+        self.login()
+        response = self.client.get('/api/books/does-not-exist/')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {'detail': 'Not found.'})
+
+
+class LatestAPIViewTestCase(APIViewsTestCase):
+    """
+    Tests for the merged latest resources API
+    """
+    def test_requires_login(self):
+        """
+        Test that anonymous requests are rejected
+        """
+        response = self.client.get('/api/latest/')
+        self.assertEqual(response.status_code, 401)
+
+    def test_latest(self):
+        """
+        Test that books and videos are listed together newest first
+        and that the next links walk through all of them
+        """
+        self.login()
+        results = []
+        url = '/api/latest/?limit=4&fields=slug,title'
+        while url:
+            data = self.client.get(url).json()
+            results += data['results']
+            url = data['next']
+        self.assertEqual(results[0], {
+            'type': 'video',
+            'slug': 'the-gift',
+            'title': 'The Gift',
+        })
+        self.assertEqual([result['slug'] for result in results[1:]],
+            ['prayer-devotion-{}'.format(i) for i in range(4, -1, -1)])
+        self.assertTrue(all(result['type'] == 'book'
+            for result in results[1:]))
+
+    def test_invalid_parameters(self):
+        """
+        Test that unknown fields, limits and cursors are rejected
+        """
+        self.login()
+        for query in ('fields=embed_url', 'limit=many', 'after=nope'):
+            response = self.client.get('/api/latest/?' + query)
+            self.assertEqual(response.status_code, 400, query)
+
+
+class SuggestAPIViewTestCase(APIViewsTestCase):
+    """
+    Tests for the typeahead suggestion API
+    """
+    def setUp(self):
+        cache.clear()
+
+    def test_requires_login(self):
+        """
+        Test that anonymous requests are rejected
+        """
+        response = self.client.get('/api/suggest/?q=pray')
+        self.assertEqual(response.status_code, 401)
+
+    def test_suggestions(self):
+        """
+        Test that suggestions are returned and limited
+        """
+        self.login()
+        response = self.client.get('/api/suggest/?q=pray&limit=2')
+        results = json.loads(response.content)['results']
+        self.assertEqual(results, [
+            {
+                'kind': 'book',
+                'label': 'Prayer Devotion 0',
+                'url': '/books/prayer-devotion-0/',
+            },
+            {
+                'kind': 'book',
+                'label': 'Prayer Devotion 1',
+                'url': '/books/prayer-devotion-1/',
+            },
+        ])
+
+        response = self.client.get('/api/suggest/?q=pray&limit=many')
+        self.assertEqual(response.status_code, 400)
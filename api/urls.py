@@ -0,0 +1,16 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path('books/', views.BookListAPIView.as_view(), name='api_books'),
+    path('books/<slug:slug>/', views.BookDetailAPIView.as_view(),
+        name='api_book'
+    ),
+    path('latest/', views.LatestAPIView.as_view(), name='api_latest'),
+    path('suggest/', views.SuggestAPIView.as_view(), name='api_suggest'),
+    path('videos/', views.VideoListAPIView.as_view(), name='api_videos'),
+    path('videos/<slug:slug>/', views.VideoDetailAPIView.as_view(),
+        name='api_video'
+    ),
+]
@@ -0,0 +1,232 @@
+from django.core.paginator import InvalidPage
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.http import urlencode
+from django.views import View
+
+from books.models import Book
+from core.pagination import CursorPaginator, MergedCursorPaginator
+from search import typeahead
+from videos.models import Video
+
+from .serializers import (BookSerializer, ResourceSerializer,
+    VideoSerializer, stream_json)
+
+
+def error(detail, status):
+    return JsonResponse({'detail': detail}, status=status)
+
+
+class APILoginRequiredMixin:
+    """
+    Rejects unauthenticated API requests with a JSON error instead
+    of redirecting to the login page
+    """
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return error('Authentication credentials were not provided.',
+                401)
+        return super().dispatch(request, *args, **kwargs)
+
+
+class ResourceAPIMixin(APILoginRequiredMixin):
+    """
+    Defines common configurations for the resource API views
+    """
+    model = None
+    serializer_class = None
+
+    def get_serializer(self):
+        fields = self.request.GET.get('fields')
+        return self.serializer_class(fields.split(',') if fields else None)
+
+
+class ResourceListAPIView(ResourceAPIMixin, View):
+    """
+    Lists resources newest first, paginated with cursors
+
+    Query parameters:
+        fields: Comma separated names of the fields to return
+        limit: Number of results per page (at most `max_limit`), or
+            'all' for staff to stream every resource
+        after, before: Cursors from the `next` and `previous` links
+    """
+    default_limit = 20
+    max_limit = 100
+    stream_batch_size = 500
+
+    def get(self, request):
+        try:
+            serializer = self.get_serializer()
+        except ValueError as e:
+            return error(str(e), 400)
+        queryset = serializer.get_queryset(self.model.objects.all())
+
+        limit = request.GET.get('limit', self.default_limit)
+        if limit == 'all':
+            if not request.user.is_staff:
+                return error('Only staff can export all resources.', 403)
+            return StreamingHttpResponse(
+                stream_json(self.export(queryset, serializer)),
+                content_type='application/json')
+
+        try:
+            limit = min(max(int(limit), 1), self.max_limit)
+            page = CursorPaginator(queryset, limit).page(
+                after=request.GET.get('after'),
+                before=request.GET.get('before'))
+        except ValueError:
+            return error('limit must be a number or "all".', 400)
+        except InvalidPage as e:
+            return error(str(e), 400)
+
+        return JsonResponse({
+            'results': [serializer.to_dict(resource, request)
+                for resource in page],
+            'next': self.page_url(page.next_cursor, 'after', limit),
+            'previous': self.page_url(page.previous_cursor, 'before', limit),
+        })
+
+    def page_url(self, cursor, direction, limit):
+        if cursor is None:
+            return None
+        params = {direction: cursor, 'limit': limit}
+        if self.request.GET.get('fields'):
+            params['fields'] = self.request.GET['fields']
+        return self.request.build_absolute_uri(
+            '{}?{}'.format(self.request.path, urlencode(params)))
+
+    def export(self, queryset, serializer):
+        """
+        Yields every resource, loading them one keyset page at a time
+        so that memory use doesn't grow with the catalogue
+        """
+        paginator = CursorPaginator(queryset, self.stream_batch_size)
+        cursor = None
+        while True:
+            page = paginator.page(after=cursor)
+            for resource in page:
+                yield serializer.to_dict(resource, self.request)
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+
+
+class ResourceDetailAPIView(ResourceAPIMixin, View):
+    """
+    Returns a single resource looked up by its slug
+    """
+    def get(self, request, slug):
+        try:
+            serializer = self.get_serializer()
+        except ValueError as e:
+            return error(str(e), 400)
+        queryset = serializer.get_queryset(self.model.objects.all())
+        try:
+            resource = queryset.get(slug=slug)
+        except self.model.DoesNotExist:
+            return error('Not found.', 404)
+        return JsonResponse(serializer.to_dict(resource, request))
+
+
+class BookListAPIView(ResourceListAPIView):
+    model = Book
+    serializer_class = BookSerializer
+
+
+class BookDetailAPIView(ResourceDetailAPIView):
+    model = Book
+    serializer_class = BookSerializer
+
+
+class VideoListAPIView(ResourceListAPIView):
+    model = Video
+    serializer_class = VideoSerializer
+
+
+class VideoDetailAPIView(ResourceDetailAPIView):
+    model = Video
+    serializer_class = VideoSerializer
+
+
+class LatestAPIView(APILoginRequiredMixin, View):
+    """
+    Lists books and videos together newest first, paginated with
+    cursors. Each result holds its ``type``.
+
+    Query parameters:
+        fields: Comma separated names of the fields books and videos
+            share
+        limit: Number of results per page (at most `max_limit`)
+        after: Cursor from the `next` link
+    """
+    default_limit = 20
+    max_limit = 100
+    resources = {
+        'book': (Book, BookSerializer),
+        'video': (Video, VideoSerializer),
+    }
+
+    def get(self, request):
+        fields = request.GET.get('fields')
+        fields = fields.split(',') if fields else list(
+            ResourceSerializer.fields)
+        try:
+            # only the fields of the base serializer are shared
+            ResourceSerializer(fields)
+        except ValueError as e:
+            return error(str(e), 400)
+        try:
+            limit = min(max(int(request.GET.get('limit',
+                self.default_limit)), 1), self.max_limit)
+        except ValueError:
+            return error('limit must be a number.', 400)
+
+        serializers, querysets = {}, {}
+        for name, (model, serializer_class) in self.resources.items():
+            serializers[name] = serializer_class(fields)
+            querysets[name] = serializers[name].get_queryset(
+                model.objects.all())
+        paginator = MergedCursorPaginator(querysets, limit)
+        try:
+            page = paginator.page(after=request.GET.get('after'))
+        except InvalidPage as e:
+            return error(str(e), 400)
+
+        results = []
+        for resource in page:
+            name = paginator.types[type(resource)]
+            result = {'type': name}
+            result.update(serializers[name].to_dict(resource, request))
+            results.append(result)
+
+        next_url = None
+        if page.has_next():
+            params = {'after': page.next_cursor, 'limit': limit}
+            if request.GET.get('fields'):
+                params['fields'] = request.GET['fields']
+            next_url = request.build_absolute_uri(
+                '{}?{}'.format(request.path, urlencode(params)))
+        return JsonResponse({'results': results, 'next': next_url})
+
+
+class SuggestAPIView(APILoginRequiredMixin, View):
+    """
+    Suggests titles, categories, tags and authors starting with what
+    has been typed, served from the in-memory typeahead index
+
+    Query parameters:
+        q: The text typed so far
+        limit: Number of suggestions (at most `max_limit`)
+    """
+    default_limit = 8
+    max_limit = 20
+
+    def get(self, request):
+        try:
+            limit = min(max(int(request.GET.get('limit',
+                self.default_limit)), 1), self.max_limit)
+        except ValueError:
+            return error('limit must be a number.', 400)
+        return JsonResponse({
+            'results': typeahead.suggest(request.GET.get('q', ''), limit),
+        })
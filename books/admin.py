@@ -10,6 +10,7 @@ class BookAdmin(ResourceAdmin):
     """
     Registers the Book model to the admin site
     """
+    readonly_fields = ('file_size', 'content_type', 'checksum')
     fieldsets = (
         ('Basic Info', {
             'fields': ('title', 'slug', 'summary')
@@ -18,7 +19,8 @@ class BookAdmin(ResourceAdmin):
             'fields': ('authors', 'category', 'tags')
         }),
         ('Uploads', {
-            'fields': ('cover_image', 'file_upload'),
+            'fields': ('cover_image', 'file_upload', 'file_size',
+                'content_type', 'checksum'),
         }),
         ('Additional Info', {
             'fields': ('date_posted',)
@@ -0,0 +1,105 @@
+import posixpath
+
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+# Book files are stored once per content, under their checksum
+BLOB_DIRECTORY = 'books/blobs'
+
+
+def blob_name(checksum, filename):
+    """Returns the storage name of a book file's content
+
+    Args:
+        checksum (str): The SHA-256 checksum of the file
+        filename (str): The name the file was uploaded as, whose
+            extension is kept
+
+    Returns:
+        str: Such as ``books/blobs/9f/9f86d0...0a08.pdf``
+    """
+    extension = posixpath.splitext(filename)[1].lower()[:10]
+    return posixpath.join(BLOB_DIRECTORY, checksum[:2],
+        checksum + extension)
+
+
+def acquire(file, checksum, filename):
+    """Stores a book file unless its content is already stored, and
+    counts a reference to it
+
+    Args:
+        file (File): The uploaded file
+        checksum (str): The SHA-256 checksum of the file
+        filename (str): The name the file was uploaded as
+
+    Returns:
+        str: The storage name of the content
+    """
+    from .models import BookBlob
+
+    while True:
+        blob = BookBlob.objects.filter(checksum=checksum).only(
+            'file').first()
+        # collect_garbage may remove the blob between both queries
+        if blob is not None and BookBlob.objects.filter(pk=blob.pk).update(
+            ref_count=F('ref_count') + 1):
+            return blob.file.name
+
+        name = blob_name(checksum, filename)
+        # a file left by a save that was rolled back has the content
+        # already, unless it was cut short
+        if not default_storage.exists(name) or \
+            default_storage.size(name) != file.size:
+            name = default_storage.save(name, file)
+        try:
+            with transaction.atomic():
+                BookBlob.objects.create(checksum=checksum, file=name,
+                    size=file.size, ref_count=1)
+            return name
+        except IntegrityError:
+            # another upload of the same content was stored first
+            if name != blob_name(checksum, filename):
+                default_storage.delete(name)
+
+
+def release(checksum, name):
+    """Drops a reference to a stored book file
+
+    Files stored before deduplication have no blob and are left as
+    they are.
+
+    Args:
+        checksum (str): The SHA-256 checksum of the file
+        name (str): The storage name of the file
+    """
+    from .models import BookBlob
+
+    BookBlob.objects.filter(checksum=checksum, file=name,
+        ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+
+
+def collect_garbage():
+    """Deletes the stored book files no book refers to
+
+    Each blob is locked while it is deleted, so that an upload of the
+    same content either references it first or stores it again.
+
+    Returns:
+        int: The number of files deleted
+    """
+    from .models import BookBlob
+
+    deleted = 0
+    unreferenced = list(BookBlob.objects.filter(ref_count=0).values_list(
+        'pk', flat=True))
+    for pk in unreferenced:
+        with transaction.atomic():
+            blob = BookBlob.objects.select_for_update().filter(pk=pk,
+                ref_count=0).first()
+            if blob is None:
+                continue
+            default_storage.delete(blob.file.name)
+            blob.delete()
+        deleted += 1
+    return deleted
@@ -0,0 +1,234 @@
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import (FileResponse, Http404, HttpResponse,
+    HttpResponseRedirect)
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+# Bytes read from the file and sent per chunk, so every download holds
+# about this much in memory whatever the size of the file
+CHUNK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# Content types browsers display themselves rather than save
+INLINE_CONTENT_TYPES = ('application/pdf',)
+
+
+def is_new_download(request):
+    """Returns whether a request starts downloading a file
+
+    Args:
+        request (HttpRequest): The download request
+
+    Returns:
+        bool: False for HEAD requests and ranges past the first byte
+    """
+    header = request.META.get('HTTP_RANGE', '').replace(' ', '')
+    return request.method == 'GET' and (
+        not header or header.startswith('bytes=0-'))
+
+
+class RangeNotSatisfiable(Exception):
+    """Raised when a requested range lies past the end of the file"""
+
+
+def parse_range(header, size):
+    """Returns the byte range requested by a Range header
+
+    Only single ranges are served. Headers asking for several ranges,
+    or that can't be parsed, are ignored as HTTP allows and the whole
+    file is sent instead.
+
+    Args:
+        header (str): The Range header, or None
+        size (int): The size of the file
+
+    Returns:
+        tuple: The first and last byte of the range, or None for the
+            whole file
+
+    Raises:
+        RangeNotSatisfiable: The range starts past the end of the file
+    """
+    match = RANGE_RE.match((header or '').replace(' ', ''))
+    if match is None:
+        return None
+    start, end = match.groups()
+    if not start:
+        if not end:
+            return None
+        # the last bytes of the file
+        if int(end) == 0 or size == 0:
+            raise RangeNotSatisfiable
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+        if start > end:
+            if start >= size:
+                raise RangeNotSatisfiable
+            return None
+    return start, end
+
+
+def if_range_matches(request, etag, last_modified):
+    """Returns whether a Range header applies to the current file
+
+    Args:
+        request (HttpRequest): The download request
+        etag (str): The quoted ETag of the file
+        last_modified (int): When the file changed, as a timestamp
+
+    Returns:
+        bool: False if the If-Range header names another version
+    """
+    validator = request.META.get('HTTP_IF_RANGE')
+    if not validator:
+        return True
+    if validator.startswith('"') or validator.startswith('W/'):
+        # only strong ETags can validate ranges
+        return validator == etag and not etag.startswith('W/')
+    return parse_http_date_safe(validator) == last_modified
+
+
+class RangeFile:
+    """
+    A read-only view of a byte range of a file.
+
+    Args:
+        file (File): An open file
+        start (int): The first byte of the range
+        length (int): The number of bytes of the range
+    """
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size) if size else b''
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def content_disposition(filename, inline=False):
+    """Returns the Content-Disposition header downloading a file
+
+    Args:
+        filename (str): The name the file is saved as
+        inline (bool, optional): Whether the browser may display the
+            file rather than save it
+
+    Returns:
+        str: The header value
+    """
+    disposition = 'inline' if inline else 'attachment'
+    try:
+        filename.encode('ascii')
+        return '{}; filename="{}"'.format(disposition,
+            filename.replace('\\', '\\\\').replace('"', r'\"'))
+    except UnicodeEncodeError:
+        return "{}; filename*=utf-8''{}".format(disposition,
+            quote(filename))
+
+
+def _local_path(storage, name):
+    try:
+        return storage.path(name)
+    except NotImplementedError:
+        return None
+
+
+def serve(request, file, content_type, etag='', last_modified=None,
+    filename=None):
+    """Returns the response downloading a stored file
+
+    Files in remote storage are redirected to, with a short-lived
+    signed URL when the storage can sign one. Local files are handed
+    to the front server with the ``BOOK_DOWNLOAD_SENDFILE`` setting,
+    or streamed in chunks honouring Range and If-Range headers. PDFs
+    are sent inline, so that browsers open them in their viewer.
+
+    Args:
+        request (HttpRequest): The download request
+        file (FieldFile): The file to download
+        content_type (str): The content type of the file
+        etag (str, optional): The quoted ETag of the file
+        last_modified (datetime, optional): When the file changed
+        filename (str, optional): The name the file is downloaded as.
+            Defaults to the name of the stored file.
+
+    Returns:
+        HttpResponse: The file, part of it, or a redirect to it
+    """
+    storage, name = file.storage, file.name
+    filename = filename or posixpath.basename(name)
+    inline = content_type in INLINE_CONTENT_TYPES
+    path = _local_path(storage, name)
+    if path is None:
+        if hasattr(storage, 'signed_url'):
+            return HttpResponseRedirect(storage.signed_url(name,
+                expiration=settings.BOOK_DOWNLOAD_URL_EXPIRATION,
+                filename=filename, inline=inline))
+        return HttpResponseRedirect(storage.url(name))
+
+    last_modified = int(last_modified.timestamp()) if last_modified \
+        else None
+    response = get_conditional_response(request, etag=etag or None,
+        last_modified=last_modified)
+    if response is not None:
+        return response
+
+    sendfile = settings.BOOK_DOWNLOAD_SENDFILE
+    if sendfile:
+        # the front server sends the file and handles ranges itself
+        response = HttpResponse(content_type=content_type)
+        if sendfile == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = quote(posixpath.join(
+                settings.BOOK_DOWNLOAD_ACCEL_PREFIX, name))
+        else:
+            response['X-Sendfile'] = path
+    else:
+        try:
+            opened = storage.open(name, 'rb')
+        except FileNotFoundError:
+            raise Http404('That file is missing')
+        size = opened.size
+        header = request.META.get('HTTP_RANGE')
+        if not if_range_matches(request, etag, last_modified):
+            header = None
+        try:
+            byte_range = parse_range(header, size)
+        except RangeNotSatisfiable:
+            opened.close()
+            response = HttpResponse(status=416)
+            response['Content-Range'] = 'bytes */{}'.format(size)
+            return response
+        status = 200 if byte_range is None else 206
+        start, end = byte_range or (0, size - 1)
+        length = max(end - start + 1, 0)
+        response = FileResponse(RangeFile(opened, start, length),
+            status=status, content_type=content_type)
+        response.block_size = CHUNK_SIZE
+        response['Content-Length'] = length
+        if status == 206:
+            response['Content-Range'] = 'bytes {}-{}/{}'.format(
+                start, end, size)
+
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = content_disposition(filename,
+        inline)
+    if etag:
+        response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
@@ -0,0 +1,65 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from books.models import Book, file_metadata
+
+
+def fetch_metadata(name):
+    """Reads the metadata of a stored book file"""
+    with default_storage.open(name) as file:
+        return file_metadata(file, name)
+
+
+class Command(BaseCommand):
+    help = ('Stores the size, content type and checksum of book files '
+        'uploaded before they were captured at upload time.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8,
+            help='Number of files fetched from storage concurrently')
+        parser.add_argument('--batch-size', type=int, default=100,
+            help='Number of books updated per query')
+
+    def handle(self, *args, **options):
+        books = Book.objects.filter(file_size__isnull=True).exclude(
+            file_upload='').only('pk', 'file_upload').order_by('pk')
+        updated = failed = 0
+        last_pk = 0
+
+        # storage calls are network bound so they are run in threads,
+        # one batch at a time to keep memory use flat
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            while True:
+                batch = list(
+                    books.filter(pk__gt=last_pk)[:options['batch_size']])
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+
+                futures = [
+                    pool.submit(fetch_metadata, book.file_upload.name)
+                    for book in batch
+                ]
+                fetched = []
+                for book, future in zip(batch, futures):
+                    try:
+                        metadata = future.result()
+                    except Exception as e:
+                        # such as a file missing from the bucket, which
+                        # mustn't stop the books after it
+                        failed += 1
+                        self.stderr.write('{}: {}'.format(
+                            book.file_upload.name, e))
+                        continue
+                    for field, value in metadata.items():
+                        setattr(book, field, value)
+                    fetched.append(book)
+
+                Book.objects.bulk_update(fetched,
+                    ['file_size', 'content_type', 'checksum'])
+                updated += len(fetched)
+
+        self.stdout.write(self.style.SUCCESS(
+            'Updated {} books, {} failed'.format(updated, failed)))
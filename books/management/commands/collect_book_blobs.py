@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from books import blobs
+
+
+class Command(BaseCommand):
+    help = ('Deletes the stored book files that no book refers to any '
+        'more, once their books were deleted or given other files.')
+
+    def handle(self, *args, **options):
+        deleted = blobs.collect_garbage()
+        self.stdout.write(self.style.SUCCESS(
+            'Deleted {} unreferenced book files'.format(deleted)))
@@ -0,0 +1,75 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from books.models import Book, BookText
+from books.text import extract_file
+from search import index
+
+
+class Command(BaseCommand):
+    help = ('Extracts the text of book files that have none, or whose '
+        'file changed since it was extracted, and indexes it for search. '
+        'Each batch is saved as it completes, so an interrupted run '
+        'resumes where it stopped.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int,
+            default=os.cpu_count(),
+            help='Number of files parsed in parallel processes')
+        parser.add_argument('--batch-size', type=int, default=50,
+            help='Number of books saved per transaction')
+        parser.add_argument('--retry-failed', action='store_true',
+            help='Extract again the files that failed before')
+
+    def handle(self, *args, **options):
+        stale = Q(text__isnull=True) | ~Q(text__checksum=F('checksum'))
+        if options['retry_failed']:
+            stale |= ~Q(text__error='')
+        books = Book.objects.filter(stale).exclude(file_upload='').only(
+            'pk', 'file_upload', 'checksum').order_by('pk')
+        extracted = failed = 0
+        last_pk = 0
+
+        # parsing PDFs is CPU bound so it runs in processes, which
+        # only read files and leave the database to this one
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            while True:
+                batch = list(
+                    books.filter(pk__gt=last_pk)[:options['batch_size']])
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+
+                texts, now = [], timezone.now()
+                results = pool.map(extract_file,
+                    [book.file_upload.name for book in batch])
+                for book, result in zip(batch, results):
+                    if result['error']:
+                        failed += 1
+                        self.stderr.write('{}: {}'.format(
+                            book.file_upload.name, result['error']))
+                    else:
+                        extracted += 1
+                    texts.append(BookText(book=book, checksum=book.checksum,
+                        date_extracted=now, **result))
+
+                # saved in bulk, so the search index is updated here
+                # rather than by signals
+                pks = [book.pk for book in batch]
+                with transaction.atomic():
+                    existing = set(BookText.objects.filter(
+                        book__in=pks).values_list('book_id', flat=True))
+                    BookText.objects.bulk_create([text for text in texts
+                        if text.book_id not in existing])
+                    BookText.objects.bulk_update([text for text in texts
+                        if text.book_id in existing], ['text', 'page_count',
+                        'checksum', 'error', 'date_extracted'])
+                    index.index_resources(Book, pks)
+
+        self.stdout.write(self.style.SUCCESS(
+            'Extracted {} books, {} failed'.format(extracted, failed)))
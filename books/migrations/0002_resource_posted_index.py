@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='book',
+            options={'ordering': ['-date_posted', '-id']},
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['date_posted', 'id'], name='books_book_posted_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:28
+
+from django.db import migrations, models
+
+# The through table's unique index is led by book_id, so filtering by
+# tag used the single-column tag_id index and then read every row for
+# its book_id. Leading with tag_id and covering book_id makes the filter
+# an index range scan that joins to the books by primary key.
+TAG_INDEX = models.Index(fields=['tag', 'book'],
+    name='books_book_tags_tag_idx')
+
+
+def add_tag_index(apps, schema_editor):
+    through = apps.get_model('books', 'Book').tags.through
+    schema_editor.add_index(through, TAG_INDEX)
+
+
+def remove_tag_index(apps, schema_editor):
+    through = apps.get_model('books', 'Book').tags.through
+    schema_editor.remove_index(through, TAG_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0003_book_file_metadata'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['category', 'date_posted', 'id'], name='books_book_cat_posted_idx'),
+        ),
+        # auto-created through tables can't declare Meta.indexes
+        migrations.RunPython(add_tag_index, remove_tag_index),
+    ]
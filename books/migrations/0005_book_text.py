@@ -0,0 +1,25 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0004_resource_group_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookText',
+            fields=[
+                ('book', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='text', serialize=False, to='books.book')),
+                ('text', models.TextField(blank=True)),
+                ('page_count', models.PositiveIntegerField(default=0)),
+                ('checksum', models.CharField(blank=True, help_text='Checksum of the file the text is from', max_length=64, verbose_name='SHA-256 checksum')),
+                ('error', models.CharField(blank=True, help_text='Why the text could not be extracted', max_length=200)),
+                ('date_extracted', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations, models
+
+# The through table's unique index is led by book_id, so listing an
+# author's books used the single-column user_id index and then read
+# every row for its book_id. Leading with user_id and covering book_id
+# makes it an index range scan, like the tag index.
+AUTHOR_INDEX = models.Index(fields=['user', 'book'],
+    name='books_book_authors_user_idx')
+
+
+def add_author_index(apps, schema_editor):
+    through = apps.get_model('books', 'Book').authors.through
+    schema_editor.add_index(through, AUTHOR_INDEX)
+
+
+def remove_author_index(apps, schema_editor):
+    through = apps.get_model('books', 'Book').authors.through
+    schema_editor.remove_index(through, AUTHOR_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0005_book_text'),
+    ]
+
+    operations = [
+        # auto-created through tables can't declare Meta.indexes
+        migrations.RunPython(add_author_index, remove_author_index),
+    ]
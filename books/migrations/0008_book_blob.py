@@ -0,0 +1,24 @@
+# Generated by Django 3.2.25 on 2026-10-18 09:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0007_download_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookBlob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('checksum', models.CharField(max_length=64, unique=True, verbose_name='SHA-256 checksum')),
+                ('file', models.FileField(max_length=200, upload_to='')),
+                ('size', models.PositiveBigIntegerField()),
+                ('ref_count', models.PositiveIntegerField(default=0, help_text='Number of books whose file this is')),
+                ('date_created', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
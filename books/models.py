@@ -1,8 +1,45 @@
-from django.db import models
+import hashlib
+import mimetypes
+import posixpath
+
+from django.db import models, transaction
 from django.urls import reverse
 
 from core.models import Resource
 
+from . import blobs
+
+
+def file_metadata(file, name=None):
+    """Returns the size, content type and SHA-256 checksum of a file
+
+    Uploads received by the hashing upload handlers carry their
+    checksum, so that they aren't read again.
+
+    Args:
+        file (File): An open django File or UploadedFile
+        name (str, optional): The name used to guess the content type
+            when the file doesn't carry one. Defaults to the file's name.
+
+    Returns:
+        dict: The file_size, content_type and checksum of the file
+    """
+    content_type = getattr(file, 'content_type', None) or \
+        mimetypes.guess_type(name or file.name)[0] or \
+        'application/octet-stream'
+    checksum = getattr(file, 'sha256', None)
+    if checksum is None:
+        sha256 = hashlib.sha256()
+        for chunk in file.chunks():
+            sha256.update(chunk)
+        file.seek(0)
+        checksum = sha256.hexdigest()
+    return {
+        'file_size': file.size,
+        'content_type': content_type,
+        'checksum': checksum,
+    }
+
 
 class Book(Resource):
     """
@@ -14,6 +51,87 @@ class Book(Resource):
     )
     file_upload = models.FileField(upload_to='books',
         help_text='Upload the book here')
+    file_size = models.PositiveBigIntegerField(null=True, editable=False)
+    content_type = models.CharField(max_length=100, blank=True,
+        editable=False)
+    checksum = models.CharField('SHA-256 checksum', max_length=64,
+        blank=True, editable=False)
+    download_count = models.PositiveIntegerField(default=0, editable=False)
+
+    search_related = ('text',)
+
+    def save(self, *args, **kwargs):
+        if not self.file_upload or self.file_upload._committed:
+            super().save(*args, **kwargs)
+            return
+        # capture the metadata of new uploads so that pages never
+        # have to ask the storage backend for it
+        for field, value in file_metadata(self.file_upload.file,
+            self.file_upload.name).items():
+            setattr(self, field, value)
+        replaced = None
+        if self.pk is not None:
+            replaced = Book.objects.filter(pk=self.pk).values_list(
+                'checksum', 'file_upload').first()
+        # the text is extracted once the upload is saved
+        self._file_uploaded = True
+        with transaction.atomic():
+            # files with the same content share one stored copy
+            self.file_upload.name = blobs.acquire(self.file_upload.file,
+                self.checksum, self.file_upload.name)
+            self.file_upload._committed = True
+            super().save(*args, **kwargs)
+            if replaced is not None:
+                blobs.release(*replaced)
 
     def get_absolute_url(self):
         return reverse('book', kwargs={'slug': self.slug})
+
+    def get_download_filename(self):
+        """Returns the name the book's file is downloaded as"""
+        return self.slug + posixpath.splitext(self.file_upload.name)[1]
+
+    def get_download_url(self):
+        return reverse('book_download', kwargs={'slug': self.slug})
+
+    def get_search_text(self):
+        try:
+            return self.text.text
+        except BookText.DoesNotExist:
+            return ''
+
+
+class BookText(models.Model):
+    """
+    Model for the text extracted from a book's file, kept out of the
+    books table so that listing books never reads it
+    """
+    book = models.OneToOneField(Book, on_delete=models.CASCADE,
+        primary_key=True, related_name='text')
+    text = models.TextField(blank=True)
+    page_count = models.PositiveIntegerField(default=0)
+    checksum = models.CharField('SHA-256 checksum', max_length=64,
+        blank=True, help_text='Checksum of the file the text is from')
+    error = models.CharField(max_length=200, blank=True,
+        help_text='Why the text could not be extracted')
+    date_extracted = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return str(self.book)
+
+
+class BookBlob(models.Model):
+    """
+    Model for the stored content of book files, shared by the books
+    whose files have the same checksum
+    """
+    checksum = models.CharField('SHA-256 checksum', max_length=64,
+        unique=True)
+    file = models.FileField(max_length=200)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0,
+        help_text='Number of books whose file this is')
+    date_created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.file.name
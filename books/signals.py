@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import blobs, text
+
+
+@receiver(post_save, sender='books.Book')
+def extract_uploaded_text(sender, instance, raw=False, **kwargs):
+    """Schedules the text extraction of a newly uploaded file"""
+    if not raw and getattr(instance, '_file_uploaded', False):
+        instance._file_uploaded = False
+        text.schedule_extraction(instance.pk)
+
+
+@receiver(post_delete, sender='books.Book')
+def release_deleted_file(sender, instance, **kwargs):
+    """Drops the reference of a deleted book to its stored file"""
+    if instance.file_upload:
+        blobs.release(instance.checksum, instance.file_upload.name)
@@ -0,0 +1,123 @@
+import hashlib
+from io import StringIO
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+
+import utils.test
+from books import blobs
+from books.models import Book, BookBlob
+from core.models import Category
+
+CONTENT = b'%PDF-1.4 a small book'
+CHECKSUM = hashlib.sha256(CONTENT).hexdigest()
+
+
+class BookBlobsTestCase(TestCase):
+    """
+    Tests for storing the files of books once per content
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        utils.test.set_up_test_files()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        utils.test.tear_down_test_files()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(
+            name='Agriculture',
+            slug='agriculture'
+        )
+
+    def upload(self, slug, content=CONTENT, book=None):
+        book = book or Book(title=slug.replace('-', ' ').title(),
+            category=self.category, slug=slug)
+        book.file_upload = SimpleUploadedFile(slug + '.pdf', content,
+            content_type='application/pdf')
+        with self.captureOnCommitCallbacks(execute=True):
+            book.save()
+        return book
+
+    def test_blob_name(self):
+        """
+        Test that files are stored under their checksum
+        """
+        self.assertEqual(blobs.blob_name(CHECKSUM, 'Guide.PDF'),
+            'books/blobs/{}/{}.pdf'.format(CHECKSUM[:2], CHECKSUM))
+
+    def test_duplicates_stored_once(self):
+        """
+        Test that books uploaded with the same content share its file
+        """
+        first = self.upload('farming-guide')
+        with mock.patch.object(default_storage, 'save') as save:
+            second = self.upload('farming-handbook')
+        save.assert_not_called()
+        self.assertEqual(first.file_upload.name,
+            blobs.blob_name(CHECKSUM, 'farming-guide.pdf'))
+        self.assertEqual(second.file_upload.name, first.file_upload.name)
+        blob = BookBlob.objects.get()
+        self.assertEqual((blob.size, blob.ref_count), (len(CONTENT), 2))
+        with default_storage.open(second.file_upload.name) as file:
+            self.assertEqual(file.read(), CONTENT)
+
+    def test_checksum_of_hashed_uploads_trusted(self):
+        """
+        Test that uploads hashed while received aren't read again
+        """
+        upload = SimpleUploadedFile('guide.pdf', CONTENT)
+        upload.sha256 = 'f' * 64
+        book = Book(title='Guide', category=self.category, slug='guide',
+            file_upload=upload)
+        book.save()
+        self.assertEqual(book.checksum, 'f' * 64)
+        self.assertEqual(book.file_upload.name,
+            blobs.blob_name('f' * 64, 'guide.pdf'))
+
+    def test_references_released(self):
+        """
+        Test that replacing or deleting the file of a book releases it
+        """
+        first = self.upload('farming-guide')
+        second = self.upload('farming-handbook')
+        self.upload('farming-guide', b'%PDF-1.4 a new edition', book=first)
+        self.assertEqual(BookBlob.objects.get(checksum=CHECKSUM).ref_count,
+            1)
+        second.delete()
+        self.assertEqual(BookBlob.objects.get(checksum=CHECKSUM).ref_count,
+            0)
+
+    def test_download_filename(self):
+        """
+        Test that books are downloaded under their slug
+        """
+        book = self.upload('farming-guide')
+        self.assertEqual(book.get_download_filename(), 'farming-guide.pdf')
+
+    def test_collect_book_blobs_command(self):
+        """
+        Test that only files without references are deleted
+        """
+        kept = self.upload('farming-guide', b'%PDF-1.4 kept')
+        deleted = self.upload('farming-handbook')
+        deleted.delete()
+        out = StringIO()
+        call_command('collect_book_blobs', stdout=out)
+        self.assertIn('Deleted 1 unreferenced book files', out.getvalue())
+        self.assertFalse(default_storage.exists(deleted.file_upload.name))
+        self.assertTrue(default_storage.exists(kept.file_upload.name))
+        self.assertEqual(list(BookBlob.objects.values_list('checksum',
+            flat=True)), [kept.checksum])
+
+        # the content is stored again when uploaded again
+        again = self.upload('farming-manual')
+        self.assertEqual(again.file_upload.name, deleted.file_upload.name)
+        self.assertTrue(default_storage.exists(again.file_upload.name))
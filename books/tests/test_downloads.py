@@ -0,0 +1,233 @@
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import override_settings
+from django.utils.http import http_date
+
+import utils.test
+from books import downloads
+from books.models import Book
+from core.models import Category
+
+CONTENT = bytes(range(256)) * 1024
+
+
+class ParseRangeTestCase(SimpleTestCase):
+    """
+    Tests for reading the byte range of Range headers
+    """
+    def test_ranges(self):
+        """
+        Test that single ranges are read and clamped to the file
+        """
+        self.assertEqual(downloads.parse_range('bytes=0-99', 1000), (0, 99))
+        self.assertEqual(downloads.parse_range('bytes=900-', 1000),
+            (900, 999))
+        self.assertEqual(downloads.parse_range('bytes=900-5000', 1000),
+            (900, 999))
+        self.assertEqual(downloads.parse_range('bytes=-100', 1000),
+            (900, 999))
+        self.assertEqual(downloads.parse_range('bytes=-5000', 1000),
+            (0, 999))
+
+    def test_ignored_ranges(self):
+        """
+        Test that missing, malformed and multiple ranges ask for the
+        whole file
+        """
+        for header in (None, '', 'bytes=-', 'bytes=9-3', 'items=0-9',
+            'bytes=0-9,20-29'):
+            self.assertIsNone(downloads.parse_range(header, 1000), header)
+
+    def test_unsatisfiable_ranges(self):
+        """
+        Test that ranges past the end of the file are refused
+        """
+        for header in ('bytes=1000-', 'bytes=-0'):
+            with self.assertRaises(downloads.RangeNotSatisfiable):
+                downloads.parse_range(header, 1000)
+
+
+class RemoteStorage(FileSystemStorage):
+    """A storage whose files can't be read from the local disk"""
+    def path(self, name):
+        raise NotImplementedError
+
+    def signed_url(self, name, expiration, filename=None, inline=False):
+        return 'https://storage.example.com/{}?expires={}&inline={}'.format(
+            name, expiration, inline)
+
+
+class BookDownloadViewTestCase(TestCase):
+    """
+    Tests for downloading book files
+    """
+    @classmethod
+    def setUpClass(cls):
+        # the book's file is saved by setUpTestData
+        utils.test.set_up_test_files()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        utils.test.tear_down_test_files()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            first_name = 'Kelvin',
+            email='kelvin@murage.com',
+            password='kelvinpassword'
+        )
+        category = Category.objects.create(
+            name='Agriculture',
+            slug='agriculture'
+        )
+        cls.book = Book.objects.create(
+            title='Farming guide',
+            category=category,
+            slug='farming-guide',
+            file_upload=default_storage.save('books/farming-guide.pdf',
+                ContentFile(CONTENT)),
+            content_type='application/pdf',
+            checksum='abc123'
+        )
+        cls.url = '/books/farming-guide/download/'
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def download_count(self):
+        return Book.objects.get(pk=self.book.pk).download_count
+
+    def test_redirect_if_not_logged_in(self):
+        """
+        Test that downloads require login
+        """
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertRedirects(response,
+            '/accounts/login/?next=' + self.url)
+
+    def test_download(self):
+        """
+        Test that the whole file is streamed and counted
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response['Content-Length'], str(len(CONTENT)))
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response['Content-Disposition'],
+            'inline; filename="farming-guide.pdf"')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['ETag'], '"abc123"')
+        self.assertEqual(self.download_count(), 1)
+
+    def test_other_files_saved(self):
+        """
+        Test that files browsers don't display are saved, keeping their
+        name
+        """
+        Book.objects.filter(pk=self.book.pk).update(
+            content_type='application/epub+zip')
+        response = self.client.get(self.url)
+        self.assertEqual(response['Content-Disposition'],
+            'attachment; filename="farming-guide.pdf"')
+
+    def test_range(self):
+        """
+        Test that a range of the file is sent without counting another
+        download
+        """
+        response = self.client.get(self.url, HTTP_RANGE='bytes=1000-1999',
+            HTTP_IF_RANGE='"abc123"')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content),
+            CONTENT[1000:2000])
+        self.assertEqual(response['Content-Length'], '1000')
+        self.assertEqual(response['Content-Range'],
+            'bytes 1000-1999/{}'.format(len(CONTENT)))
+        self.assertEqual(self.download_count(), 0)
+
+    def test_if_range_for_another_version(self):
+        """
+        Test that the whole file is sent when it changed since the
+        range was asked for
+        """
+        for validator in ('"def456"', http_date(0)):
+            response = self.client.get(self.url,
+                HTTP_RANGE='bytes=1000-1999', HTTP_IF_RANGE=validator)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Length'],
+                str(len(CONTENT)))
+
+    def test_unsatisfiable_range(self):
+        """
+        Test that ranges past the end of the file are refused
+        """
+        response = self.client.get(self.url, HTTP_RANGE='bytes=999999-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(self.download_count(), 0)
+        self.assertEqual(response['Content-Range'],
+            'bytes */{}'.format(len(CONTENT)))
+
+    def test_not_modified(self):
+        """
+        Test that a cached copy is confirmed without sending the file
+        """
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='"abc123"')
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.download_count(), 0)
+
+    @override_settings(BOOK_DOWNLOAD_SENDFILE='x-accel-redirect')
+    def test_x_accel_redirect(self):
+        """
+        Test that nginx can be left to send the file
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'],
+            '/protected-media/books/farming-guide.pdf')
+        self.assertEqual(response.content, b'')
+        self.assertEqual(self.download_count(), 1)
+
+    @override_settings(BOOK_DOWNLOAD_SENDFILE='x-sendfile')
+    def test_x_sendfile(self):
+        """
+        Test that Apache can be left to send the file
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Sendfile'],
+            default_storage.path('books/farming-guide.pdf'))
+
+    def test_remote_storage(self):
+        """
+        Test that files in remote storage are redirected to with a
+        signed URL
+        """
+        self.book.file_upload.storage = RemoteStorage()
+        request = RequestFactory().get(self.url)
+        response = downloads.serve(request, self.book.file_upload,
+            'application/pdf')
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, 'https://storage.example.com/'
+            'books/farming-guide.pdf?expires=300&inline=True')
+
+    def test_missing_file(self):
+        """
+        Test that a book whose file is missing isn't counted
+        """
+        Book.objects.filter(pk=self.book.pk).update(
+            file_upload='books/missing.pdf')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.download_count(), 0)
+
+    def test_missing_book(self):
+        """
+        Test that books that don't exist are not found
+        """
+        response = self.client.get('/books/no-such-book/download/')
+        self.assertEqual(response.status_code, 404)
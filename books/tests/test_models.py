@@ -1,7 +1,15 @@
+import hashlib
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
 from django.test import TestCase
 from django.utils import timezone
 
+import utils.test
 from books.models import Book
 from core.models import Category, Tag
 
@@ -204,3 +212,86 @@ class BookModelTestCase(ResourceModelsTestCase):
         self.assertEqual(last_edit__meta.verbose_name, 'last edit')
         self.assertEqual(last_edit__meta.null, False)
         self.assertEqual(last_edit__meta.blank, True)
+
+    def test_file_metadata_meta(self):
+        """
+        Test meta attributes of the file metadata fields
+        """
+        for name in ('file_size', 'content_type', 'checksum'):
+            field__meta = self.book._meta.get_field(name)
+            self.assertEqual(field__meta.editable, False)
+        self.assertEqual(
+            self.book._meta.get_field('checksum').max_length, 64)
+
+
+class BookFileMetadataTestCase(ResourceModelsTestCase):
+    """
+    Tests for the file metadata captured for Book uploads
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        utils.test.set_up_test_files()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        utils.test.tear_down_test_files()
+
+    def test_metadata_captured_on_upload(self):
+        """
+        Test that uploading a file stores its size, content type
+        and checksum
+        """
+        content = b'%PDF-1.4 a small book'
+        self.book.file_upload = SimpleUploadedFile('guide.pdf', content,
+            content_type='application/pdf')
+        self.book.save()
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.file_size, len(content))
+        self.assertEqual(self.book.content_type, 'application/pdf')
+        self.assertEqual(self.book.checksum,
+            hashlib.sha256(content).hexdigest())
+
+    def test_metadata_kept_when_file_unchanged(self):
+        """
+        Test that saving a book without a new upload doesn't
+        touch the stored metadata
+        """
+        Book.objects.filter(pk=self.book.pk).update(file_size=42)
+        self.book.refresh_from_db()
+        self.book.title = 'A new title'
+        self.book.save()
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.file_size, 42)
+
+    def test_backfill_book_metadata_command(self):
+        """
+        Test that the backfill command stores the metadata of
+        existing files
+        """
+        content = settings.MEDIA_ROOT.joinpath('book.pdf').read_bytes()
+        out = StringIO()
+        call_command('backfill_book_metadata', stdout=out)
+        self.assertIn('Updated 1 books, 0 failed', out.getvalue())
+
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.file_size, len(content))
+        self.assertEqual(self.book.content_type, 'application/pdf')
+        self.assertEqual(self.book.checksum,
+            hashlib.sha256(content).hexdigest())
+
+    def test_backfill_continues_after_errors(self):
+        """
+        Test that a file the storage can't read is reported without
+        stopping the command
+        """
+        class NotFound(Exception):
+            pass
+
+        out, err = StringIO(), StringIO()
+        with mock.patch('books.management.commands.backfill_book_metadata'
+            '.default_storage.open', side_effect=NotFound('No such object')):
+            call_command('backfill_book_metadata', stdout=out, stderr=err)
+        self.assertIn('Updated 0 books, 1 failed', out.getvalue())
+        self.assertIn('book.pdf: No such object', err.getvalue())
@@ -0,0 +1,180 @@
+from io import BytesIO, StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+
+import utils.test
+from books.models import Book, BookText
+from books.text import extract_text
+from core.models import Category
+from search import index
+
+
+def make_pdf(pages):
+    """Returns a PDF with a page showing each of the given strings"""
+    objects = [
+        '<< /Type /Catalog /Pages 2 0 R >>',
+        None,
+        '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    kids = []
+    for text in pages:
+        stream = 'BT /F1 12 Tf 72 720 Td ({}) Tj ET'.format(text)
+        objects.append('<< /Length {} >>\nstream\n{}\nendstream'.format(
+            len(stream), stream))
+        objects.append('<< /Type /Page /Parent 2 0 R '
+            '/MediaBox [0 0 612 792] /Contents {} 0 R '
+            '/Resources << /Font << /F1 3 0 R >> >> >>'.format(
+                len(objects)))
+        kids.append('{} 0 R'.format(len(objects)))
+    objects[1] = '<< /Type /Pages /Kids [{}] /Count {} >>'.format(
+        ' '.join(kids), len(kids))
+
+    pdf, offsets = b'%PDF-1.4\n', []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += '{} 0 obj\n{}\nendobj\n'.format(number, body).encode()
+    xref = len(pdf)
+    pdf += 'xref\n0 {}\n0000000000 65535 f \n'.format(
+        len(objects) + 1).encode()
+    for offset in offsets:
+        pdf += '{:010} 00000 n \n'.format(offset).encode()
+    pdf += 'trailer\n<< /Size {} /Root 1 0 R >>\nstartxref\n{}\n%%EOF\n'\
+        .format(len(objects) + 1, xref).encode()
+    return pdf
+
+
+class ExtractTextTestCase(TestCase):
+    """
+    Tests for extracting the text of PDFs
+    """
+    def test_extract_text(self):
+        """
+        Test that the text of every page is extracted
+        """
+        text, page_count = extract_text(BytesIO(
+            make_pdf(['Hydroponics basics', 'Nutrient film technique'])))
+        self.assertEqual(text,
+            'Hydroponics basics\n\nNutrient film technique')
+        self.assertEqual(page_count, 2)
+
+    def test_extract_text_stops_at_max_length(self):
+        """
+        Test that pages past the maximum length are skipped
+        """
+        text, page_count = extract_text(BytesIO(
+            make_pdf(['First page', 'Second page', 'Third page'])),
+            max_length=12)
+        self.assertEqual(text, 'First page')
+        self.assertEqual(page_count, 3)
+
+
+class BookTextTestCase(TestCase):
+    """
+    Tests for the extraction of uploaded book text
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        utils.test.set_up_test_files()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        utils.test.tear_down_test_files()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(
+            name='Agriculture',
+            slug='agriculture'
+        )
+        cls.author = get_user_model().objects.create_user(
+            first_name = 'Kelvin',
+            email='kelvin@murage.com',
+            password='kelvinpassword'
+        )
+
+    def upload(self, slug, pages):
+        with self.captureOnCommitCallbacks(execute=True):
+            book = Book.objects.create(
+                title=slug.replace('-', ' ').title(),
+                category=self.category,
+                slug=slug,
+                file_upload=SimpleUploadedFile('{}.pdf'.format(slug),
+                    make_pdf(pages), content_type='application/pdf')
+            )
+        return book
+
+    def test_text_extracted_on_upload(self):
+        """
+        Test that uploading a book stores its text and makes it
+        searchable
+        """
+        book = self.upload('farming-guide', ['Nutrient film technique'])
+        text = BookText.objects.get(book=book)
+        self.assertEqual(text.text, 'Nutrient film technique')
+        self.assertEqual(text.page_count, 1)
+        self.assertEqual(text.checksum, book.checksum)
+        self.assertEqual(text.error, '')
+        self.assertEqual([document.object_id
+            for document in index.search('nutrient')], [book.pk])
+
+    def test_text_not_extracted_when_file_unchanged(self):
+        """
+        Test that saving a book without a new upload doesn't
+        extract its text again
+        """
+        book = self.upload('farming-guide', ['Nutrient film technique'])
+        with self.captureOnCommitCallbacks() as callbacks:
+            book.title = 'A new title'
+            book.save()
+        self.assertEqual(callbacks, [])
+
+    def test_unreadable_file(self):
+        """
+        Test that the error of a file that can't be parsed is stored
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            book = Book.objects.create(
+                title='Broken',
+                category=self.category,
+                slug='broken',
+                file_upload=SimpleUploadedFile('broken.pdf',
+                    b'not a pdf', content_type='application/pdf')
+            )
+        text = BookText.objects.get(book=book)
+        self.assertEqual(text.text, '')
+        self.assertNotEqual(text.error, '')
+
+    def test_extract_book_text_command(self):
+        """
+        Test that the backfill extracts the text of books without it,
+        skips the ones already extracted and indexes the text
+        """
+        extracted = self.upload('farming-guide', ['Nutrient film'])
+        BookText.objects.filter(book=extracted).update(text='Kept')
+        missing = self.upload('greenhouse-guide', ['Drip irrigation'])
+        BookText.objects.filter(book=missing).delete()
+        changed = self.upload('fish-farming', ['Aquaponics'])
+        BookText.objects.filter(book=changed).update(checksum='old')
+
+        out = StringIO()
+        call_command('extract_book_text', workers=1, stdout=out,
+            stderr=StringIO())
+        self.assertIn('Extracted 2 books, 0 failed', out.getvalue())
+        self.assertEqual(
+            dict(BookText.objects.values_list('book__slug', 'text')),
+            {
+                'farming-guide': 'Kept',
+                'greenhouse-guide': 'Drip irrigation',
+                'fish-farming': 'Aquaponics',
+            })
+        self.assertEqual([document.object_id
+            for document in index.search('irrigation')], [missing.pk])
+
+        out = StringIO()
+        call_command('extract_book_text', workers=1, stdout=out)
+        self.assertIn('Extracted 0 books, 0 failed', out.getvalue())
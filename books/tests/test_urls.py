@@ -23,3 +23,28 @@ class BookURLsTestCase(TestCase):
             kwargs={'slug': 'the-hydroponics-handbook'}))
         self.assertEqual(book_details.func.__name__,
             'BookDetailView')
+
+    def test_book_group_list_urls(self):
+        """
+        Test that the URLs for books in a category or with a tag
+        resolve to the book list view
+        """
+        category_list = resolve(reverse('books_category',
+            kwargs={'category': 'spiritual'}))
+        self.assertEqual(category_list.func.__name__, 'BookListView')
+        self.assertEqual(category_list.kwargs, {'category': 'spiritual'})
+        tag_list = resolve(reverse('books_tag', kwargs={'tag': 'faith'}))
+        self.assertEqual(tag_list.func.__name__, 'BookListView')
+        self.assertEqual(tag_list.kwargs, {'tag': 'faith'})
+
+    def test_book_download_url(self):
+        """
+        Test that the URL for downloading a book resolves to the
+        download view
+        """
+        download = resolve(reverse('book_download',
+            kwargs={'slug': 'the-hydroponics-handbook'}))
+        self.assertEqual(download.func.__name__, 'BookDownloadView')
+        self.assertEqual(reverse('book_download',
+            kwargs={'slug': 'the-hydroponics-handbook'}),
+            '/books/the-hydroponics-handbook/download/')
@@ -1,8 +1,14 @@
+import os
+from unittest import mock
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import Http404
 from django.test import RequestFactory, TestCase, tag
 
 import utils.test
 from books.models import Book
+from books.views import BookListView
 from core.models import Category, Tag
 
 
@@ -157,6 +163,177 @@ class BookListViewTestCase(BookViewsTestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTrue(len(response.context['book_list']) == 3)
 
+    def test_invalid_page_numbers_not_found(self):
+        """
+        Test that page zero, negative pages and pages past any possible
+        offset are not found
+        """
+        self.client.login(email = 'christine@kyalo.com',
+            password = 'christinepassword'
+        )
+        for page in ('0', '-1', '99999999999999999999'):
+            response = self.client.get('/books/?page=' + page)
+            self.assertEqual(response.status_code, 404)
+
+    def test_book_list_query_count_is_constant(self):
+        """
+        Test that the book list view loads categories, tags and
+        authors eagerly so every page costs the same number of
+        queries regardless of how many books it shows
+        """
+        self.client.login(email = 'christine@kyalo.com',
+            password = 'christinepassword'
+        )
+        cache.clear()
+        # session, user, edit times, count, books, tags, authors, facet
+        # counts, cover variants and profile picture variants
+        with self.assertNumQueries(10):
+            response = self.client.get('/books/')
+            self.assertTrue(len(response.context['book_list']) == 6)
+        # the count, facet counts and profile picture variants are
+        # shared through the cache
+        with self.assertNumQueries(7):
+            response = self.client.get('/books/'+'?page=2')
+            self.assertTrue(len(response.context['book_list']) == 3)
+
+
+class BookListCursorPaginationTestCase(BookViewsTestCase):
+    """
+    Tests for the cursor pagination mode of the BookList view
+    """
+    def get_page(self, **params):
+        request = self.factory.get('/books/', params)
+        request.user = self.christine
+        view = BookListView.as_view(pagination_mode='cursor')
+        return view(request)
+
+    def test_first_page(self):
+        """
+        Test that the first page holds the latest books and links to
+        the next page only
+        """
+        response = self.get_page()
+        page = response.context_data['page_obj']
+        self.assertEqual(len(response.context_data['book_list']), 6)
+        self.assertTrue(response.context_data['is_paginated'])
+        self.assertTrue(page.has_next())
+        self.assertFalse(page.has_previous())
+        self.assertEqual(response.context_data['pagination_template'],
+            'pagination_cursor.html')
+        response.render()
+        self.assertContains(response, '?after=' + page.next_cursor)
+
+    def test_next_and_previous_pages(self):
+        """
+        Test that following the cursors walks the books in order
+        and back again
+        """
+        first_page = self.get_page().context_data['page_obj']
+        second_page = self.get_page(
+            after=first_page.next_cursor).context_data['page_obj']
+        self.assertEqual(len(second_page), 3)
+        self.assertFalse(second_page.has_next())
+        self.assertTrue(second_page.has_previous())
+
+        books = list(first_page) + list(second_page)
+        self.assertEqual(books, list(Book.objects.all()))
+
+        previous_page = self.get_page(
+            before=second_page.previous_cursor).context_data['page_obj']
+        self.assertEqual(list(previous_page), list(first_page))
+        self.assertFalse(previous_page.has_previous())
+        self.assertTrue(previous_page.has_next())
+
+    def test_deep_page_costs_the_same_as_first_page(self):
+        """
+        Test that no count query is made and later pages cost
+        the same number of queries as the first
+        """
+        cache.clear()
+        # edit times, books, tags, authors, facet counts and cover
+        # variants
+        with self.assertNumQueries(6):
+            first_page = self.get_page().context_data['page_obj']
+        # the facet counts are read from the cache
+        with self.assertNumQueries(5):
+            self.get_page(after=first_page.next_cursor)
+
+    def test_invalid_cursor(self):
+        """
+        Test that a malformed cursor results in a 404
+        """
+        with self.assertRaises(Http404):
+            self.get_page(after='not-a-cursor')
+
+
+class BookGroupListViewTestCase(BookViewsTestCase):
+    """
+    Tests for the category and tag lists of the BookList view
+    """
+    def setUp(self):
+        super().setUp()
+        self.client.login(email = 'christine@kyalo.com',
+            password = 'christinepassword'
+        )
+
+    def test_category_list(self):
+        """
+        Test that the category list only shows books in the category
+        """
+        response = self.client.get('/books/category/agribusiness/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['group'], self.agribusiness)
+        self.assertEqual(list(response.context['book_list']),
+            [self.the_hydroponics_handbook])
+        self.assertContains(response, 'in Agribusiness')
+
+        response = self.client.get('/books/category/spiritual/?page=2')
+        self.assertEqual(len(response.context['book_list']), 2)
+
+    def test_tag_list(self):
+        """
+        Test that the tag list only shows books with the tag
+        """
+        response = self.client.get('/books/tag/hydroponics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['book_list']),
+            [self.the_hydroponics_handbook])
+
+        response = self.client.get('/books/tag/faith/')
+        self.assertEqual(len(response.context['book_list']), 0)
+        self.assertContains(response, 'There are no books in Faith yet.')
+
+    def test_unknown_group_not_found(self):
+        """
+        Test that lists of unknown categories and tags are not found
+        """
+        response = self.client.get('/books/category/fiction/')
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get('/books/tag/fiction/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_sidebar_counts(self):
+        """
+        Test that the sidebar lists every category with its book count
+        """
+        cache.clear()
+        response = self.client.get('/books/category/spiritual/')
+        spiritual, agribusiness = (
+            response.context['facets']['category'][i] for i in (1, 0))
+        self.assertEqual(spiritual['count'], 8)
+        self.assertEqual(agribusiness['count'], 1)
+        self.assertContains(response,
+            'active" href="/books/category/spiritual/"')
+
+    def test_meta_links_to_group_lists(self):
+        """
+        Test that book cards link to their category and tag lists
+        """
+        response = self.client.get('/books/?page=2')
+        self.assertContains(response,
+            'href="/books/category/agribusiness/"')
+        self.assertContains(response, 'href="/books/tag/hydroponics/"')
+
 
 class BookDetailViewTestCase(BookViewsTestCase):
     """
@@ -183,3 +360,199 @@ class BookDetailViewTestCase(BookViewsTestCase):
         response = self.client.get('/books/the-hydroponics-handbook/')
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed('core/resource_list.html')
+
+
+class BookConditionalGetTestCase(BookViewsTestCase):
+    """
+    Tests for conditional GET support of the book views
+    """
+    def setUp(self):
+        super().setUp()
+        self.client.login(email = 'christine@kyalo.com',
+            password = 'christinepassword'
+        )
+
+    def test_detail_not_modified(self):
+        """
+        Test that revisiting an unchanged book page returns a 304
+        without rendering the template
+        """
+        url = '/books/the-hydroponics-handbook/'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+
+        with self.assertTemplateNotUsed('core/book.html'):
+            revisit = self.client.get(url,
+                HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revisit.status_code, 304)
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_detail_modified(self):
+        """
+        Test that editing a book, its tags or its author
+        invalidates the ETag of its page
+        """
+        url = '/books/the-hydroponics-handbook/'
+        etag = self.client.get(url)['ETag']
+
+        self.hydroponics.name = 'Aquaponics'
+        self.hydroponics.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response['ETag']
+        self.kelvin.first_name = 'Kevin'
+        self.kelvin.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_not_modified(self):
+        """
+        Test that revisiting an unchanged book list page returns
+        a 304 and that adding a book changes the page
+        """
+        response = self.client.get('/books/?page=2')
+        revisit = self.client.get('/books/?page=2',
+            HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revisit.status_code, 304)
+
+        Book.objects.create(
+            title='Prayer Devotion 8',
+            category=self.spiritual,
+            slug='prayer-devotion-8',
+            file_upload='prayer-devotion-8.pdf'
+        )
+        revisit = self.client.get('/books/?page=2',
+            HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revisit.status_code, 200)
+
+    def test_list_modified(self):
+        """
+        Test that editing the newest book changes the first list page
+        """
+        etag = self.client.get('/books/')['ETag']
+        book = Book.objects.get(slug='prayer-devotion-7')
+        book.title = 'Prayer Devotion Seven'
+        book.save()
+        response = self.client.get('/books/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_modified_by_deletion(self):
+        """
+        Test that deleting a book changes the first list page
+        """
+        etag = self.client.get('/books/')['ETag']
+        Book.objects.get(slug='prayer-devotion-7').delete()
+        response = self.client.get('/books/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_tag_change_modifies_page(self):
+        """
+        Test that removing a tag from a book changes its page
+        """
+        url = '/books/the-hydroponics-handbook/'
+        # the remaining tag was edited last
+        self.the_hydroponics_handbook.tags.add(self.faith)
+        etag = self.client.get(url)['ETag']
+        self.the_hydroponics_handbook.tags.remove(self.faith)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_sidebar_counts_modify_list(self):
+        """
+        Test that a book added to another category changes the
+        sidebar counts of a category page
+        """
+        url = '/books/category/agribusiness/'
+        etag = self.client.get(url)['ETag']
+        Book.objects.create(
+            title='Prayer Devotion 8',
+            category=self.spiritual,
+            slug='prayer-devotion-8',
+            file_upload='prayer-devotion-8.pdf'
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_signed_urls_expire_pages(self):
+        """
+        Test that pages holding signed media URLs are rendered again
+        before the URLs expire
+        """
+        url = '/books/the-hydroponics-handbook/'
+        with mock.patch('core.views.default_storage.url_max_age', 3600,
+            create=True), mock.patch('core.views.time') as clock:
+            clock.time.return_value = 7200
+            etag = self.client.get(url)['ETag']
+            clock.time.return_value = 7200 + 3599
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            clock.time.return_value = 7200 + 3600
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+
+    def test_deploy_modifies_pages(self):
+        """
+        Test that pages are rendered again after a deploy
+        """
+        etag = self.client.get('/books/')['ETag']
+        with self.settings(DEPLOY_VERSION='next'):
+            response = self.client.get('/books/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_missing_book(self):
+        """
+        Test that a missing book still results in a 404
+        """
+        response = self.client.get('/books/does-not-exist/')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
+
+
+class ExtractTextCronTestCase(TestCase):
+    """
+    Tests for resuming text extractions from App Engine cron
+    """
+    url = '/books/cron/extract-text/'
+
+    def setUp(self):
+        patcher = mock.patch.dict(os.environ, {'GAE_APPLICATION': 'ndovu'})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_refused_without_cron_header(self):
+        """
+        Test that only App Engine cron can run extractions
+        """
+        with mock.patch('books.views.call_command') as command:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+        command.assert_not_called()
+
+    def test_spoofed_header_refused_off_app_engine(self):
+        """
+        Test that the cron header is not trusted off App Engine, where
+        any client may set it
+        """
+        del os.environ['GAE_APPLICATION']
+        with mock.patch('books.views.call_command') as command:
+            response = self.client.get(self.url,
+                HTTP_X_APPENGINE_CRON='true')
+        self.assertEqual(response.status_code, 403)
+        command.assert_not_called()
+
+    def test_extractions_resumed(self):
+        """
+        Test that the command is run, retrying failures when asked
+        """
+        with mock.patch('books.views.call_command') as command:
+            response = self.client.get(self.url,
+                HTTP_X_APPENGINE_CRON='true')
+            self.client.get(self.url, {'retry_failed': '1'},
+                HTTP_X_APPENGINE_CRON='true')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([call.args for call in command.call_args_list], [
+            ('extract_book_text', '--workers', '1'),
+            ('extract_book_text', '--workers', '1', '--retry-failed'),
+        ])
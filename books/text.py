@@ -0,0 +1,117 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from pypdf import PdfReader
+from pypdf.errors import PyPdfError
+
+logger = logging.getLogger(__name__)
+
+# Extraction stops at this many characters, well below the 1MB limit
+# of a PostgreSQL tsvector built from the text
+MAX_TEXT_LENGTH = 500000
+
+# Runs the extractions scheduled by web processes one at a time, so
+# that uploads never wait for them and never compete for the CPU.
+# Its thread is only started by the first extraction.
+_executor = ThreadPoolExecutor(max_workers=1,
+    thread_name_prefix='book-text')
+
+
+def extract_text(file, max_length=MAX_TEXT_LENGTH):
+    """Extracts the text of a PDF one page at a time
+
+    Only the cross-reference table and the page being read are held
+    in memory, the rest of the file is read from its stream on demand.
+
+    Args:
+        file (file): A seekable binary file holding a PDF
+        max_length (int, optional): The number of characters after
+            which the remaining pages are skipped
+
+    Returns:
+        tuple: The text of the pages separated by blank lines and the
+            number of pages of the document
+    """
+    reader = PdfReader(file)
+    pages, length = [], 0
+    for page in reader.pages:
+        # PostgreSQL can't store NUL characters in text columns
+        text = (page.extract_text() or '').replace('\x00', '').strip()
+        if text:
+            pages.append(text)
+            length += len(text) + 2
+        if length >= max_length:
+            break
+    return '\n\n'.join(pages)[:max_length], len(reader.pages)
+
+
+def extract_file(name):
+    """Extracts the text of a stored book file
+
+    It doesn't touch the database so that it can run in worker
+    processes.
+
+    Args:
+        name (str): The name of the file in the default storage
+
+    Returns:
+        dict: The text, page_count and error (empty on success) to
+            store for the file
+    """
+    try:
+        with default_storage.open(name) as file:
+            text, page_count = extract_text(file)
+    except (OSError, PyPdfError, ValueError) as e:
+        return {'text': '', 'page_count': 0, 'error': str(e)[:200]}
+    return {'text': text, 'page_count': page_count, 'error': ''}
+
+
+def extract_book(pk):
+    """Extracts and stores the text of a book's file
+
+    Args:
+        pk (int): The primary key of the book
+    """
+    from .models import Book, BookText
+
+    book = Book.objects.filter(pk=pk).only(
+        'file_upload', 'checksum').first()
+    if book is None or not book.file_upload:
+        return
+    defaults = extract_file(book.file_upload.name)
+    if defaults['error']:
+        logger.warning('Could not extract the text of %s: %s',
+            book.file_upload.name, defaults['error'])
+    defaults['checksum'] = book.checksum
+    BookText.objects.update_or_create(book=book, defaults=defaults)
+
+
+def _run_extraction(pk):
+    try:
+        extract_book(pk)
+    except Exception:
+        logger.exception('Text extraction of book %s failed', pk)
+    finally:
+        # expire the thread's connection the way requests do
+        close_old_connections()
+
+
+def schedule_extraction(pk):
+    """Extracts the text of a book once the current transaction commits
+
+    The extraction runs in a background thread unless the
+    ``BOOK_TEXT_EXTRACTION_ASYNC`` setting is False.
+
+    Args:
+        pk (int): The primary key of the book
+    """
+    def run():
+        if getattr(settings, 'BOOK_TEXT_EXTRACTION_ASYNC', True):
+            _executor.submit(_run_extraction, pk)
+        else:
+            extract_book(pk)
+
+    transaction.on_commit(run)
@@ -4,5 +4,13 @@ from . import views
 
 urlpatterns = [
     path('', views.BookListView.as_view(), name='books'),
+    path('category/<slug:category>/', views.BookListView.as_view(),
+        name='books_category'),
+    path('tag/<slug:tag>/', views.BookListView.as_view(),
+        name='books_tag'),
+    path('cron/extract-text/', views.extract_text_cron,
+        name='book_text_cron'),
     path('<slug:slug>/', views.BookDetailView.as_view(), name='book'),
+    path('<slug:slug>/download/', views.BookDownloadView.as_view(),
+        name='book_download'),
 ]
\ No newline at end of file
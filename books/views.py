@@ -1,28 +1,72 @@
-from django.contrib.auth import get_user_model
+from io import StringIO
+
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import render
-from django.views.generic import DetailView, ListView
+from django.core.management import call_command
+from django.db.models import F
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.views.generic import DetailView, ListView, View
+
+from core.decorators import app_engine_cron
+from core.views import ResourceDetailMixin, ResourceListMixin
 
+from . import downloads
 from .models import Book
 
 
-class BookListView(LoginRequiredMixin, ListView):
+class BookListView(LoginRequiredMixin, ResourceListMixin, ListView):
     """
     Creates the book list page
     """
     model = Book
-    template_name = 'core/resource_list.html'
     paginate_by = 6
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['resources'] = 'books'
-        return context
+    resources = 'books'
+    count_strategy = 'estimate'
 
 
-class BookDetailView(LoginRequiredMixin, DetailView):
+class BookDetailView(LoginRequiredMixin, ResourceDetailMixin, DetailView):
     """
     Creates the book detail pages
     """
     model = Book
     template_name = 'core/book.html'
+
+
+class BookDownloadView(LoginRequiredMixin, View):
+    """
+    Downloads the file of a book, counting the download.
+
+    Requests for the rest of a file, as sent by resumed downloads and
+    PDF viewers, are not counted again.
+    """
+    def get(self, request, slug):
+        book = get_object_or_404(Book.objects.only('slug', 'last_edit',
+            'file_upload', 'content_type', 'checksum'), slug=slug)
+        if not book.file_upload:
+            raise Http404('That book has no file')
+        response = downloads.serve(request, book.file_upload,
+            book.content_type or 'application/octet-stream',
+            etag='"{}"'.format(book.checksum) if book.checksum else '',
+            last_modified=book.last_edit,
+            filename=book.get_download_filename())
+        # revalidations and failed requests send no file
+        if response.status_code in (200, 206, 302) and \
+            downloads.is_new_download(request):
+            Book.objects.filter(pk=book.pk).update(
+                download_count=F('download_count') + 1)
+        return response
+
+
+@app_engine_cron
+def extract_text_cron(request):
+    """
+    Resumes the text extractions lost with the instances running them,
+    requested by App Engine cron (see cron.yaml). ``?retry_failed=1``
+    also extracts again the files that failed before.
+    """
+    args = ['--workers', '1']
+    if request.GET.get('retry_failed'):
+        args.append('--retry-failed')
+    out = StringIO()
+    call_command('extract_book_text', *args, stdout=out, stderr=out)
+    return HttpResponse(out.getvalue(), content_type='text/plain')
@@ -57,8 +57,10 @@ THIRD_PARTY_APPS = [
 
 LOCAL_APPS = [
     'accounts',
+    'api',
     'books',
     'core',
+    'search',
     'videos',
 ]
 
@@ -157,6 +159,13 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 MEDIA_URL = "/media/"
 
+# Hash uploads while they are received, so that book files are
+# deduplicated without reading them again
+FILE_UPLOAD_HANDLERS = [
+    'utils.uploads.HashingMemoryFileUploadHandler',
+    'utils.uploads.HashingTemporaryFileUploadHandler',
+]
+
 
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/3.1/ref/settings/#static-files
@@ -198,6 +207,29 @@ CRISPY_TEMPLATE_PACK = 'bootstrap4'
 
 ADMIN_URL = 'admin/'
 
+# Versions the full-page cache so that each deploy starts cold.
+# App Engine sets GAE_VERSION to the version being served.
+DEPLOY_VERSION = decouple.config('GAE_VERSION', default='')
+
+# Extract the text of uploaded books in a background thread after the
+# upload is committed, instead of at the end of the request
+BOOK_TEXT_EXTRACTION_ASYNC = True
+
+# Resize uploaded book covers and profile pictures in a background
+# thread after the upload is committed
+IMAGE_VARIANTS_ASYNC = True
+
+# How book downloads from local storage are sent: None streams them
+# from Django, 'x-accel-redirect' hands them to nginx through the
+# internal location BOOK_DOWNLOAD_ACCEL_PREFIX serving MEDIA_ROOT, and
+# 'x-sendfile' hands them to Apache or lighttpd
+BOOK_DOWNLOAD_SENDFILE = decouple.config('BOOK_DOWNLOAD_SENDFILE',
+    default=None)
+BOOK_DOWNLOAD_ACCEL_PREFIX = '/protected-media/'
+
+# Seconds the signed URLs downloads are redirected to stay valid
+BOOK_DOWNLOAD_URL_EXPIRATION = 5 * 60
+
 HEADLESS_BROWSER_TESTS =  decouple.config('CI', cast=bool, default=False)
 
 # Location of files used for testing
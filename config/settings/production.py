@@ -1,4 +1,5 @@
 import os
+from datetime import timedelta
 
 from utils.config import list_of_tuples
 
@@ -26,6 +27,33 @@ if os.getenv('GAE_APPLICATION', None) and not DATABASES:
     }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/#memcached
+# Cached cards, counts, search results, signed URLs and the versions
+# invalidating them must be shared by every instance, or changes made
+# by one would never reach the others. MEMCACHED_LOCATION lists the
+# host:port of each node of a Memorystore for Memcached instance,
+# reached through a Serverless VPC Access connector. Without it, as when
+# collecting static files, the cache is local to the process.
+MEMCACHED_LOCATION = decouple.config('MEMCACHED_LOCATION', default='',
+    cast=decouple.Csv())
+
+if MEMCACHED_LOCATION:
+    CACHES = {
+        'default': {
+            'BACKEND':
+                'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': MEMCACHED_LOCATION,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
 
 # Third Party Apps Settings
 # =========================
@@ -41,6 +69,12 @@ GS_BUCKET_NAME =  decouple.config('GCP_STORAGE_BUCKET_NAME')
 ## files uploaded by another entity (user/ service account)
 # GS_DEFAULT_ACL = 'publicRead'
 
+# Media URLs are signed instead, and reused until an hour before they
+# expire (see utils.storages.MediaRootGoogleCloudStorage)
+GS_QUERYSTRING_AUTH = True
+
+GS_EXPIRATION = timedelta(days=1)
+
 
 # Django Settings that depend on 3rd party app settings
 # ------------------------------------------------------
@@ -15,3 +15,19 @@ EMAIL_HOST = 'localhost'
 EMAIL_PORT = 25
 
 MEDIA_ROOT = BASE_DIR / 'test_media'
+
+
+# Project Specific Settings
+# =========================
+
+# Tests can't see what background threads write to their transaction
+BOOK_TEXT_EXTRACTION_ASYNC = False
+
+IMAGE_VARIANTS_ASYNC = False
+
+
+# Third Party Apps Settings
+# =========================
+
+# Don't probe YouTube for the best thumbnail resolution during tests
+EMBED_VIDEO_YOUTUBE_CHECK_THUMBNAIL = False
@@ -27,9 +27,11 @@ admin_url = settings.ADMIN_URL + '/'
 
 urlpatterns = [
     path('accounts/', include('accounts.urls')),
+    path('api/', include('api.urls')),
     path(admin_url + 'doc/', include('django.contrib.admindocs.urls')),
     path(admin_url, admin.site.urls),
     path('books/', include('books.urls')),
+    path('search/', include('search.urls')),
     path('videos/', include('videos.urls')),
     path('', include('core.urls')),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
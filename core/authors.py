@@ -0,0 +1,75 @@
+from django.apps import apps
+from django.core.cache import cache
+
+from utils.cache import HitCounter
+
+# The models whose resources are listed on author pages
+AUTHORED_MODELS = ('books.Book', 'videos.Video')
+
+AUTHOR_CACHE_TIMEOUT = 60 * 60 * 24
+
+author_stats = HitCounter('authors')
+
+
+def authored_models():
+    return [apps.get_model(label) for label in AUTHORED_MODELS]
+
+
+def counts_key(pk):
+    """Returns the cache key of the resource counts of an author"""
+    return 'author:{}:counts'.format(pk)
+
+
+def authored(model, author):
+    """Returns the resources of a type by an author
+
+    The resources are selected with a subquery on the authors through
+    table rather than a join, so the database can walk the resources
+    newest first and stop after a page, however many the author has.
+
+    Args:
+        model (Model): Book or Video
+        author (User): The author, or their primary key
+
+    Returns:
+        QuerySet: The author's resources
+    """
+    through = model.authors.through
+    return model.objects.filter(pk__in=through.objects.filter(
+        user=author).values(model._meta.model_name))
+
+
+def get_counts(pk):
+    """Returns how many resources of each type an author has
+
+    The counts are read from the through tables' author index and
+    cached until the author's resources change.
+
+    Args:
+        pk (int): The primary key of the author
+
+    Returns:
+        dict: Resource counts keyed by model name
+    """
+    key = counts_key(pk)
+    counts = cache.get(key)
+    if counts is not None:
+        author_stats.hit()
+        return counts
+    author_stats.miss()
+    counts = {
+        model._meta.model_name: model.authors.through.objects.filter(
+            user=pk).count()
+        for model in authored_models()
+    }
+    cache.set(key, counts, AUTHOR_CACHE_TIMEOUT)
+    return counts
+
+
+def invalidate(pks):
+    """Drops the cached counts of some authors
+
+    Args:
+        pks (iterable): Primary keys of the authors
+    """
+    cache.delete_many([counts_key(pk) for pk in pks])
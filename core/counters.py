@@ -0,0 +1,76 @@
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+
+from utils.cache import bump_version
+
+from .models import Counter
+
+# Maps each counter to the model whose rows it counts
+COUNTED_MODELS = {
+    'books': 'books.Book',
+    'videos': 'videos.Video',
+    'users': settings.AUTH_USER_MODEL,
+}
+
+
+def counter_for(model):
+    """Returns the name of the counter kept for a model, if any"""
+    for name, label in COUNTED_MODELS.items():
+        if model._meta.label == label:
+            return name
+    return None
+
+
+def get_counts():
+    """Returns the value of every counter in a single query
+
+    Returns:
+        dict: Counter values keyed by counter name
+    """
+    counts = dict.fromkeys(COUNTED_MODELS, 0)
+    counts.update(Counter.objects.filter(
+        name__in=COUNTED_MODELS).values_list('name', 'value'))
+    return counts
+
+
+def increment(name, delta=1):
+    """Adds delta to a counter, creating it if it doesn't exist yet
+
+    Args:
+        name (str): The name of the counter
+        delta (int, optional): The amount to add. Defaults to 1.
+    """
+    updated = Counter.objects.filter(name=name).update(
+        value=F('value') + delta)
+    if not updated:
+        reconcile()
+    else:
+        # drop the cached homepage showing the old counts
+        bump_version('counters')
+
+
+def reconcile():
+    """Recomputes every counter from the tables they count
+
+    The counts are taken in one pass with a single statement so
+    that they are consistent with each other.
+
+    Returns:
+        dict: Counter values keyed by counter name
+    """
+    subqueries = ', '.join(
+        '(SELECT COUNT(*) FROM {})'.format(connection.ops.quote_name(
+            apps.get_model(label)._meta.db_table))
+        for label in COUNTED_MODELS.values()
+    )
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT ' + subqueries)
+            counts = dict(zip(COUNTED_MODELS, cursor.fetchone()))
+        for name, value in counts.items():
+            Counter.objects.update_or_create(name=name,
+                defaults={'value': value})
+    bump_version('counters')
+    return counts
@@ -0,0 +1,161 @@
+import hashlib
+import os
+import re
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+from utils.cache import HitCounter, get_version
+
+PAGE_CACHE_TIMEOUT = 60 * 10
+
+# Request headers that change the content of a page
+PAGE_VARY_HEADERS = ('HTTP_ACCEPT_LANGUAGE',)
+
+CSRF_PLACEHOLDER = b'__csrf_token__'
+CSRF_INPUT = re.compile(
+    rb'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+
+page_stats = HitCounter('pages')
+
+
+def _is_cacheable_request(request):
+    """
+    Only anonymous GET and HEAD requests without a session or
+    pending flash messages share pages
+    """
+    return (
+        request.method in ('GET', 'HEAD')
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and CookieStorage.cookie_name not in request.COOKIES
+    )
+
+
+def _is_cacheable_response(response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+    )
+
+
+def page_key(request, versions=()):
+    """Returns the cache key of the page requested
+
+    The key covers the URL, the request headers that change the page,
+    the deployed version of the site and the given named versions.
+
+    Args:
+        request (HttpRequest): The request for the page
+        versions (tuple, optional): Names of versions from
+            `utils.cache` that the page depends on
+
+    Returns:
+        str: The cache key
+    """
+    parts = [request.get_host(), request.get_full_path(),
+        settings.DEPLOY_VERSION]
+    parts += [request.META.get(header, '') for header in PAGE_VARY_HEADERS]
+    parts += [get_version(name) for name in versions]
+    digest = hashlib.md5('\n'.join(parts).encode()).hexdigest()
+    return 'page:{}'.format(digest)
+
+
+def _freeze(response):
+    """
+    Returns a picklable copy of a response with the CSRF token of
+    its form swapped for a placeholder
+    """
+    content = CSRF_INPUT.sub(rb'\1' + CSRF_PLACEHOLDER + rb'\2',
+        response.content)
+    return response.status_code, list(response.items()), content
+
+
+def _thaw(request, frozen):
+    """
+    Rebuilds a cached response, filling in the CSRF token of the
+    requesting visitor
+    """
+    status, headers, content = frozen
+    if CSRF_PLACEHOLDER in content:
+        token = get_token(request).encode()
+        content = content.replace(CSRF_PLACEHOLDER, token)
+    response = HttpResponse(content, status=status)
+    for header, value in headers:
+        response[header] = value
+    return response
+
+
+def cache_anonymous_page(timeout=PAGE_CACHE_TIMEOUT, versions=()):
+    """Caches the whole response of a view for anonymous visitors
+
+    Visitors holding a session cookie, and other request methods, are
+    always passed through to the view. The keys are versioned on the
+    deployed version of the site, so a deploy starts with a cold cache,
+    and on the given named versions, so bumping one of them with
+    `utils.cache.bump_version` drops every page that depends on it.
+
+    Args:
+        timeout (int, optional): Seconds to keep each page for
+        versions (tuple, optional): Names of versions from
+            `utils.cache` that the page depends on
+
+    Returns:
+        function: The view decorator
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not _is_cacheable_request(request):
+                return view(request, *args, **kwargs)
+
+            key = page_key(request, versions)
+            frozen = cache.get(key)
+            if frozen is not None:
+                page_stats.hit()
+                return _thaw(request, frozen)
+
+            page_stats.miss()
+            response = view(request, *args, **kwargs)
+            if not _is_cacheable_response(response):
+                return response
+
+            def store(response):
+                cache.set(key, _freeze(response), timeout)
+
+            if hasattr(response, 'add_post_render_callback'):
+                # class-based views return unrendered template responses
+                response.add_post_render_callback(store)
+            else:
+                store(response)
+            return response
+        return wrapper
+    return decorator
+
+
+def app_engine_cron(view):
+    """Only lets App Engine cron requests through to a view
+
+    App Engine strips the ``X-Appengine-Cron`` header from requests
+    made from outside, but other hosts, such as gunicorn behind the
+    Procfile, pass it on as sent. The header is thus only trusted when
+    the site runs on App Engine.
+
+    Args:
+        view (function): The view run by cron
+
+    Returns:
+        function: The view, raising PermissionDenied for other requests
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not os.environ.get('GAE_APPLICATION') or \
+            request.headers.get('X-Appengine-Cron') != 'true':
+            raise PermissionDenied
+        return view(request, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,144 @@
+from django.core.cache import cache
+from django.db.models import CharField, Count, Value
+
+from utils.cache import HitCounter, bump_version
+
+from .models import Category, Tag
+
+# The kinds of group resources are counted by
+FACET_KINDS = ('category', 'tag')
+
+FACET_CACHE_TIMEOUT = 60 * 60 * 24
+
+facet_stats = HitCounter('facets')
+
+
+def groups_key(model):
+    """Returns the cache key of the groups listed for a resource type"""
+    return 'facets:{}'.format(model._meta.label_lower)
+
+
+def version_name(model):
+    """
+    Returns the name of the version of the counts of a resource type,
+    bumped whenever any of them changes
+    """
+    return 'facets:{}'.format(model._meta.label_lower)
+
+
+def count_key(model, kind, pk):
+    """Returns the cache key of the count of resources in a group"""
+    return 'facet:{}:{}:{}'.format(model._meta.label_lower, kind, pk)
+
+
+def _facet_query(model):
+    """
+    Builds a single query counting the resources of a type in every
+    category and every tag, empty groups included
+    """
+    name = model._meta.model_name
+    tag_query_name = model._meta.get_field('tags').related_query_name()
+    columns = ('kind', 'pk', 'name', 'slug', 'count')
+    categories = Category.objects.order_by().annotate(
+        kind=Value('category', output_field=CharField()),
+        count=Count(name),
+    ).values_list(*columns)
+    tags = Tag.objects.order_by().annotate(
+        kind=Value('tag', output_field=CharField()),
+        count=Count(tag_query_name),
+    ).values_list(*columns)
+    return categories.union(tags, all=True)
+
+
+def compute_facets(model):
+    """Counts the resources of a type per group and caches the counts
+
+    The group names and slugs are cached together, and every count
+    under its own key so that it can be adjusted atomically.
+
+    Args:
+        model (Model): Book or Video
+
+    Returns:
+        dict: Lists of groups keyed by kind, see `get_facets`
+    """
+    groups = {kind: [] for kind in FACET_KINDS}
+    counts = {}
+    for kind, pk, name, slug, count in _facet_query(model):
+        groups[kind].append((pk, name, slug))
+        counts[count_key(model, kind, pk)] = count
+    cache.set_many(counts, FACET_CACHE_TIMEOUT)
+    cache.set(groups_key(model), groups, FACET_CACHE_TIMEOUT)
+    return _with_counts(model, groups, counts)
+
+
+def _with_counts(model, groups, counts):
+    return {
+        kind: sorted((
+            {
+                'pk': pk,
+                'name': name,
+                'slug': slug,
+                'count': counts[count_key(model, kind, pk)],
+            }
+            for pk, name, slug in groups[kind]
+        ), key=lambda group: group['name'].lower())
+        for kind in FACET_KINDS
+    }
+
+
+def get_facets(model):
+    """Returns how many resources of a type are in each group
+
+    The counts are read from the cache in two round trips, and are
+    only counted in the database when the cache has lost them.
+
+    Args:
+        model (Model): Book or Video
+
+    Returns:
+        dict: For each kind of group, a list of dicts holding the pk,
+            name, slug and resource count of every group sorted by
+            name
+    """
+    groups = cache.get(groups_key(model))
+    if groups is not None:
+        keys = [count_key(model, kind, pk)
+            for kind in FACET_KINDS for pk, name, slug in groups[kind]]
+        counts = cache.get_many(keys)
+        if len(counts) == len(keys):
+            facet_stats.hit()
+            return _with_counts(model, groups, counts)
+    facet_stats.miss()
+    return compute_facets(model)
+
+
+def adjust(model, kind, pks, delta):
+    """Adds delta to the counts of some groups
+
+    A count missing from the cache makes the next read recount.
+
+    Args:
+        model (Model): Book or Video
+        kind (str): 'category' or 'tag'
+        pks (iterable): Primary keys of the groups
+        delta (int): The amount to add to each count
+    """
+    adjusted = False
+    for pk in pks:
+        if pk is None or not delta:
+            continue
+        try:
+            cache.incr(count_key(model, kind, pk), delta)
+        except ValueError:
+            invalidate(model)
+            return
+        adjusted = True
+    if adjusted:
+        bump_version(version_name(model))
+
+
+def invalidate(model):
+    """Makes the next read recount the groups of a resource type"""
+    cache.delete(groups_key(model))
+    bump_version(version_name(model))
@@ -0,0 +1,118 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db.models import Prefetch
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from utils.cache import HitCounter
+
+from . import images
+from .models import Tag
+
+CARD_TEMPLATES = {
+    'books.book': 'core/book-card.html',
+    'videos.video': 'core/video-card.html',
+}
+
+CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+card_stats = HitCounter('cards')
+
+
+def card_queryset(queryset):
+    """
+    Loads the category of each resource in the same query and
+    prefetches only the tag and author columns rendered by
+    ``core/meta.html``, so that cards missing from the cache cost the
+    same number of queries however many there are
+    """
+    return queryset.select_related(
+        'category'
+    ).prefetch_related(
+        Prefetch('tags', queryset=Tag.objects.only('name', 'slug')),
+        Prefetch('authors',
+            queryset=get_user_model().objects.only('first_name')
+        ),
+    )
+
+
+def card_key(model, slug):
+    """Returns the cache key of a resource card
+
+    The key covers the deployed version of the site, so a deploy
+    changing the card templates starts with a cold cache.
+    """
+    return 'card:{}:{}:{}'.format(settings.DEPLOY_VERSION,
+        model._meta.label_lower, slug)
+
+
+def card_timeout():
+    """Returns how long cards are cached
+
+    Cards hold media URLs, so when the storage signs URLs that expire
+    cards are dropped before the URLs they hold stop working.
+    """
+    max_age = getattr(default_storage, 'url_max_age', None)
+    if max_age is None:
+        return CARD_CACHE_TIMEOUT
+    return min(CARD_CACHE_TIMEOUT, max_age)
+
+
+def _version(resource):
+    return resource.last_edit.timestamp()
+
+
+def get_cards(resources):
+    """Fetches the cached cards of many resources in one round trip
+
+    Cards rendered before the resource's last edit are ignored.
+
+    Args:
+        resources (list): Book or Video instances
+
+    Returns:
+        dict: Rendered cards keyed by resource key
+    """
+    keys = {card_key(type(resource), resource.slug): resource
+        for resource in resources}
+    cached = cache.get_many(keys)
+    cards = {
+        key: html for key, (version, html) in cached.items()
+        if version == _version(keys[key])
+    }
+    card_stats.hit(len(cards))
+    card_stats.miss(len(keys) - len(cards))
+    # look up the images of the cards left to render in one batch
+    images.prefetch(
+        resource for key, resource in keys.items() if key not in cards)
+    return cards
+
+
+def render_card(resource, cards=None):
+    """Returns the card of a resource, rendering and caching it if needed
+
+    Args:
+        resource (object): A Book or Video instance
+        cards (dict, optional): Cards already fetched with `get_cards`
+    """
+    key = card_key(type(resource), resource.slug)
+    if cards is not None and key in cards:
+        return mark_safe(cards[key])
+
+    opts = resource._meta
+    html = render_to_string(CARD_TEMPLATES[opts.label_lower],
+        {opts.model_name: resource})
+    cache.set(key, (_version(resource), html), card_timeout())
+    return mark_safe(html)
+
+
+def invalidate_cards(model, slugs):
+    """Drops the cached cards of the given resources
+
+    Args:
+        model (class): The Book or Video model
+        slugs (iterable): Slugs of the resources
+    """
+    cache.delete_many([card_key(model, slug) for slug in slugs])
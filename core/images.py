@@ -0,0 +1,333 @@
+import hashlib
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.dispatch import Signal
+from PIL import Image, ImageOps
+
+from utils.cache import HitCounter
+
+from .models import ImageVariant
+
+logger = logging.getLogger(__name__)
+
+# Maps each model to its image fields that get resized variants
+IMAGE_FIELDS = {
+    'books.Book': ('cover_image',),
+    'accounts.User': ('profile_picture',),
+}
+
+# Images narrower than a width are only re-encoded at their own width
+VARIANT_WIDTHS = (160, 320, 640, 1280)
+
+ENCODER_OPTIONS = {
+    'webp': {'quality': 80, 'method': 4},
+    'jpeg': {'quality': 82, 'optimize': True, 'progressive': True},
+    'png': {'optimize': True},
+}
+
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg', 'png': 'png'}
+
+VARIANT_CACHE_TIMEOUT = 60 * 60 * 24
+
+RENDER_ERRORS = (OSError, ValueError, Image.DecompressionBombError)
+
+variant_stats = HitCounter('images')
+
+# Sent with the name of an image once its variants are stored
+variants_stored = Signal()
+
+# Resizes the images uploaded by web processes one at a time, like
+# the text extraction of books
+_executor = ThreadPoolExecutor(max_workers=1,
+    thread_name_prefix='image-variants')
+
+
+def image_models():
+    return [(apps.get_model(label), fields)
+        for label, fields in IMAGE_FIELDS.items()]
+
+
+def image_names(objects):
+    """Returns the names of the images of some objects that get variants
+
+    Args:
+        objects (iterable): Model instances, such as books
+
+    Returns:
+        set: The names of their uploaded images
+    """
+    names = set()
+    for obj in objects:
+        for field in IMAGE_FIELDS.get(obj._meta.label, ()):
+            if getattr(obj, field):
+                names.add(getattr(obj, field).name)
+    return names
+
+
+def variant_widths(width):
+    """Returns the widths of the variants of an image
+
+    Args:
+        width (int): The width of the original image
+
+    Returns:
+        list: The widths, narrowest first
+    """
+    widths = [size for size in VARIANT_WIDTHS if size < width]
+    if len(widths) < len(VARIANT_WIDTHS):
+        widths.append(width)
+    return widths
+
+
+def variant_name(source, width, format):
+    """Returns the storage name of a variant
+
+    Args:
+        source (str): The name of the original image
+        width (int): The width of the variant
+        format (str): The format of the variant
+
+    The whole file name of the original is kept, so that images only
+    differing by their extension never share variants.
+
+    Returns:
+        str: Such as ``book_covers/variants/cover.png-320w.webp``
+    """
+    directory, filename = posixpath.split(source)
+    return posixpath.join(directory, 'variants', '{}-{}w.{}'.format(
+        filename, width, EXTENSIONS[format]))
+
+
+def render_variants(source):
+    """Resizes an image and saves its variants to the storage
+
+    Every width is saved as WebP and as JPEG, or as PNG for images
+    with transparency, for browsers without WebP support.
+
+    Args:
+        source (str): The name of the image in the default storage
+
+    Returns:
+        list: The format, width, height and file of each variant
+
+    Raises:
+        OSError: The image could not be read or saved
+    """
+    with default_storage.open(source) as file:
+        image = Image.open(file)
+        image.load()
+    # phone cameras store rotated pixels and an orientation tag
+    image = ImageOps.exif_transpose(image)
+    transparent = image.mode in ('RGBA', 'LA') or (
+        image.mode == 'P' and 'transparency' in image.info)
+    image = image.convert('RGBA' if transparent else 'RGB')
+    fallback = 'png' if transparent else 'jpeg'
+
+    variants = []
+    for width in variant_widths(image.width):
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize(
+            (width, height), Image.LANCZOS)
+        for format in ('webp', fallback):
+            buffer = BytesIO()
+            resized.save(buffer, format.upper(), **ENCODER_OPTIONS[format])
+            name = variant_name(source, width, format)
+            # variant names are unique to their original, so a file
+            # there is a variant of an earlier file with its name
+            if default_storage.exists(name):
+                default_storage.delete(name)
+            variants.append({
+                'format': format,
+                'width': width,
+                'height': height,
+                'file': default_storage.save(name,
+                    ContentFile(buffer.getvalue())),
+            })
+    return variants
+
+
+def render_file(source):
+    """Resizes a stored image, catching the errors of unreadable images
+
+    It doesn't touch the database so that it can run in worker
+    processes.
+
+    Args:
+        source (str): The name of the image in the default storage
+
+    Returns:
+        dict: The variants to store and the error (empty on success)
+    """
+    try:
+        return {'variants': render_variants(source), 'error': ''}
+    except RENDER_ERRORS as e:
+        return {'variants': [], 'error': str(e)}
+
+
+def variants_key(source):
+    """Returns the cache key of the variants of an image"""
+    return 'image:{}:variants'.format(
+        hashlib.md5(source.encode()).hexdigest())
+
+
+def store_variants(source, variants):
+    """Replaces the variants recorded for an image
+
+    Args:
+        source (str): The name of the original image
+        variants (list): The variants returned by `render_variants`
+    """
+    with transaction.atomic():
+        ImageVariant.objects.filter(source=source).delete()
+        ImageVariant.objects.bulk_create([
+            ImageVariant(source=source, **variant) for variant in variants
+        ])
+    cache.delete(variants_key(source))
+    variants_stored.send(sender=ImageVariant, source=source)
+
+
+def generate(source):
+    """Resizes an image and records its variants
+
+    Args:
+        source (str): The name of the image in the default storage
+
+    Returns:
+        int: The number of variants, or None if the image could not
+            be resized
+    """
+    result = render_file(source)
+    if result['error']:
+        logger.warning('Could not resize %s: %s', source, result['error'])
+        return None
+    store_variants(source, result['variants'])
+    return len(result['variants'])
+
+
+def _run_generation(source):
+    try:
+        generate(source)
+    except Exception:
+        logger.exception('Resizing %s failed', source)
+    finally:
+        close_old_connections()
+
+
+def schedule(source):
+    """Resizes an image once the current transaction commits
+
+    The image is resized in a background thread unless the
+    ``IMAGE_VARIANTS_ASYNC`` setting is False.
+
+    Args:
+        source (str): The name of the image in the default storage
+    """
+    def run():
+        if getattr(settings, 'IMAGE_VARIANTS_ASYNC', True):
+            _executor.submit(_run_generation, source)
+        else:
+            generate(source)
+
+    transaction.on_commit(run)
+
+
+def get_variants(sources):
+    """Fetches the variants of many images in one cache round trip
+
+    Images without variants are cached too, so that pages showing
+    them don't query the database until they are resized.
+
+    Args:
+        sources (iterable): Names of original images
+
+    Returns:
+        dict: (format, width, height, file name) tuples, narrowest
+            first, keyed by image name
+    """
+    keys = {variants_key(source): source for source in sources}
+    if not keys:
+        return {}
+    cached = cache.get_many(keys)
+    variant_stats.hit(len(cached))
+    variant_stats.miss(len(keys) - len(cached))
+    variants = {keys[key]: value for key, value in cached.items()}
+    missing = [source for source in keys.values() if source not in variants]
+    if missing:
+        for source in missing:
+            variants[source] = []
+        for row in ImageVariant.objects.filter(source__in=missing).order_by(
+            'width').values_list('source', 'format', 'width', 'height',
+            'file'):
+            variants[row[0]].append(row[1:])
+        cache.set_many({variants_key(source): variants[source]
+            for source in missing}, VARIANT_CACHE_TIMEOUT)
+    return variants
+
+
+def file_urls(names):
+    """Returns the URLs of stored files
+
+    Storages that sign URLs sign the files not signed yet at once.
+
+    Args:
+        names (iterable): Names of files in the default storage
+
+    Returns:
+        dict: The URLs keyed by file name
+    """
+    if hasattr(default_storage, 'urls'):
+        return default_storage.urls(names)
+    return {name: default_storage.url(name) for name in names}
+
+
+def prefetch(objects):
+    """Looks up the variants of the images of some objects and their
+    URLs in one batch, so that rendering each is served from caches
+
+    Args:
+        objects (iterable): Model instances, such as books
+    """
+    variants = get_variants(image_names(objects))
+    file_urls(variant[3] for values in variants.values()
+        for variant in values)
+
+
+def _srcset(variants, urls):
+    return ', '.join('{} {}w'.format(urls[name], width)
+        for format, width, height, name in variants)
+
+
+def srcsets(source):
+    """Returns what an image element needs to pick a variant
+
+    Args:
+        source (str): The name of the original image
+
+    Returns:
+        dict: The ``webp`` and ``fallback`` srcsets, and the ``src``,
+            ``width`` and ``height`` of the widest fallback variant,
+            or None if the image has no variants yet
+    """
+    variants = get_variants([source])[source]
+    webp = [variant for variant in variants if variant[0] == 'webp']
+    fallback = [variant for variant in variants if variant[0] != 'webp']
+    if not fallback:
+        return None
+    urls = file_urls(variant[3] for variant in variants)
+    format, width, height, name = fallback[-1]
+    return {
+        'webp': _srcset(webp, urls),
+        'fallback': _srcset(fallback, urls),
+        'src': urls[name],
+        'width': width,
+        'height': height,
+    }
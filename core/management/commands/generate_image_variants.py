@@ -0,0 +1,56 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from core import images
+from core.models import ImageVariant
+
+
+class Command(BaseCommand):
+    help = ('Resizes the book covers and profile pictures that have no '
+        'variants yet, such as those uploaded before variants existed. '
+        'Each batch is stored as it completes, so an interrupted run '
+        'resumes where it stopped.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int,
+            default=os.cpu_count(),
+            help='Number of images resized in parallel processes')
+        parser.add_argument('--batch-size', type=int, default=50,
+            help='Number of images resized between progress reports')
+        parser.add_argument('--force', action='store_true',
+            help='Resize the images that already have variants too')
+
+    def handle(self, *args, **options):
+        sources = set()
+        for model, fields in images.image_models():
+            for field in fields:
+                sources.update(model.objects.exclude(
+                    **{field: ''}).values_list(field, flat=True).distinct())
+        if not options['force']:
+            sources -= set(ImageVariant.objects.values_list(
+                'source', flat=True).distinct())
+        sources = sorted(sources)
+        resized = failed = 0
+        batch_size = options['batch_size']
+
+        # resizing is CPU bound so it runs in processes, which only
+        # read and write files and leave the database to this one
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            for start in range(0, len(sources), batch_size):
+                batch = sources[start:start + batch_size]
+                for source, result in zip(batch,
+                    pool.map(images.render_file, batch)):
+                    if result['error']:
+                        failed += 1
+                        self.stderr.write('{}: {}'.format(
+                            source, result['error']))
+                    else:
+                        resized += 1
+                        images.store_variants(source, result['variants'])
+                self.stdout.write('Resized {} of {} images'.format(
+                    resized + failed, len(sources)))
+
+        self.stdout.write(self.style.SUCCESS(
+            'Resized {} images, {} failed'.format(resized, failed)))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core import counters
+
+
+class Command(BaseCommand):
+    help = ('Recomputes the site-wide counters from the tables they count. '
+        'Schedule it periodically to correct drift caused by bulk '
+        'operations that bypass model signals.')
+
+    def handle(self, *args, **options):
+        counts = counters.reconcile()
+        for name, value in counts.items():
+            self.stdout.write('{}: {}'.format(name, value))
+        self.stdout.write(self.style.SUCCESS('Counters reconciled'))
@@ -0,0 +1,42 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def seed_counters(apps, schema_editor):
+    Counter = apps.get_model('core', 'Counter')
+    counted_models = {
+        'books': apps.get_model('books', 'Book'),
+        'videos': apps.get_model('videos', 'Video'),
+        'users': apps.get_model(settings.AUTH_USER_MODEL),
+    }
+    Counter.objects.bulk_create([
+        Counter(name=name, value=model.objects.count())
+        for name, model in counted_models.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_auto_20210211_1237'),
+        ('books', '0001_initial'),
+        ('videos', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Counter',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=30, unique=True)),
+                ('value', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
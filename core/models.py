@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.db import models
+from django.urls import reverse
 from django.utils import timezone
 
 
@@ -67,11 +68,46 @@ class Resource(ResourcesBaseModel):
 
     class Meta:
         abstract = True
-        ordering = ['-date_posted']
+        ordering = ['-date_posted', '-id']
+        indexes = [
+            # Backs the ordering above and keyset (cursor) pagination
+            models.Index(fields=['date_posted', 'id'],
+                name='%(app_label)s_%(class)s_posted_idx'),
+            # Backs the same ordering within a category
+            models.Index(fields=['category', 'date_posted', 'id'],
+                name='%(app_label)s_%(class)s_cat_posted_idx'),
+        ]
+
+    # Relations read by get_search_text, loaded along with resources
+    # being indexed for search
+    search_related = ()
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember the category the resource is counted in
+        instance._saved_category_id = instance.__dict__.get('category_id')
+        return instance
+
+    @property
+    def list_url_name(self):
+        """
+        The URL name of the list of resources of this type, suffixed
+        with ``_category`` or ``_tag`` for the filtered lists
+        """
+        return '{}s'.format(self._meta.model_name)
+
+    def get_category_url(self):
+        return reverse(self.list_url_name + '_category',
+            kwargs={'category': self.category.slug})
+
+    @property
+    def tag_url_name(self):
+        return self.list_url_name + '_tag'
+
     def display_tags(self):
         """
         Create a string for the Tags to be displayed in
@@ -83,3 +119,52 @@ class Resource(ResourcesBaseModel):
         return ', '.join(tag.name for tag in tags[:3]) + ' ...'
 
     display_tags.short_description = 'Tags'
+
+    def get_search_text(self):
+        """
+        Returns text to search besides the title, summary,
+        category and tags
+        """
+        return ''
+
+
+class Counter(models.Model):
+    """
+    Model for site-wide totals maintained by signals so that
+    they can be read without counting rows
+    """
+    name = models.CharField(max_length=30, unique=True)
+    value = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return '{}: {}'.format(self.name, self.value)
+
+
+class ImageVariant(models.Model):
+    """
+    Model for a resized copy of an uploaded image, such as a book
+    cover or profile picture.
+
+    Variants are keyed by the name of the original file rather than
+    the object it belongs to, so that images shared by many objects,
+    like the default cover, are only resized once.
+    """
+    source = models.CharField(max_length=255,
+        help_text='The name of the original image in the storage')
+    format = models.CharField(max_length=10)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    file = models.FileField(max_length=255)
+
+    class Meta:
+        ordering = ['source', 'format', 'width']
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'format', 'width'],
+                name='core_image_variant_unique_size'),
+        ]
+
+    def __str__(self):
+        return self.file.name
@@ -0,0 +1,435 @@
+import base64
+import binascii
+import hashlib
+import heapq
+import json
+from collections.abc import Sequence
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import (EmptyPage, InvalidPage, Page,
+    PageNotAnInteger, Paginator)
+from django.db import connections, models
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+class CursorPage(Sequence):
+    """
+    A page of results returned by CursorPaginator
+    """
+    def __init__(self, object_list, paginator, next_cursor=None,
+        previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return '<Cursor page of {} objects>'.format(len(self))
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Paginates a queryset by seeking past a cursor instead of counting
+    the rows and skipping them with OFFSET.
+
+    A cursor is an opaque token holding the ordering values of a row.
+    The next page holds the rows after the last row of the current
+    page, so every page costs one range scan of the ordering index no
+    matter how deep it is, and no total count is ever computed.
+
+    Args:
+        object_list (QuerySet): The queryset to paginate
+        per_page (int): The number of rows on each page
+        ordering (tuple): Field names that uniquely order the rows,
+            prefixed with '-' for descending order
+    """
+    def __init__(self, object_list, per_page,
+        ordering=('-date_posted', '-id')):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+
+    def _fields(self):
+        return [field.lstrip('-') for field in self.ordering]
+
+    def encode_cursor(self, obj):
+        """Returns the cursor pointing at the given object
+
+        Args:
+            obj (object): A model instance from the paginated queryset
+
+        Returns:
+            str: A URL-safe token
+        """
+        values = []
+        for name in self._fields():
+            value = getattr(obj, name)
+            if hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            values.append(value)
+        token = json.dumps(values, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(token).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """Returns the ordering values held by a cursor
+
+        Args:
+            cursor (str): A token created by `encode_cursor`
+
+        Raises:
+            InvalidPage: If the cursor is malformed
+
+        Returns:
+            list: The ordering values, converted to Python types
+        """
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded))
+            if len(values) != len(self.ordering):
+                raise ValueError
+            opts = self.object_list.model._meta
+            return [
+                opts.get_field(name).to_python(value)
+                for name, value in zip(self._fields(), values)
+            ]
+        except (binascii.Error, TypeError, ValueError, ValidationError):
+            raise InvalidPage('That cursor is not valid')
+
+    def _seek(self, values, forwards):
+        """
+        Builds the filter selecting the rows that come after (or
+        before) the given ordering values
+        """
+        condition = Q()
+        equal = {}
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            descending = field.startswith('-')
+            lookup = 'lt' if descending == forwards else 'gt'
+            condition |= Q(**equal, **{'{}__{}'.format(name, lookup): value})
+            equal[name] = value
+        return condition
+
+    def _reversed_ordering(self):
+        return [
+            field[1:] if field.startswith('-') else '-' + field
+            for field in self.ordering
+        ]
+
+    def page(self, after=None, before=None):
+        """Returns a page of results
+
+        Args:
+            after (str, optional): Cursor of the row preceding the page
+            before (str, optional): Cursor of the row following the page
+
+        Raises:
+            InvalidPage: If a cursor is malformed
+
+        Returns:
+            CursorPage: The requested page
+        """
+        queryset = self.object_list
+        if before:
+            queryset = queryset.filter(
+                self._seek(self.decode_cursor(before), forwards=False)
+            ).order_by(*self._reversed_ordering())
+        else:
+            if after:
+                queryset = queryset.filter(
+                    self._seek(self.decode_cursor(after), forwards=True)
+                )
+            queryset = queryset.order_by(*self.ordering)
+
+        # fetch one extra row to find out if there is another page
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if before:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or before:
+                next_cursor = self.encode_cursor(rows[-1])
+            if (has_more and before) or after:
+                previous_cursor = self.encode_cursor(rows[0])
+        return CursorPage(rows, self, next_cursor, previous_cursor)
+
+
+class MergedCursorPaginator:
+    """
+    Paginates the newest rows of several querysets as one stream,
+    ordered by ``(date_posted, type, id)`` with the newest first.
+
+    Each page reads at most ``per_page + 1`` rows from every queryset
+    with a range scan of its ``(date_posted, id)`` index. The rows are
+    merged with a k-way merge, so neither the tables nor a union of
+    them is ever sorted. The type breaks ties between rows of
+    different querysets posted at the same time.
+
+    Args:
+        querysets (dict): Querysets keyed by the type name given to
+            their rows in cursors
+        per_page (int): The number of rows on each page
+    """
+    def __init__(self, querysets, per_page):
+        self.querysets = querysets
+        self.per_page = int(per_page)
+        self.types = {queryset.model: name
+            for name, queryset in querysets.items()}
+
+    def sort_key(self, obj):
+        return (obj.date_posted, self.types[type(obj)], obj.pk)
+
+    def encode_cursor(self, obj):
+        """Returns the cursor pointing at the given row
+
+        Args:
+            obj (object): A model instance from one of the querysets
+
+        Returns:
+            str: A URL-safe token
+        """
+        date_posted, name, pk = self.sort_key(obj)
+        token = json.dumps([date_posted.isoformat(), name, pk],
+            separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(token).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """Returns the sort key held by a cursor
+
+        Args:
+            cursor (str): A token created by `encode_cursor`
+
+        Raises:
+            InvalidPage: If the cursor is malformed
+
+        Returns:
+            tuple: The date posted, type name and primary key
+        """
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            date_posted, name, pk = json.loads(
+                base64.urlsafe_b64decode(padded))
+            date_posted = models.DateTimeField().to_python(date_posted)
+            if name not in self.querysets or date_posted is None or \
+                not isinstance(pk, int):
+                raise ValueError
+            return date_posted, name, pk
+        except (binascii.Error, TypeError, ValueError, ValidationError):
+            raise InvalidPage('That cursor is not valid')
+
+    def _seek(self, name, cursor):
+        """
+        Builds the filter selecting the rows of a queryset that sort
+        after the cursor
+        """
+        date_posted, cursor_name, pk = cursor
+        if name < cursor_name:
+            return Q(date_posted__lte=date_posted)
+        if name > cursor_name:
+            return Q(date_posted__lt=date_posted)
+        return Q(date_posted__lt=date_posted) | Q(
+            date_posted=date_posted, pk__lt=pk)
+
+    def page(self, after=None):
+        """Returns a page of results
+
+        Args:
+            after (str, optional): Cursor of the row preceding the page
+
+        Raises:
+            InvalidPage: If the cursor is malformed
+
+        Returns:
+            CursorPage: The requested page
+        """
+        cursor = self.decode_cursor(after) if after else None
+        streams = []
+        for name, queryset in self.querysets.items():
+            if cursor:
+                queryset = queryset.filter(self._seek(name, cursor))
+            # one extra row from each queryset tells whether there is
+            # another page
+            streams.append(list(queryset.order_by('-date_posted', '-id')[
+                :self.per_page + 1]))
+
+        rows = list(heapq.merge(*streams, key=self.sort_key, reverse=True))
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        next_cursor = self.encode_cursor(rows[-1]) if has_more else None
+        return CursorPage(rows, self, next_cursor)
+
+
+def estimated_count(queryset):
+    """Returns the row count the database planner estimates for a table
+
+    Only unfiltered querysets can be estimated, and only PostgreSQL and
+    MySQL keep statistics that are cheap to read.
+
+    Args:
+        queryset (QuerySet): The queryset to estimate
+
+    Returns:
+        int: The estimated count, or None if it can't be estimated
+    """
+    if queryset.query.has_filters():
+        return None
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    if connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples FROM pg_class WHERE oid = %s::regclass'
+    elif connection.vendor == 'mysql':
+        sql = ('SELECT table_rows FROM information_schema.tables '
+            'WHERE table_schema = DATABASE() AND table_name = %s')
+    else:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [table])
+        row = cursor.fetchone()
+    # tables that have never been analysed report -1 or nothing
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class WindowedPage(Page):
+    """
+    A page that knows whether another page follows it without
+    relying on the total count
+    """
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+    @property
+    def num_pages(self):
+        """
+        The number of pages, corrected when the total is an
+        estimate that falls short of the current page
+        """
+        return max(self.paginator.num_pages,
+            self.number + int(self._has_next))
+
+    def page_window(self):
+        """Returns the page numbers to link to around this page
+
+        The first and last pages are always included, as are
+        ``paginator.window`` pages on each side of the current one.
+        Gaps are marked with None. The last page is left out when the
+        total is only an estimate.
+
+        Returns:
+            list: Page numbers and None for each gap
+        """
+        window = self.paginator.window
+        num_pages = self.num_pages
+        left = max(self.number - window, 1)
+        right = min(self.number + window, num_pages)
+
+        pages = [1, None] if left > 3 else list(range(1, left))
+        pages += range(left, right + 1)
+        if self.paginator.count_is_estimate:
+            if right < num_pages:
+                pages.append(None)
+        elif right < num_pages - 2:
+            pages += [None, num_pages]
+        else:
+            pages += range(right + 1, num_pages + 1)
+        return pages
+
+
+class WindowedPaginator(Paginator):
+    """
+    Paginates without an exact count and links to a bounded window
+    of pages.
+
+    Pages are sliced directly and fetch one extra row to find out
+    whether another page follows, so the total is only needed for
+    display. It can come from one of these count strategies:
+
+    * ``'exact'``: ``COUNT(*)`` on every request
+    * ``'cached'``: ``COUNT(*)`` shared through the cache for
+      ``count_cache_timeout`` seconds
+    * ``'estimate'``: the database planner's statistics on PostgreSQL
+      and MySQL, falling back to ``'cached'`` elsewhere
+
+    Orphans are not supported.
+    """
+    count_strategies = ('exact', 'cached', 'estimate')
+
+    def __init__(self, object_list, per_page, orphans=0,
+        allow_empty_first_page=True, count_strategy='exact', window=2,
+        count_cache_timeout=300):
+        super().__init__(object_list, per_page, 0, allow_empty_first_page)
+        if count_strategy not in self.count_strategies:
+            raise ValueError(
+                'Unknown count strategy: {}'.format(count_strategy))
+        self.count_strategy = count_strategy
+        self.window = window
+        self.count_cache_timeout = count_cache_timeout
+        self.count_is_estimate = False
+
+    def _exact_count(self):
+        try:
+            return self.object_list.count()
+        except (AttributeError, TypeError):
+            return len(self.object_list)
+
+    @cached_property
+    def count(self):
+        if self.count_strategy == 'estimate':
+            estimate = estimated_count(self.object_list)
+            if estimate is not None:
+                self.count_is_estimate = True
+                return estimate
+        if self.count_strategy in ('cached', 'estimate'):
+            query = str(self.object_list.query).encode()
+            key = 'count:{}'.format(hashlib.md5(query).hexdigest())
+            return cache.get_or_set(key, self._exact_count,
+                self.count_cache_timeout)
+        return self._exact_count()
+
+    def validate_number(self, number):
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        # offsets must fit the 64 bit integers of SQL LIMIT clauses
+        if number * self.per_page >= 2 ** 63:
+            raise EmptyPage('That page contains no results')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage('That page contains no results')
+        return WindowedPage(rows[:self.per_page], number, self,
+            has_next=len(rows) > self.per_page)
@@ -0,0 +1,257 @@
+from django.apps import apps
+from django.conf import settings
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+    pre_delete, pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from utils.cache import bump_version
+
+from . import authors, counters, facets, fragments, images
+
+RESOURCE_MODELS = ('books.Book', 'videos.Video')
+
+
+def resource_models():
+    return [apps.get_model(label) for label in RESOURCE_MODELS]
+
+
+@receiver(post_save, sender='books.Book')
+@receiver(post_save, sender='videos.Video')
+@receiver(post_save, sender='accounts.User')
+def count_created(sender, instance, created, **kwargs):
+    """Increments the counter of a newly created object"""
+    if created:
+        counters.increment(counters.counter_for(sender))
+
+
+@receiver(post_delete, sender='books.Book')
+@receiver(post_delete, sender='videos.Video')
+@receiver(post_delete, sender='accounts.User')
+def count_deleted(sender, instance, **kwargs):
+    """Decrements the counter of a deleted object"""
+    counters.increment(counters.counter_for(sender), -1)
+
+
+@receiver(post_save, sender='books.Book')
+@receiver(post_save, sender='videos.Video')
+@receiver(post_delete, sender='books.Book')
+@receiver(post_delete, sender='videos.Video')
+def invalidate_resource_card(sender, instance, **kwargs):
+    """Drops the cached card of a changed resource"""
+    fragments.invalidate_cards(sender, [instance.slug])
+
+
+@receiver(post_save, sender='core.Category')
+def invalidate_category_cards(sender, instance, **kwargs):
+    """Drops the cached cards of the resources in a changed category"""
+    for model in resource_models():
+        fragments.invalidate_cards(model, model.objects.filter(
+            category=instance).values_list('slug', flat=True))
+
+
+@receiver(post_save, sender='core.Tag')
+@receiver(pre_delete, sender='core.Tag')
+def invalidate_tag_cards(sender, instance, **kwargs):
+    """Drops the cached cards of the resources with a changed tag"""
+    for model in resource_models():
+        fragments.invalidate_cards(model, model.objects.filter(
+            tags=instance).values_list('slug', flat=True))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_author_cards(sender, instance, update_fields=None,
+    **kwargs):
+    """
+    Drops the cached cards of the resources by a changed author and
+    the ETags of pages showing author names
+    """
+    # logging in saves last_login only, which pages don't show
+    if update_fields and 'first_name' not in update_fields:
+        return
+    bump_version('authors')
+    for model in resource_models():
+        fragments.invalidate_cards(model, model.objects.filter(
+            authors=instance).values_list('slug', flat=True))
+
+
+@receiver(m2m_changed, sender='books.Book_tags')
+@receiver(m2m_changed, sender='books.Book_authors')
+@receiver(m2m_changed, sender='videos.Video_tags')
+@receiver(m2m_changed, sender='videos.Video_authors')
+def invalidate_m2m_cards(sender, instance, action, reverse, model, pk_set,
+    **kwargs):
+    """
+    Marks resources whose tags or authors change as edited, and drops
+    their cached cards
+    """
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    # the ETags of their pages are derived from their edit times
+    now = timezone.now()
+    if not reverse:
+        type(instance).objects.filter(pk=instance.pk).update(last_edit=now)
+        instance.last_edit = now
+        fragments.invalidate_cards(type(instance), [instance.slug])
+        return
+
+    # the instance is a tag or user and model is the resource model
+    if pk_set is None:
+        field = next(field for field in model._meta.many_to_many
+            if field.remote_field.through is sender)
+        resources = model.objects.filter(**{field.name: instance})
+    else:
+        resources = model.objects.filter(pk__in=pk_set)
+    resources.update(last_edit=now)
+    fragments.invalidate_cards(model,
+        resources.values_list('slug', flat=True))
+
+
+@receiver(post_save, sender='books.Book')
+@receiver(post_save, sender='videos.Video')
+def count_category_facet(sender, instance, created, **kwargs):
+    """Moves a saved resource between the counts of its categories"""
+    if created:
+        facets.adjust(sender, 'category', [instance.category_id], 1)
+    else:
+        saved = getattr(instance, '_saved_category_id', None)
+        # instances loaded without their category can't be tracked
+        if saved is not None and saved != instance.category_id:
+            facets.adjust(sender, 'category', [saved], -1)
+            facets.adjust(sender, 'category', [instance.category_id], 1)
+    instance._saved_category_id = instance.category_id
+
+
+@receiver(pre_delete, sender='books.Book')
+@receiver(pre_delete, sender='videos.Video')
+def collect_facet_tags(sender, instance, **kwargs):
+    """
+    Remembers the tags of a resource about to be deleted, since the
+    through rows are deleted without m2m_changed
+    """
+    instance._facet_tags = list(instance.tags.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender='books.Book')
+@receiver(post_delete, sender='videos.Video')
+def uncount_facets(sender, instance, **kwargs):
+    """Removes a deleted resource from the counts of its groups"""
+    facets.adjust(sender, 'category', [instance.category_id], -1)
+    facets.adjust(sender, 'tag', getattr(instance, '_facet_tags', []), -1)
+
+
+@receiver(m2m_changed, sender='books.Book_tags')
+@receiver(m2m_changed, sender='videos.Video_tags')
+def count_tag_facets(sender, instance, action, reverse, model, pk_set,
+    **kwargs):
+    """Adjusts the tag counts as resources are tagged and untagged"""
+    resource_model = model if reverse else type(instance)
+    resource_field = resource_model._meta.model_name
+
+    if action == 'post_add':
+        # pk_set only holds the newly related objects here
+        if reverse:
+            facets.adjust(resource_model, 'tag', [instance.pk],
+                len(pk_set))
+        else:
+            facets.adjust(resource_model, 'tag', pk_set, 1)
+    elif action in ('pre_remove', 'pre_clear'):
+        # pk_set may hold objects that aren't related, so the rows
+        # about to be removed are looked up
+        rows = sender.objects.filter(
+            **{'tag' if reverse else resource_field: instance})
+        if pk_set is not None:
+            other = resource_field if reverse else 'tag'
+            rows = rows.filter(**{other + '__in': pk_set})
+        instance._facet_removed = list(rows.values_list('tag', flat=True))
+    elif action in ('post_remove', 'post_clear'):
+        removed = getattr(instance, '_facet_removed', [])
+        if reverse:
+            facets.adjust(resource_model, 'tag', [instance.pk],
+                -len(removed))
+        else:
+            facets.adjust(resource_model, 'tag', removed, -1)
+
+
+@receiver(post_save, sender='core.Category')
+@receiver(post_save, sender='core.Tag')
+@receiver(post_delete, sender='core.Category')
+@receiver(post_delete, sender='core.Tag')
+def invalidate_facets(sender, instance, **kwargs):
+    """
+    Recounts the groups of every resource type when a group is
+    created, renamed or deleted
+    """
+    for model in resource_models():
+        facets.invalidate(model)
+
+
+@receiver(m2m_changed, sender='books.Book_authors')
+@receiver(m2m_changed, sender='videos.Video_authors')
+def invalidate_author_counts(sender, instance, action, reverse, model,
+    pk_set, **kwargs):
+    """Drops the cached counts of authors gaining or losing resources"""
+    if reverse:
+        # the instance is the author
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            authors.invalidate([instance.pk])
+    elif action == 'pre_clear':
+        instance._counted_authors = list(
+            instance.authors.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        authors.invalidate(getattr(instance, '_counted_authors', []))
+    elif action in ('post_add', 'post_remove'):
+        authors.invalidate(pk_set)
+
+
+@receiver(pre_delete, sender='books.Book')
+@receiver(pre_delete, sender='videos.Video')
+def collect_counted_authors(sender, instance, **kwargs):
+    """Remembers the authors of a resource about to be deleted"""
+    instance._counted_authors = list(
+        instance.authors.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender='books.Book')
+@receiver(post_delete, sender='videos.Video')
+def uncount_authors(sender, instance, **kwargs):
+    """Drops the cached counts of the authors of a deleted resource"""
+    authors.invalidate(getattr(instance, '_counted_authors', []))
+
+
+@receiver(pre_save, sender='books.Book')
+@receiver(pre_save, sender=settings.AUTH_USER_MODEL)
+def collect_uploaded_images(sender, instance, raw=False, **kwargs):
+    """Remembers the image fields holding new uploads"""
+    if raw:
+        return
+    # files are written to the storage after pre_save
+    instance._uploaded_images = [
+        field for field in images.IMAGE_FIELDS[sender._meta.label]
+        if getattr(instance, field) and
+        not getattr(instance, field)._committed
+    ]
+
+
+@receiver(post_save, sender='books.Book')
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def resize_uploaded_images(sender, instance, raw=False, **kwargs):
+    """Schedules the resizing of newly uploaded images"""
+    for field in getattr(instance, '_uploaded_images', []):
+        images.schedule(getattr(instance, field).name)
+    instance._uploaded_images = []
+
+
+@receiver(images.variants_stored)
+def invalidate_image_cards(sender, source, **kwargs):
+    """
+    Drops the cached cards showing an image as uploaded before it was
+    resized
+    """
+    for model, fields in images.image_models():
+        if model._meta.label_lower not in fragments.CARD_TEMPLATES:
+            continue
+        for field in fields:
+            fragments.invalidate_cards(model, model.objects.filter(
+                **{field: source}).values_list('slug', flat=True))
@@ -0,0 +1,54 @@
+from django import template
+
+from core import fragments, images
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def resource_card(context, resource):
+    """Renders the card of a Book or Video
+
+    Uses the cards batch-fetched into the ``card_fragments`` context
+    variable when available and renders (then caches) the rest.
+    """
+    return fragments.render_card(resource, context.get('card_fragments'))
+
+
+@register.simple_tag
+def page_window(page):
+    """Returns the page numbers to link to from a page
+
+    Windowed pages give a bounded window with None marking gaps.
+    Other pages give every page number.
+    """
+    if hasattr(page, 'page_window'):
+        return page.page_window()
+    return list(page.paginator.page_range)
+
+
+@register.inclusion_tag('core/picture.html')
+def responsive_image(image, sizes, alt='', css_class='', lazy=False):
+    """Renders an image letting the browser pick its best variant
+
+    Emits WebP and fallback ``srcset`` candidates for the ``sizes``
+    the image is shown at, with the width and height of the image so
+    that the page doesn't shift while it loads. Images not resized
+    yet are shown as uploaded.
+
+    Args:
+        image (FieldFile): The uploaded image, such as a book cover
+        sizes (str): The ``sizes`` attribute, such as ``"150px"``
+        alt (str, optional): The alternative text
+        css_class (str, optional): The class of the image element
+        lazy (bool, optional): Whether to load the image only once it
+            nears the viewport
+    """
+    return {
+        'image': image,
+        'variants': images.srcsets(image.name) if image else None,
+        'sizes': sizes,
+        'alt': alt,
+        'css_class': css_class,
+        'lazy': lazy,
+    }
@@ -0,0 +1,81 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from books.models import Book
+from core import counters
+from core.models import Category, Counter
+from videos.models import Video
+
+
+class CountersTestCase(TestCase):
+    """
+    Tests for the site-wide counters
+    """
+    def setUp(self):
+        self.category = Category.objects.create(
+            name='Spiritual',
+            slug='spiritual'
+        )
+
+    def test_counters_follow_creation_and_deletion(self):
+        """
+        Test that creating and deleting objects updates the counters
+        """
+        book = Book.objects.create(
+            title='Prayer Devotion',
+            category=self.category,
+            slug='prayer-devotion',
+            file_upload='prayer-devotion.pdf'
+        )
+        Video.objects.create(
+            title='The Gift',
+            category=self.category,
+            slug='the-gift',
+            url='https://youtu.be/rAKLiE658m0'
+        )
+        get_user_model().objects.create_user(
+            first_name = 'Kelvin',
+            email='kelvin@murage.com',
+            password='kelvinpassword'
+        )
+        self.assertEqual(counters.get_counts(),
+            {'books': 1, 'videos': 1, 'users': 1})
+
+        book.save()
+        self.assertEqual(counters.get_counts()['books'], 1)
+
+        book.delete()
+        self.assertEqual(counters.get_counts()['books'], 0)
+
+    def test_missing_counter_is_recreated(self):
+        """
+        Test that incrementing a missing counter recomputes it
+        """
+        Counter.objects.all().delete()
+        Book.objects.create(
+            title='Prayer Devotion',
+            category=self.category,
+            slug='prayer-devotion',
+            file_upload='prayer-devotion.pdf'
+        )
+        self.assertEqual(Counter.objects.get(name='books').value, 1)
+
+    def test_reconcile_counters_command(self):
+        """
+        Test that the reconcile_counters command corrects drift
+        """
+        Book.objects.bulk_create([
+            Book(title='Book {}'.format(i), slug='book-{}'.format(i),
+                category=self.category, file_upload='book.pdf')
+            for i in range(3)
+        ])
+        self.assertEqual(counters.get_counts()['books'], 0)
+
+        out = StringIO()
+        call_command('reconcile_counters', stdout=out)
+        self.assertIn('books: 3', out.getvalue())
+        self.assertEqual(counters.get_counts(),
+            {'books': 3, 'videos': 0, 'users': 0})
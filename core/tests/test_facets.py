@@ -0,0 +1,148 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from books.models import Book
+from core import facets
+from core.models import Category, Tag
+from videos.models import Video
+
+
+class FacetCountsTestCase(TestCase):
+    """
+    Tests for the cached category and tag counts
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.spiritual = Category.objects.create(
+            name='Spiritual',
+            slug='spiritual'
+        )
+        cls.agribusiness = Category.objects.create(
+            name='Agribusiness',
+            slug='agribusiness'
+        )
+        cls.faith = Tag.objects.create(
+            name='Faith',
+            slug='faith'
+        )
+        cls.hydroponics = Tag.objects.create(
+            name='Hydroponics',
+            slug='hydroponics'
+        )
+        cls.devotion = Book.objects.create(
+            title='Prayer Devotion',
+            category=cls.spiritual,
+            slug='prayer-devotion',
+            file_upload='prayer-devotion.pdf'
+        )
+        cls.devotion.tags.add(cls.faith)
+
+    def setUp(self):
+        cache.clear()
+
+    def counts(self, model=Book):
+        """Returns the cached counts by kind and slug"""
+        return {
+            kind: {group['slug']: group['count'] for group in groups}
+            for kind, groups in facets.get_facets(model).items()
+        }
+
+    def assertCountsCorrect(self, model=Book):
+        """Checks that the cached counts match a recount"""
+        cached = self.counts(model)
+        cache.clear()
+        self.assertEqual(cached, self.counts(model))
+
+    def test_counts_read_from_cache(self):
+        """
+        Test that every group is counted in one query and later reads
+        come from the cache
+        """
+        with self.assertNumQueries(1):
+            self.assertEqual(self.counts(), {
+                'category': {'agribusiness': 0, 'spiritual': 1},
+                'tag': {'faith': 1, 'hydroponics': 0},
+            })
+        with self.assertNumQueries(0):
+            self.counts()
+        self.assertEqual(self.counts(Video), {
+            'category': {'agribusiness': 0, 'spiritual': 0},
+            'tag': {'faith': 0, 'hydroponics': 0},
+        })
+
+    def test_counts_sorted_by_name(self):
+        """
+        Test that groups are listed alphabetically with their details
+        """
+        categories = facets.get_facets(Book)['category']
+        self.assertEqual(categories[0], {
+            'pk': self.agribusiness.pk,
+            'name': 'Agribusiness',
+            'slug': 'agribusiness',
+            'count': 0,
+        })
+        self.assertEqual(categories[1]['name'], 'Spiritual')
+
+    def test_resources_added_moved_and_deleted(self):
+        """
+        Test that creating, recategorising and deleting resources
+        adjusts the cached counts
+        """
+        self.counts()
+        book = Book.objects.create(
+            title='The Hydroponics handbook',
+            category=self.agribusiness,
+            slug='the-hydroponics-handbook',
+            file_upload='book.pdf'
+        )
+        book.tags.add(self.hydroponics, self.faith)
+        self.assertEqual(self.counts(), {
+            'category': {'agribusiness': 1, 'spiritual': 1},
+            'tag': {'faith': 2, 'hydroponics': 1},
+        })
+
+        devotion = Book.objects.get(pk=self.devotion.pk)
+        devotion.category = self.agribusiness
+        devotion.save()
+        self.assertEqual(self.counts()['category'],
+            {'agribusiness': 2, 'spiritual': 0})
+
+        book.delete()
+        self.assertEqual(self.counts(), {
+            'category': {'agribusiness': 1, 'spiritual': 0},
+            'tag': {'faith': 1, 'hydroponics': 0},
+        })
+        self.assertCountsCorrect()
+
+    def test_tags_changed_from_either_side(self):
+        """
+        Test that tagging and untagging from the resource or the tag
+        adjusts the cached counts
+        """
+        self.counts()
+        self.devotion.tags.remove(self.faith, self.hydroponics)
+        self.assertEqual(self.counts()['tag'],
+            {'faith': 0, 'hydroponics': 0})
+
+        self.devotion.tags.set([self.faith, self.hydroponics])
+        self.faith.books_book_tags.clear()
+        self.assertEqual(self.counts()['tag'],
+            {'faith': 0, 'hydroponics': 1})
+
+        self.faith.books_book_tags.add(self.devotion)
+        self.devotion.tags.clear()
+        self.assertEqual(self.counts()['tag'],
+            {'faith': 0, 'hydroponics': 0})
+        self.assertCountsCorrect()
+
+    def test_groups_created_and_deleted(self):
+        """
+        Test that new and deleted groups are reflected in the counts
+        """
+        self.counts()
+        Tag.objects.create(name='Salvation', slug='salvation')
+        self.assertEqual(self.counts()['tag']['salvation'], 0)
+
+        self.faith.delete()
+        self.assertNotIn('faith', self.counts()['tag'])
+        self.assertCountsCorrect()
@@ -0,0 +1,145 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from books.models import Book
+from core import fragments
+from core.models import Category, Tag
+
+
+class CardFragmentCacheTestCase(TestCase):
+    """
+    Tests for the resource card fragment cache
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        cls.kelvin = cls.User.objects.create_superuser(
+            first_name = 'Kelvin',
+            email='kelvin@murage.com',
+            password='kelvinpassword'
+        )
+        cls.spiritual = Category.objects.create(
+            name='Spiritual',
+            slug='spiritual'
+        )
+        cls.faith = Tag.objects.create(
+            name='Faith',
+            slug='faith'
+        )
+        cls.book = Book.objects.create(
+            title='Prayer Devotion',
+            category=cls.spiritual,
+            slug='prayer-devotion',
+            file_upload='prayer-devotion.pdf'
+        )
+        cls.book.authors.add(cls.kelvin)
+
+    def setUp(self):
+        cache.clear()
+        self.client.login(email='kelvin@murage.com',
+            password='kelvinpassword')
+
+    def get_cards(self):
+        return fragments.get_cards(list(Book.objects.all()))
+
+    def test_cards_cached_after_rendering(self):
+        """
+        Test that rendering a list page caches its cards and the
+        next page view is served from the cache
+        """
+        self.assertEqual(self.get_cards(), {})
+        self.client.get('/books/')
+        cards = self.get_cards()
+        self.assertEqual(len(cards), 1)
+        self.assertIn('Prayer Devotion', list(cards.values())[0])
+
+        fragments.card_stats.reset()
+        self.client.get('/books/')
+        self.assertEqual(fragments.card_stats.stats(),
+            {'hits': 1, 'misses': 0, 'ratio': 1.0})
+
+    def test_card_stats_buffered(self):
+        """
+        Test that card lookups are counted without writing to the shared
+        cache on every page view
+        """
+        self.client.get('/books/')
+        fragments.card_stats.reset()
+        with mock.patch.object(fragments.card_stats, '_incr') as incr:
+            self.client.get('/books/')
+            self.client.get('/books/')
+        incr.assert_not_called()
+        self.assertEqual(fragments.card_stats.stats()['hits'], 2)
+
+    def test_deploy_invalidates_card(self):
+        """
+        Test that cards cached by a previous deploy are not served
+        """
+        with self.settings(DEPLOY_VERSION='1'):
+            self.client.get('/books/')
+        with self.settings(DEPLOY_VERSION='2'):
+            fragments.card_stats.reset()
+            self.client.get('/books/')
+        self.assertEqual(fragments.card_stats.stats()['misses'], 1)
+
+    def test_resource_edit_invalidates_card(self):
+        """
+        Test that editing a resource invalidates its card
+        """
+        self.client.get('/books/')
+        self.book.title = 'Morning Prayers'
+        self.book.save()
+        self.assertEqual(self.get_cards(), {})
+        self.assertContains(self.client.get('/books/'), 'Morning Prayers')
+
+    def test_related_changes_invalidate_card(self):
+        """
+        Test that changing a resource's category, tags or authors
+        invalidates its card
+        """
+        self.client.get('/books/')
+        self.book.tags.add(self.faith)
+        self.assertEqual(self.get_cards(), {})
+        self.assertContains(self.client.get('/books/'), 'faith')
+
+        self.faith.name = 'Hope'
+        self.faith.save()
+        self.assertEqual(self.get_cards(), {})
+        self.assertContains(self.client.get('/books/'), 'hope')
+
+        self.spiritual.name = 'Devotional'
+        self.spiritual.save()
+        self.assertEqual(self.get_cards(), {})
+        self.assertContains(self.client.get('/books/'), 'Devotional')
+
+        self.kelvin.first_name = 'Kevin'
+        self.kelvin.save()
+        self.assertEqual(self.get_cards(), {})
+        self.assertContains(self.client.get('/books/'), 'Kevin')
+
+        self.client.get('/books/')
+        self.faith.books_book_tags.clear()
+        self.assertEqual(self.get_cards(), {})
+
+    def test_cache_stats_view(self):
+        """
+        Test that staff can read the cache statistics
+        """
+        response = self.client.get('/stats/cache/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('cards', response.json())
+
+    def test_cards_expire_before_signed_urls(self):
+        """
+        Test that cards aren't cached for longer than the media URLs
+        they hold stay valid
+        """
+        self.assertEqual(fragments.card_timeout(),
+            fragments.CARD_CACHE_TIMEOUT)
+        with mock.patch('core.fragments.default_storage',
+            SimpleNamespace(url_max_age=3600)):
+            self.assertEqual(fragments.card_timeout(), 3600)
@@ -0,0 +1,201 @@
+from io import BytesIO, StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase
+from PIL import Image
+
+import utils.test
+from books.models import Book
+from core import fragments, images
+from core.models import Category, ImageVariant
+
+
+def make_image(width, height, format='JPEG', mode='RGB'):
+    """Returns the bytes of a blank image"""
+    buffer = BytesIO()
+    Image.new(mode, (width, height)).save(buffer, format)
+    return buffer.getvalue()
+
+
+class ImageVariantsTestCase(TestCase):
+    """
+    Tests for resizing uploaded images
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        utils.test.set_up_test_files()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        utils.test.tear_down_test_files()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(
+            name='Agriculture',
+            slug='agriculture'
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def upload(self, slug, content, extension='jpg'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Book.objects.create(
+                title=slug.replace('-', ' ').title(),
+                category=self.category,
+                slug=slug,
+                cover_image=SimpleUploadedFile(
+                    '{}.{}'.format(slug, extension), content),
+                file_upload='book.pdf'
+            )
+
+    def test_variant_widths(self):
+        """
+        Test that images are never enlarged
+        """
+        self.assertEqual(images.variant_widths(2000), [160, 320, 640, 1280])
+        self.assertEqual(images.variant_widths(500), [160, 320, 500])
+        self.assertEqual(images.variant_widths(100), [100])
+
+    def test_variant_name(self):
+        """
+        Test that variants are stored next to the original image
+        """
+        self.assertEqual(images.variant_name('book_covers/guide.png', 320,
+            'webp'), 'book_covers/variants/guide.png-320w.webp')
+        self.assertNotEqual(
+            images.variant_name('book_covers/guide.jpg', 320, 'webp'),
+            images.variant_name('book_covers/guide.png', 320, 'webp'))
+
+    def test_variants_generated_on_upload(self):
+        """
+        Test that uploading a cover stores WebP and JPEG variants
+        keeping its aspect ratio
+        """
+        book = self.upload('farming-guide', make_image(800, 400))
+        variants = ImageVariant.objects.filter(
+            source=book.cover_image.name)
+        self.assertEqual(
+            [(v.format, v.width, v.height) for v in variants], [
+                ('jpeg', 160, 80), ('jpeg', 320, 160), ('jpeg', 640, 320),
+                ('jpeg', 800, 400), ('webp', 160, 80), ('webp', 320, 160),
+                ('webp', 640, 320), ('webp', 800, 400),
+            ])
+        self.assertEqual(variants[0].file.name,
+            images.variant_name(book.cover_image.name, 160, 'jpeg'))
+        with default_storage.open(variants[4].file.name) as file:
+            self.assertEqual(Image.open(file).format, 'WEBP')
+
+    def test_transparent_images_keep_transparency(self):
+        """
+        Test that the fallback of transparent images is PNG
+        """
+        book = self.upload('pond-design',
+            make_image(100, 100, 'PNG', 'RGBA'), 'png')
+        self.assertEqual(sorted(ImageVariant.objects.filter(
+            source=book.cover_image.name).values_list('format', flat=True)),
+            ['png', 'webp'])
+
+    def test_same_name_other_extension(self):
+        """
+        Test that images only differing by their extension keep their
+        own variants
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            books = [Book.objects.create(
+                title='Shared name {}'.format(extension),
+                category=self.category,
+                slug='shared-name-{}'.format(extension),
+                cover_image=SimpleUploadedFile('shared.' + extension,
+                    make_image(100, 100, format)),
+                file_upload='book.pdf'
+            ) for extension, format in (('jpg', 'JPEG'), ('png', 'PNG'))]
+        jpeg, png = [set(ImageVariant.objects.filter(
+            source=book.cover_image.name).values_list('file', flat=True))
+            for book in books]
+        self.assertFalse(jpeg & png)
+        for name in jpeg | png:
+            self.assertTrue(default_storage.exists(name))
+
+    def test_unreadable_image(self):
+        """
+        Test that an upload which isn't an image gets no variants
+        """
+        with self.assertLogs('core.images', 'WARNING'):
+            self.upload('broken-cover', b'not an image')
+        self.assertFalse(ImageVariant.objects.exists())
+
+    def test_responsive_image_tag(self):
+        """
+        Test that the tag emits the variants with the image's size,
+        and the upload itself until it is resized
+        """
+        template = Template('{% load core_tags %}'
+            '{% responsive_image book.cover_image "50vw" alt="Cover" %}')
+        book = Book(cover_image='book_covers/tag-cover.jpg')
+        html = template.render(Context({'book': book}))
+        self.assertIn('src="/media/book_covers/tag-cover.jpg"', html)
+        self.assertNotIn('srcset', html)
+
+        book = self.upload('tag-cover', make_image(400, 200))
+        html = template.render(Context({'book': book}))
+        self.assertIn('<source type="image/webp" srcset="'
+            '/media/book_covers/variants/tag-cover.jpg-160w.webp 160w, '
+            '/media/book_covers/variants/tag-cover.jpg-320w.webp 320w, '
+            '/media/book_covers/variants/tag-cover.jpg-400w.webp 400w" '
+            'sizes="50vw">', html)
+        self.assertIn('src="/media/book_covers/variants/'
+            'tag-cover.jpg-400w.jpg"', html)
+        self.assertIn('width="400" height="200"', html)
+
+    def test_cards_rendered_again_once_resized(self):
+        """
+        Test that cards cached before their cover was resized are
+        dropped once it is
+        """
+        book = self.upload('farming-guide', make_image(400, 200))
+        fragments.render_card(book)
+        ImageVariant.objects.all().delete()
+        images.generate(book.cover_image.name)
+        self.assertEqual(fragments.get_cards([book]), {})
+
+    def test_generate_image_variants_command(self):
+        """
+        Test that the command resizes the images without variants
+        """
+        name = default_storage.save('book_covers/old-cover.jpg',
+            ContentFile(make_image(200, 300)))
+        Book.objects.create(
+            title='Old cover',
+            category=self.category,
+            slug='old-cover',
+            cover_image=name,
+            file_upload='book.pdf'
+        )
+        # the test files are placeholders rather than images
+        get_user_model().objects.create_user(
+            first_name='Kelvin',
+            email='kelvin@murage.com',
+            password='kelvinpassword'
+        )
+        out, err = StringIO(), StringIO()
+        call_command('generate_image_variants', '--workers', '1',
+            stdout=out, stderr=err)
+        self.assertIn('Resized 1 images, 1 failed', out.getvalue())
+        self.assertIn('default.png', err.getvalue())
+        self.assertEqual(ImageVariant.objects.filter(source=name).count(),
+            4)
+
+        out = StringIO()
+        call_command('generate_image_variants', '--workers', '1',
+            stdout=out, stderr=err)
+        self.assertIn('Resized 0 images, 1 failed', out.getvalue())
@@ -0,0 +1,178 @@
+from django.core.cache import cache
+import datetime
+
+from django.core.paginator import EmptyPage, InvalidPage
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from books.models import Book
+from core.models import Category
+from core.pagination import (MergedCursorPaginator, WindowedPaginator,
+    estimated_count)
+from videos.models import Video
+
+
+class WindowedPaginatorTestCase(SimpleTestCase):
+    """
+    Tests for the windowed paginator
+    """
+    def test_page_window(self):
+        """
+        Test that pages link to a bounded window of pages
+        """
+        paginator = WindowedPaginator(list(range(1000)), 10)
+        self.assertEqual(paginator.page(1).page_window(),
+            [1, 2, 3, None, 100])
+        self.assertEqual(paginator.page(50).page_window(),
+            [1, None, 48, 49, 50, 51, 52, None, 100])
+        self.assertEqual(paginator.page(99).page_window(),
+            [1, None, 97, 98, 99, 100])
+
+    def test_small_page_window(self):
+        """
+        Test that every page is linked to when there are only a few
+        """
+        paginator = WindowedPaginator(list(range(40)), 10)
+        self.assertEqual(paginator.page(2).page_window(), [1, 2, 3, 4])
+
+    def test_pages_dont_need_the_count(self):
+        """
+        Test that pages are served without the total count
+        """
+        paginator = WindowedPaginator(list(range(25)), 10)
+        page = paginator.page(3)
+        self.assertEqual(list(page), list(range(20, 25)))
+        self.assertFalse(page.has_next())
+        self.assertTrue(paginator.page(2).has_next())
+        self.assertNotIn('count', paginator.__dict__)
+        with self.assertRaises(EmptyPage):
+            paginator.page(4)
+
+    def test_estimated_total(self):
+        """
+        Test that an estimate falling short of the current page is
+        corrected and hides the last page link
+        """
+        paginator = WindowedPaginator(list(range(1000)), 10)
+        paginator.count = 50
+        paginator.count_is_estimate = True
+        self.assertEqual(paginator.page(5).num_pages, 6)
+        self.assertEqual(paginator.page(5).page_window(),
+            [1, 2, 3, 4, 5, 6])
+        self.assertEqual(paginator.page(1).page_window(),
+            [1, 2, 3, None])
+
+    def test_unknown_count_strategy(self):
+        """
+        Test that unknown count strategies are rejected
+        """
+        with self.assertRaises(ValueError):
+            WindowedPaginator([], 10, count_strategy='guess')
+
+
+class CountStrategiesTestCase(TestCase):
+    """
+    Tests for the count strategies of the windowed paginator
+    """
+    def setUp(self):
+        cache.clear()
+        for name in ('Spiritual', 'Finance', 'Agribusiness'):
+            Category.objects.create(name=name, slug=name.lower())
+
+    def test_cached_count(self):
+        """
+        Test that cached counts are shared between paginators
+        """
+        queryset = Category.objects.all()
+        paginator = WindowedPaginator(queryset, 2, count_strategy='cached')
+        self.assertEqual(paginator.count, 3)
+        with self.assertNumQueries(0):
+            paginator = WindowedPaginator(queryset, 2,
+                count_strategy='cached')
+            self.assertEqual(paginator.count, 3)
+
+    def test_estimate_falls_back_to_cached_count(self):
+        """
+        Test that databases without planner statistics use the
+        cached count
+        """
+        queryset = Category.objects.all()
+        self.assertIsNone(estimated_count(queryset.filter(name='Finance')))
+        paginator = WindowedPaginator(queryset, 2, count_strategy='estimate')
+        self.assertEqual(paginator.count, 3)
+        self.assertFalse(paginator.count_is_estimate)
+
+
+class MergedCursorPaginatorTestCase(TestCase):
+    """
+    Tests for paginating books and videos as one stream
+    """
+    @classmethod
+    def setUpTestData(cls):
+        spiritual = Category.objects.create(
+            name='Spiritual',
+            slug='spiritual'
+        )
+        start = timezone.now()
+        # some books and videos share their date posted
+        for i in range(7):
+            Book.objects.create(
+                title='Prayer Devotion {}'.format(i),
+                category=spiritual,
+                slug='prayer-devotion-{}'.format(i),
+                file_upload='prayer-devotion-{}.pdf'.format(i),
+                date_posted=start - datetime.timedelta(days=i // 2)
+            )
+        for i in range(5):
+            Video.objects.create(
+                title='The Gift Chapter {}'.format(i),
+                category=spiritual,
+                slug='the-gift-chapter-{}'.format(i),
+                url='https://youtu.be/rAKLiE658m0',
+                date_posted=start - datetime.timedelta(days=i)
+            )
+
+    def get_paginator(self, per_page=3):
+        return MergedCursorPaginator({
+            'book': Book.objects.all(),
+            'video': Video.objects.all(),
+        }, per_page)
+
+    def test_pages_follow_merged_order(self):
+        """
+        Test that walking every page yields every resource once, in
+        (date posted, type, id) order with the newest first
+        """
+        paginator = self.get_paginator()
+        expected = sorted(
+            list(Book.objects.all()) + list(Video.objects.all()),
+            key=paginator.sort_key, reverse=True)
+
+        seen, cursor = [], None
+        while True:
+            # one query per resource type
+            with self.assertNumQueries(2):
+                page = paginator.page(after=cursor)
+            seen += list(page)
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(seen), 12)
+
+    def test_last_page(self):
+        """
+        Test that a page holding the remaining rows has no next page
+        """
+        page = self.get_paginator(per_page=12).page()
+        self.assertEqual(len(page), 12)
+        self.assertFalse(page.has_next())
+
+    def test_invalid_cursor(self):
+        """
+        Test that malformed cursors are rejected
+        """
+        paginator = self.get_paginator()
+        for cursor in ('not-a-cursor', 'WyJ4Il0'):
+            with self.assertRaises(InvalidPage):
+                paginator.page(after=cursor)
@@ -1,7 +1,7 @@
 from django.test import TestCase
 from django.urls import resolve
 
-from core.views import index
+from core.views import AuthorView, LatestView, index
 
 
 class CoreURLsTestCase(TestCase):
@@ -15,3 +15,18 @@ class CoreURLsTestCase(TestCase):
         """
         root = resolve('/')
         self.assertEqual(root.func, index)
+
+    def test_latest_url_uses_latest_view(self):
+        """
+        Test that the latest feed resolves to the correct view
+        """
+        latest = resolve('/latest/')
+        self.assertEqual(latest.func.view_class, LatestView)
+
+    def test_author_url_uses_author_view(self):
+        """
+        Test that author pages resolve to the correct view
+        """
+        author = resolve('/authors/1/')
+        self.assertEqual(author.func.view_class, AuthorView)
+        self.assertEqual(author.kwargs, {'pk': 1})
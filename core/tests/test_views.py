@@ -1,6 +1,14 @@
+import os
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import RequestFactory, TestCase
 
+from books.models import Book
 from core import views
+from core.models import Category
+from videos.models import Video
 
 
 class IndexViewTestCase(TestCase):
@@ -9,6 +17,7 @@ class IndexViewTestCase(TestCase):
     """
     def setUp(self):
         self.factory = RequestFactory()
+        cache.clear()
 
     def test_index_view_basic(self):
         """
@@ -26,3 +35,270 @@ class IndexViewTestCase(TestCase):
         """
         response = self.client.get('/')
         self.assertEqual(response.context['index'], True)
+
+    def test_index_view_counts(self):
+        """
+        Test that the index view shows the maintained counters
+        """
+        User = get_user_model()
+        User.objects.create_user(
+            first_name = 'Kelvin',
+            email='kelvin@murage.com',
+            password='kelvinpassword'
+        )
+        with self.assertNumQueries(1):
+            response = self.client.get('/')
+        self.assertEqual(response.context['num_books'], 0)
+        self.assertEqual(response.context['num_videos'], 0)
+        self.assertEqual(response.context['num_users'], 1)
+
+    def test_index_view_cached_for_anonymous_visitors(self):
+        """
+        Test that the homepage is served from the cache to anonymous
+        visitors until the counters change
+        """
+        self.client.get('/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/')
+        self.assertContains(response, 'Books')
+
+        get_user_model().objects.create_user(
+            first_name = 'Kelvin',
+            email='kelvin@murage.com',
+            password='kelvinpassword'
+        )
+        with self.assertNumQueries(1):
+            response = self.client.get('/')
+        self.assertEqual(response.context['num_users'], 1)
+
+    def test_index_view_not_cached_with_session(self):
+        """
+        Test that visitors with a session cookie bypass the page cache
+        """
+        user = get_user_model().objects.create_user(
+            first_name = 'Kelvin',
+            email='kelvin@murage.com',
+            password='kelvinpassword'
+        )
+        self.client.get('/')
+        self.client.force_login(user)
+        response = self.client.get('/')
+        self.assertContains(response, 'Kelvin')
+
+
+class LatestViewTestCase(TestCase):
+    """
+    Tests for the latest resources feed
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            first_name = 'Kelvin',
+            email='kelvin@murage.com',
+            password='kelvinpassword'
+        )
+        spiritual = Category.objects.create(
+            name='Spiritual',
+            slug='spiritual'
+        )
+        for i in range(7):
+            Book.objects.create(
+                title='Prayer Devotion {}'.format(i),
+                category=spiritual,
+                slug='prayer-devotion-{}'.format(i),
+                file_upload='prayer-devotion-{}.pdf'.format(i)
+            )
+            Video.objects.create(
+                title='The Gift {}'.format(i),
+                category=spiritual,
+                slug='the-gift-{}'.format(i),
+                url='https://youtu.be/rAKLiE658m0'
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_requires_login(self):
+        """
+        Test that anonymous visitors are redirected to log in
+        """
+        response = self.client.get('/latest/')
+        self.assertRedirects(response, '/accounts/login/?next=/latest/')
+
+    def test_latest_view(self):
+        """
+        Test that books and videos are listed together newest first
+        and that the older link pages through the rest
+        """
+        self.client.force_login(self.user)
+        response = self.client.get('/latest/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'core/latest.html')
+        first_page = response.context['resource_list']
+        self.assertEqual(len(first_page), 10)
+        self.assertEqual({type(resource) for resource in first_page},
+            {Book, Video})
+        dates = [resource.date_posted for resource in first_page]
+        self.assertEqual(dates, sorted(dates, reverse=True))
+
+        page = response.context['page_obj']
+        self.assertTrue(page.has_next())
+        response = self.client.get(
+            '/latest/?after={}'.format(page.next_cursor))
+        second_page = response.context['resource_list']
+        self.assertEqual(len(second_page), 4)
+        self.assertFalse(response.context['page_obj'].has_next())
+        self.assertFalse(set(first_page) & set(second_page))
+
+    def test_invalid_cursor(self):
+        """
+        Test that a malformed cursor is a 404
+        """
+        self.client.force_login(self.user)
+        response = self.client.get('/latest/?after=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+
+class AuthorViewTestCase(TestCase):
+    """
+    Tests for author pages
+    """
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.kelvin = User.objects.create_user(
+            first_name = 'Kelvin',
+            last_name = 'Murage',
+            email='kelvin@murage.com',
+            password='kelvinpassword'
+        )
+        cls.christine = User.objects.create_user(
+            first_name = 'Christine',
+            email='christine@kyalo.com',
+            password='christinepassword'
+        )
+        spiritual = Category.objects.create(
+            name='Spiritual',
+            slug='spiritual'
+        )
+        for i in range(8):
+            book = Book.objects.create(
+                title='Prayer Devotion {}'.format(i),
+                category=spiritual,
+                slug='prayer-devotion-{}'.format(i),
+                file_upload='prayer-devotion-{}.pdf'.format(i)
+            )
+            book.authors.add(cls.kelvin if i % 2 else cls.christine)
+        for i in range(4):
+            video = Video.objects.create(
+                title='The Gift {}'.format(i),
+                category=spiritual,
+                slug='the-gift-{}'.format(i),
+                url='https://youtu.be/rAKLiE658m0'
+            )
+            video.authors.add(cls.kelvin)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.christine)
+
+    def test_author_page(self):
+        """
+        Test that an author's books and videos are listed together
+        newest first with their counts, and no one else's
+        """
+        url = '/authors/{}/'.format(self.kelvin.pk)
+        response = self.client.get(url)
+        self.assertTemplateUsed(response, 'core/author.html')
+        self.assertEqual(response.context['author'], self.kelvin)
+        self.assertEqual(response.context['author_counts'],
+            {'book': 4, 'video': 4})
+        self.assertContains(response, '4 books, 4 videos')
+
+        resources = response.context['resource_list']
+        self.assertFalse(response.context['page_obj'].has_next())
+        self.assertEqual(len(resources), 8)
+        self.assertTrue(all(self.kelvin in resource.authors.all()
+            for resource in resources))
+        dates = [resource.date_posted for resource in resources]
+        self.assertEqual(dates, sorted(dates, reverse=True))
+
+    def test_author_page_queries(self):
+        """
+        Test that a page of a cached author costs the same number of
+        queries however many resources they have
+        """
+        url = '/authors/{}/'.format(self.kelvin.pk)
+        self.client.get(url)
+        # session, user, author, then per type the resources, tags
+        # and authors
+        with self.assertNumQueries(9):
+            self.client.get(url)
+
+    def test_counts_invalidated(self):
+        """
+        Test that the cached counts follow the author's resources
+        """
+        url = '/authors/{}/'.format(self.christine.pk)
+        self.assertEqual(self.client.get(url).context['author_counts'],
+            {'book': 4, 'video': 0})
+        Video.objects.get(slug='the-gift-0').authors.add(self.christine)
+        self.assertEqual(self.client.get(url).context['author_counts'],
+            {'book': 4, 'video': 1})
+        Book.objects.get(slug='prayer-devotion-0').delete()
+        self.assertEqual(self.client.get(url).context['author_counts'],
+            {'book': 3, 'video': 1})
+
+    def test_missing_author(self):
+        """
+        Test that an unknown author is a 404
+        """
+        response = self.client.get('/authors/999/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_meta_links_to_author(self):
+        """
+        Test that resource cards link to their authors' pages
+        """
+        response = self.client.get('/latest/')
+        self.assertContains(response,
+            'href="/authors/{}/"'.format(self.kelvin.pk))
+
+
+class ReconcileCountersCronTestCase(TestCase):
+    """
+    Tests for reconciling the counters from App Engine cron
+    """
+    url = '/cron/counters/'
+
+    @mock.patch.dict(os.environ, {'GAE_APPLICATION': 'ndovu'})
+    def test_counters_reconciled(self):
+        """
+        Test that the counters are reconciled for cron requests only
+        """
+        refused = self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_X_APPENGINE_CRON='true')
+        self.assertEqual(refused.status_code, 403)
+        self.assertContains(response, 'Counters reconciled')
+
+
+class ImageVariantsCronTestCase(TestCase):
+    """
+    Tests for resizing images from App Engine cron
+    """
+    url = '/cron/image-variants/'
+
+    @mock.patch.dict(os.environ, {'GAE_APPLICATION': 'ndovu'})
+    def test_images_resized(self):
+        """
+        Test that the images without variants are resized in the request
+        process, for cron requests only
+        """
+        with mock.patch('core.views.call_command') as command:
+            refused = self.client.get(self.url)
+            response = self.client.get(self.url,
+                HTTP_X_APPENGINE_CRON='true')
+        self.assertEqual(refused.status_code, 403)
+        self.assertEqual(response.status_code, 200)
+        command.assert_called_once_with('generate_image_variants',
+            '--workers', '1', stdout=mock.ANY, stderr=mock.ANY)
@@ -4,4 +4,11 @@ from . import views
 
 urlpatterns = [
     path('', views.index, name='index'),
-]
\ No newline at end of file
+    path('latest/', views.LatestView.as_view(), name='latest'),
+    path('authors/<int:pk>/', views.AuthorView.as_view(), name='author'),
+    path('stats/cache/', views.cache_stats, name='cache_stats'),
+    path('cron/counters/', views.reconcile_counters_cron,
+        name='counters_cron'),
+    path('cron/image-variants/', views.image_variants_cron,
+        name='image_variants_cron'),
+]
@@ -1,13 +1,352 @@
+import hashlib
+import time
+from io import StringIO
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import get_user_model
-from django.shortcuts import render
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.paginator import InvalidPage
+from django.db.models import Max
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, render
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.generic import TemplateView
+
+from search import related
+from utils.cache import HitCounter, get_version
+
+from . import authors, counters, facets, fragments
+from .decorators import app_engine_cron, cache_anonymous_page
+from .models import Category, Tag
+from .pagination import (CursorPaginator, MergedCursorPaginator,
+    WindowedPaginator)
 
 
+@cache_anonymous_page(versions=('counters',))
 def index(request):
     """
     Creates the homepage of the site
     """
+    counts = counters.get_counts()
     context = {'index': True}
-    context['num_books'] = 78
-    context['num_videos'] = 67
-    context['num_users'] = 56
+    context['num_books'] = counts['books']
+    context['num_videos'] = counts['videos']
+    context['num_users'] = counts['users']
     return render(request, 'index.html', context)
+
+
+@staff_member_required
+def cache_stats(request):
+    """
+    Reports the hits, misses and hit ratio of each cache layer
+    for monitoring
+    """
+    return JsonResponse(HitCounter.all_stats())
+
+
+@app_engine_cron
+def reconcile_counters_cron(request):
+    """
+    Corrects the drift of the site-wide counters, requested by App
+    Engine cron (see cron.yaml)
+    """
+    out = StringIO()
+    call_command('reconcile_counters', stdout=out, stderr=out)
+    return HttpResponse(out.getvalue(), content_type='text/plain')
+
+
+@app_engine_cron
+def image_variants_cron(request):
+    """
+    Resizes the images whose variants were lost with the instances
+    resizing them, requested by App Engine cron (see cron.yaml)
+    """
+    out = StringIO()
+    call_command('generate_image_variants', '--workers', '1', stdout=out,
+        stderr=out)
+    return HttpResponse(out.getvalue(), content_type='text/plain')
+
+
+class ConditionalGetMixin:
+    """
+    Answers conditional GET requests for resource pages with
+    ``304 Not Modified`` before any template is rendered.
+
+    The ``ETag`` is derived from the ``last_edit`` times of the
+    resources on the page and of their categories and tags, read with
+    a single query. It also covers author names, the navbar of the
+    requesting user and the deployed templates. When the storage signs
+    media URLs, it changes every ``url_max_age`` seconds too, so that
+    browsers never keep pages holding expired URLs.
+
+    No ``Last-Modified`` header is sent, as the latest edit time
+    doesn't move when a resource leaves the page or is deleted.
+    """
+    def get_validator_queryset(self):
+        """
+        Returns the resources of the page with only their edit times
+        """
+        queryset = self.get_queryset()
+        ordering = queryset.query.order_by or self.model._meta.ordering
+        # the GROUP BY of the annotation drops Meta.ordering, so it is
+        # repeated for the rows to be those of the page
+        return queryset.prefetch_related(None).select_related(
+            'category'
+        ).only(
+            'date_posted', 'last_edit', 'category__last_edit'
+        ).annotate(tags_last_edit=Max('tags__last_edit')).order_by(
+            *ordering)
+
+    def get_validator_rows(self):
+        """
+        Returns (pk, last edit times...) rows describing the page, or
+        None if the page can't be found
+        """
+        raise NotImplementedError
+
+    def get_versions(self):
+        """
+        Returns the names of the cached versions of what the page shows
+        besides its resources
+        """
+        return ['authors']
+
+    def get_etag(self):
+        """Returns the ETag of the page, or None if it can't be found"""
+        rows = self.get_validator_rows()
+        if not rows:
+            return None
+
+        user = self.request.user
+        max_age = getattr(default_storage, 'url_max_age', None)
+        fingerprint = repr([
+            int(time.time() // max_age) if max_age else None,
+            rows, self.request.GET.urlencode(),
+            [get_version(name) for name in self.get_versions()],
+            settings.DEPLOY_VERSION, user.pk,
+            getattr(user, 'first_name', None),
+            str(getattr(user, 'profile_picture', '')),
+        ])
+        return '"{}"'.format(hashlib.md5(fingerprint.encode()).hexdigest())
+
+    def get(self, request, *args, **kwargs):
+        etag = self.get_etag()
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+
+        if etag:
+            response['ETag'] = etag
+        # pages show the member's details, so only their browser may
+        # keep them and it must check back every time
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+def _edit_times(resource):
+    return (resource.pk, resource.last_edit, resource.category.last_edit,
+        resource.tags_last_edit)
+
+
+class ResourceDetailMixin(ConditionalGetMixin):
+    """
+    Defines common configurations for Resource detail views.
+
+    Resources are read along with their precomputed related resources,
+    which are shown as cards.
+    """
+    def get_queryset(self):
+        return related.with_related(super().get_queryset())
+
+    def get_validator_rows(self):
+        return [_edit_times(resource) + (resource.related_computed,)
+            for resource in self.get_validator_queryset().filter(
+                slug=self.kwargs['slug'])]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        resources = related.load(self.object.related_list)
+        context.update({
+            'related_resources': resources,
+            'card_fragments': fragments.get_cards(resources),
+        })
+        return context
+
+
+class ResourceListMixin(ConditionalGetMixin):
+    """
+    Defines common configurations for Resource list views.
+
+    Loads each resource's category in the same query and prefetches
+    only the tag and author columns rendered by ``core/meta.html``, so
+    a page costs the same number of queries whatever its size.
+
+    Cards are rendered from the card fragment cache, fetched for the
+    whole page at once.
+
+    Page numbers are served by WindowedPaginator, configured with
+    ``count_strategy`` and ``page_window``. Set ``pagination_mode`` to
+    ``'cursor'`` to paginate with opaque ``?after=``/``?before=``
+    tokens instead.
+
+    A ``category`` or ``tag`` slug in the URL keyword arguments
+    restricts the list to the resources in that group. The sidebar
+    links to every group with its cached resource count.
+    """
+    template_name = 'core/resource_list.html'
+    resources = None
+    pagination_mode = 'page'
+    paginator_class = WindowedPaginator
+    count_strategy = 'exact'
+    page_window = 2
+
+    group_models = {'category': Category, 'tag': Tag}
+
+    def get_group(self):
+        """
+        Returns the category or tag the list is restricted to, or None
+        """
+        if not hasattr(self, '_group'):
+            self._group = None
+            for kwarg, model in self.group_models.items():
+                if kwarg in self.kwargs:
+                    self._group = get_object_or_404(model,
+                        slug=self.kwargs[kwarg])
+        return self._group
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        group = self.get_group()
+        if isinstance(group, Category):
+            queryset = queryset.filter(category=group)
+        elif isinstance(group, Tag):
+            # a subquery on the through table rather than a join, so
+            # that annotations over tags still see every tag
+            through = self.model.tags.through
+            queryset = queryset.filter(pk__in=through.objects.filter(
+                tag=group).values(self.model._meta.model_name))
+        return fragments.card_queryset(queryset)
+
+    def get_validator_rows(self):
+        queryset = self.get_validator_queryset()
+        page_size = self.get_paginate_by(queryset)
+        if self.pagination_mode == 'cursor':
+            try:
+                resources = CursorPaginator(queryset, page_size).page(
+                    after=self.request.GET.get('after'),
+                    before=self.request.GET.get('before')
+                )
+            except InvalidPage:
+                return None
+        else:
+            paginator = self.get_paginator(queryset, page_size)
+            try:
+                number = paginator.validate_number(
+                    self.request.GET.get(self.page_kwarg) or 1)
+            except InvalidPage:
+                return None
+            offset = (number - 1) * page_size
+            # the extra row tells whether there is a next page
+            resources = queryset[offset:offset + page_size + 1]
+        return [_edit_times(resource) for resource in resources]
+
+    def get_versions(self):
+        # the sidebar counts resources on every page
+        return super().get_versions() + [facets.version_name(self.model)]
+
+    def get_paginator(self, queryset, per_page, orphans=0,
+        allow_empty_first_page=True, **kwargs):
+        return super().get_paginator(queryset, per_page, orphans,
+            allow_empty_first_page, count_strategy=self.count_strategy,
+            window=self.page_window, **kwargs)
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.pagination_mode != 'cursor':
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = CursorPaginator(queryset, page_size)
+        try:
+            page = paginator.page(
+                after=self.request.GET.get('after'),
+                before=self.request.GET.get('before')
+            )
+        except InvalidPage as e:
+            raise Http404(str(e))
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['resources'] = self.resources
+        context['group'] = self.get_group()
+        context['facets'] = facets.get_facets(self.model)
+        context['card_fragments'] = fragments.get_cards(
+            context['object_list'])
+        if self.pagination_mode == 'cursor':
+            context['pagination_template'] = 'pagination_cursor.html'
+        return context
+
+
+class LatestView(LoginRequiredMixin, TemplateView):
+    """
+    Creates the page of the latest books and videos, merged into one
+    list by date posted and paginated with cursors
+    """
+    template_name = 'core/latest.html'
+    paginate_by = 10
+
+    def get_querysets(self):
+        return {
+            'book': fragments.card_queryset(
+                apps.get_model('books.Book').objects.all()),
+            'video': fragments.card_queryset(
+                apps.get_model('videos.Video').objects.all()),
+        }
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        paginator = MergedCursorPaginator(self.get_querysets(),
+            self.paginate_by)
+        try:
+            page = paginator.page(after=self.request.GET.get('after'))
+        except InvalidPage as e:
+            raise Http404(str(e))
+        context.update({
+            'resource_list': page.object_list,
+            'page_obj': page,
+            'card_fragments': fragments.get_cards(page.object_list),
+        })
+        return context
+
+
+class AuthorView(LatestView):
+    """
+    Creates the page of an author listing their books and videos
+    together, newest first
+    """
+    template_name = 'core/author.html'
+
+    def get_author(self):
+        if not hasattr(self, '_author'):
+            self._author = get_object_or_404(
+                get_user_model().objects.only(
+                    'first_name', 'last_name', 'bio', 'profile_picture'),
+                pk=self.kwargs['pk'])
+        return self._author
+
+    def get_querysets(self):
+        return {
+            model._meta.model_name: fragments.card_queryset(
+                authors.authored(model, self.get_author()))
+            for model in authors.authored_models()
+        }
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['author'] = self.get_author()
+        context['author_counts'] = authors.get_counts(
+            self.get_author().pk)
+        return context
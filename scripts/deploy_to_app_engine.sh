@@ -33,6 +33,13 @@ fi
 mv Pipfile Pipfile.txt
 mv Pipfile.lock Pipfile.lock.txt
 
+# Connect to the shared Memcached instance through the VPC connector
+if test -n "$VPC_ACCESS_CONNECTOR"; then
+    echo "" >> app.yaml
+    echo "vpc_access_connector:" >> app.yaml
+    echo "  name: $VPC_ACCESS_CONNECTOR" >> app.yaml
+fi
+
 # Add the environment variables to app.yaml
 echo "" >> app.yaml
 echo "env_variables:" >> app.yaml
@@ -57,6 +64,9 @@ env_variables=(
     "DJANGO_EMAIL_HOST_USER"
     "DJANGO_EMAIL_HOST_PASSWORD"
 
+    # Cache
+    "MEMCACHED_LOCATION"
+
     # File storage
     "GCP_STORAGE_BUCKET_NAME"
     "GOOGLE_APPLICATION_CREDENTIALS"
@@ -79,7 +89,7 @@ for var in "${env_variables[@]}"; do
 done
 
 # Deploy the application
-gcloud -q app deploy app.yaml --version $VERSION
+gcloud -q app deploy app.yaml cron.yaml --version $VERSION
 
 # Undo changes made to app.yaml
 git checkout -- app.yaml
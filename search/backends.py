@@ -0,0 +1,164 @@
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+
+from .models import SearchDocument
+
+TABLE = SearchDocument._meta.db_table
+
+
+def search_terms(query):
+    """Splits a search query into words
+
+    Args:
+        query (str): The query typed by the user
+
+    Returns:
+        list: The words of the query
+    """
+    return re.findall(r'\w+', query)
+
+
+class SearchBackend:
+    """
+    Runs ranked full-text queries against the index of one database
+    vendor.
+
+    Subclasses build a single statement that matches, ranks, filters
+    and pages the documents; it must select every field of the
+    documents along with a ``score`` column, higher scores first.
+    """
+    def index_documents(self, pks):
+        """Updates what the index stores besides the documents' columns
+
+        Called after documents are created or updated.
+
+        Args:
+            pks (list): Primary keys of the documents
+        """
+
+    def get_sql(self, query):
+        """Returns the statement and parameters selecting matches
+
+        Args:
+            query (str): The query typed by the user
+
+        Returns:
+            tuple: The SQL and its parameters, without ordering or
+                limits
+        """
+        raise NotImplementedError
+
+    def search(self, query, resource_type=None, limit=20, offset=0):
+        """Returns the documents matching a query, best match first
+
+        Args:
+            query (str): The query typed by the user
+            resource_type (str, optional): A model name to restrict
+                results to. Defaults to every type of resource.
+            limit (int, optional): The maximum number of documents
+            offset (int, optional): The number of documents to skip
+
+        Returns:
+            list: SearchDocument instances with a ``score`` attribute
+        """
+        if not search_terms(query):
+            return []
+        sql, params = self.get_sql(query)
+        if resource_type:
+            sql += ' AND d.resource_type = %s'
+            params.append(resource_type)
+        sql += (' ORDER BY score DESC, d.date_posted DESC'
+            ' LIMIT %s OFFSET %s')
+        params += [limit, offset]
+        return list(SearchDocument.objects.raw(sql, params))
+
+
+class PostgreSQLBackend(SearchBackend):
+    """
+    Matches a stored ``tsvector`` column backed by a GIN index, ranking
+    matches in the title above matches in the body.
+
+    The column isn't a model field, so that documents are read without
+    it. It is filled by `index_documents`.
+    """
+    vector = (
+        "setweight(to_tsvector('english'::regconfig, d.title), 'A') || "
+        "setweight(to_tsvector('english'::regconfig, d.body), 'B')"
+    )
+
+    def index_documents(self, pks):
+        if not pks:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'UPDATE {table} d SET search_vector = {vector} '
+                'WHERE d.id = ANY(%s)'.format(
+                    table=TABLE, vector=self.vector),
+                [list(pks)])
+
+    def get_sql(self, query):
+        columns = ', '.join('d.' + field.column
+            for field in SearchDocument._meta.concrete_fields)
+        sql = (
+            'SELECT {columns}, ts_rank(d.search_vector, q.query) AS score '
+            "FROM {table} d, plainto_tsquery('english'::regconfig, %s) "
+            'q(query) WHERE d.search_vector @@ q.query'
+        ).format(columns=columns, table=TABLE)
+        return sql, [' '.join(search_terms(query))]
+
+
+class MySQLBackend(SearchBackend):
+    """
+    Matches a FULLTEXT index over the title and body in natural
+    language mode
+    """
+    def get_sql(self, query):
+        match = ('MATCH (d.title, d.body) '
+            'AGAINST (%s IN NATURAL LANGUAGE MODE)')
+        text = ' '.join(search_terms(query))
+        sql = 'SELECT d.*, {match} AS score FROM {table} d WHERE {match}'
+        return sql.format(match=match, table=TABLE), [text, text]
+
+
+class SQLiteBackend(SearchBackend):
+    """
+    Matches an FTS5 table kept in sync with the documents by triggers,
+    ranking with BM25 and weighting the title above the body
+    """
+    def get_sql(self, query):
+        # quoting every word stops FTS5 reading them as operators
+        text = ' '.join(
+            '"{}"'.format(term) for term in search_terms(query))
+        sql = (
+            'SELECT d.*, -bm25({table}_fts, 10.0, 1.0) AS score '
+            'FROM {table}_fts JOIN {table} d ON d.id = {table}_fts.rowid '
+            'WHERE {table}_fts MATCH %s'
+        ).format(table=TABLE)
+        return sql, [text]
+
+
+BACKENDS = {
+    'mysql': MySQLBackend,
+    'postgresql': PostgreSQLBackend,
+    'sqlite': SQLiteBackend,
+}
+
+
+def get_backend():
+    """Returns the search backend of the default database
+
+    Raises:
+        ImproperlyConfigured: If the database has no supported
+            full-text index
+
+    Returns:
+        SearchBackend: The search backend
+    """
+    try:
+        return BACKENDS[connection.vendor]()
+    except KeyError:
+        raise ImproperlyConfigured(
+            'Full-text search is not supported on {}'.format(
+                connection.vendor))
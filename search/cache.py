@@ -0,0 +1,228 @@
+import hashlib
+import json
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from utils.cache import HitCounter, get_version
+
+from . import index
+from .backends import search_terms
+from .models import SearchDocument, SearchQuery
+
+RESULT_CACHE_TIMEOUT = 60 * 60 * 24
+
+# The number of days of searches ranking the popular queries
+POPULAR_DAYS = 7
+
+WARMED_KEY = 'search:warmed'
+
+# The body can hold the whole text of a book and is never shown in
+# results, so it is left out of the cached documents
+CACHED_FIELDS = [field.attname
+    for field in SearchDocument._meta.concrete_fields
+    if field.name != 'body']
+
+result_stats = HitCounter('search')
+
+
+def normalize_query(query):
+    """Returns the words of a query lowercased and singly spaced
+
+    Queries differing only in case, spacing or punctuation match the
+    same documents, so they share their cached results.
+
+    Args:
+        query (str): The query typed by the user
+
+    Returns:
+        str: The normalized query
+    """
+    return ' '.join(search_terms(query)).casefold()
+
+
+def catalogue_version():
+    """Returns the version token bumped whenever a document changes"""
+    return '{}:{}'.format(settings.DEPLOY_VERSION,
+        get_version(index.CATALOGUE_VERSION))
+
+
+def result_key(query, resource_type=None, limit=20, offset=0):
+    """Returns the cache key of a page of results
+
+    Args:
+        query (str): The normalized query
+        resource_type (str, optional): The resource type searched
+        limit (int, optional): The maximum number of documents
+        offset (int, optional): The number of documents skipped
+
+    Returns:
+        str: The cache key
+    """
+    digest = hashlib.md5(json.dumps(
+        [query, resource_type or '', limit, offset]).encode()).hexdigest()
+    return 'search:{}:{}'.format(catalogue_version(), digest)
+
+
+def search(query, resource_type=None, limit=20, offset=0, refresh=False):
+    """Returns the documents matching a query, best match first
+
+    Results are cached until the deploy or any document changes.
+
+    Args:
+        query (str): The query typed by the user
+        resource_type (str, optional): 'book' or 'video' to restrict
+            results to. Defaults to every type of resource.
+        limit (int, optional): The maximum number of documents
+        offset (int, optional): The number of documents to skip
+        refresh (bool, optional): Whether to search and replace the
+            cached results even if they are cached
+
+    Returns:
+        list: SearchDocument instances with a ``score`` attribute and
+            a deferred body
+    """
+    query = normalize_query(query)
+    if not query:
+        return []
+    key = result_key(query, resource_type, limit, offset)
+    rows = None if refresh else cache.get(key)
+    if rows is None:
+        if not refresh:
+            result_stats.miss()
+        rows = [
+            [getattr(document, name) for name in CACHED_FIELDS] +
+            [document.score]
+            for document in index.search(query, resource_type, limit,
+                offset)
+        ]
+        cache.set(key, rows, RESULT_CACHE_TIMEOUT)
+    else:
+        result_stats.hit()
+
+    results = []
+    for *values, score in rows:
+        document = SearchDocument.from_db('default', CACHED_FIELDS, values)
+        document.score = score
+        results.append(document)
+    return results
+
+
+class QueryCounter:
+    """
+    Counts the searches of each query per day.
+
+    Counts are added up in memory and written at most every
+    ``flush_interval`` seconds, with one update per distinct query, so
+    that searching doesn't write to the database on every request.
+    Counts not yet written when a process exits are lost, which
+    hardly changes which queries are popular.
+
+    Args:
+        flush_interval (int, optional): Seconds between writes
+    """
+    def __init__(self, flush_interval=60):
+        self.flush_interval = flush_interval
+        self.counts = Counter()
+        self.flushed = time.monotonic()
+        self.lock = threading.Lock()
+
+    def add(self, query, resource_type=None):
+        """Counts a search
+
+        Args:
+            query (str): The query typed by the user
+            resource_type (str, optional): The resource type searched
+        """
+        max_length = SearchQuery._meta.get_field('query').max_length
+        query = normalize_query(query)[:max_length]
+        if not query:
+            return
+        with self.lock:
+            self.counts[(query, resource_type or '')] += 1
+            due = time.monotonic() - self.flushed >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Adds the counts kept in memory to today's counts"""
+        with self.lock:
+            counts, self.counts = self.counts, Counter()
+            self.flushed = time.monotonic()
+        day = timezone.localdate()
+        for (query, resource_type), count in counts.items():
+            rows = SearchQuery.objects.filter(query=query,
+                resource_type=resource_type, day=day)
+            if rows.update(count=F('count') + count):
+                continue
+            try:
+                with transaction.atomic():
+                    SearchQuery.objects.create(query=query,
+                        resource_type=resource_type, day=day, count=count)
+            except IntegrityError:
+                # another process created the row first
+                rows.update(count=F('count') + count)
+
+
+counter = QueryCounter()
+
+
+def top_queries(limit=50, days=POPULAR_DAYS):
+    """Returns the queries searched most over the last days
+
+    Args:
+        limit (int, optional): The maximum number of queries
+        days (int, optional): The number of days counted, including
+            today
+
+    Returns:
+        list: (query, resource type or None, searches) tuples, most
+            searched first
+    """
+    since = timezone.localdate() - timedelta(days=days - 1)
+    rows = SearchQuery.objects.filter(day__gte=since).values_list(
+        'query', 'resource_type').annotate(
+            total=Sum('count')).order_by('-total', 'query', 'resource_type')
+    return [(query, resource_type or None, total)
+        for query, resource_type, total in rows[:limit]]
+
+
+def prune(days=POPULAR_DAYS):
+    """Deletes the counts older than the days ranking popular queries
+
+    Returns:
+        int: The number of rows deleted
+    """
+    since = timezone.localdate() - timedelta(days=days - 1)
+    return SearchQuery.objects.filter(day__lt=since).delete()[0]
+
+
+def is_warm():
+    """Returns whether the cache was warmed since the last change"""
+    return cache.get(WARMED_KEY) == catalogue_version()
+
+
+def warm(page_size, limit=50, days=POPULAR_DAYS):
+    """Caches the first page of results of the most popular queries
+
+    Args:
+        page_size (int): The number of documents searched per page
+        limit (int, optional): The number of queries warmed
+        days (int, optional): The number of days ranking the queries
+
+    Returns:
+        int: The number of queries warmed
+    """
+    version = catalogue_version()
+    queries = top_queries(limit, days)
+    for query, resource_type, total in queries:
+        search(query, resource_type, limit=page_size, refresh=True)
+    cache.set(WARMED_KEY, version, None)
+    return len(queries)
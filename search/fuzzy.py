@@ -0,0 +1,252 @@
+import heapq
+import json
+import math
+import threading
+import time
+import zlib
+from collections import Counter
+
+from django.db import connection
+
+from core.models import Tag
+from utils.cache import bump_version, get_version
+
+from .backends import TABLE, search_terms
+from .models import SearchDocument, TrigramSnapshot
+from .typeahead import normalize
+
+# The share of a query's trigrams a title or tag must contain
+THRESHOLD = 0.5
+
+VERSION_NAME = 'fuzzy'
+
+
+def trigrams(text):
+    """Returns the trigrams of the words of a text
+
+    Words are padded the way pg_trgm pads them, so that trigrams at
+    the start of a word weigh more.
+
+    Args:
+        text (str): The text to split
+
+    Returns:
+        set: The trigrams of the text
+    """
+    grams = set()
+    for word in normalize(text).split():
+        word = '  {} '.format(word)
+        grams.update(word[i:i + 3] for i in range(len(word) - 2))
+    return grams
+
+
+class PostgreSQLMatcher:
+    """
+    Matches titles and tags with pg_trgm's ``<%`` operator, backed by
+    GIN trigram indexes, and ranks them by word similarity
+    """
+    def _set_threshold(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT set_config("
+                "'pg_trgm.word_similarity_threshold', %s, false)",
+                [str(THRESHOLD)])
+
+    def search(self, query, resource_type=None, limit=10):
+        text = ' '.join(search_terms(query))
+        self._set_threshold()
+        sql = ('SELECT d.*, word_similarity(%s, d.title) AS score '
+            'FROM {} d WHERE %s <%% d.title').format(TABLE)
+        params = [text, text]
+        if resource_type:
+            sql += ' AND d.resource_type = %s'
+            params.append(resource_type)
+        sql += ' ORDER BY score DESC, d.date_posted DESC LIMIT %s'
+        return list(SearchDocument.objects.raw(sql, params + [limit]))
+
+    def tags(self, query, limit=5):
+        text = ' '.join(search_terms(query))
+        self._set_threshold()
+        sql = ('SELECT t.*, word_similarity(%s, t.name) AS score '
+            'FROM {} t WHERE %s <%% t.name '
+            'ORDER BY score DESC, t.name LIMIT %s').format(
+                Tag._meta.db_table)
+        return list(Tag.objects.raw(sql, [text, text, limit]))
+
+    def changed(self):
+        pass
+
+
+class TrigramIndex:
+    """
+    Matches titles and tags with an inverted index from trigrams to
+    the titles and tags containing them, held in memory.
+
+    A query only counts the entries sharing a trigram with it, and
+    keeps the best with a heap. The index is persisted as a
+    TrigramSnapshot. Changes bump a version in the shared cache, and
+    at most every ``refresh_interval`` seconds the index checks it,
+    loading the snapshot of that version or building and saving one.
+
+    Args:
+        refresh_interval (int, optional): Seconds between checks
+    """
+    def __init__(self, refresh_interval=60):
+        self.refresh_interval = refresh_interval
+        self.version = None
+        self.checked = None
+        # the entries and the postings, swapped together
+        self.state = ([], {})
+        self.lock = threading.Lock()
+
+    def build(self):
+        entries = [
+            ['document', pk, title, resource_type]
+            for pk, title, resource_type in
+            SearchDocument.objects.order_by('pk').values_list(
+                'pk', 'title', 'resource_type')
+        ]
+        entries += [
+            ['tag', pk, name, slug]
+            for pk, name, slug in Tag.objects.order_by('pk').values_list(
+                'pk', 'name', 'slug')
+        ]
+        postings = {}
+        for i, entry in enumerate(entries):
+            for gram in trigrams(entry[2]):
+                postings.setdefault(gram, []).append(i)
+        return entries, postings
+
+    def refresh(self):
+        """Brings the index up to date with the shared version"""
+        now = time.monotonic()
+        if self.checked is not None and \
+            now - self.checked < self.refresh_interval:
+            return
+        version = get_version(VERSION_NAME)
+        self.checked = now
+        if version == self.version:
+            return
+
+        with self.lock:
+            if version == self.version:
+                return
+            snapshot = TrigramSnapshot.objects.filter(pk=1).first()
+            if snapshot is not None and snapshot.version == version:
+                entries, postings = json.loads(
+                    zlib.decompress(snapshot.data))
+            else:
+                entries, postings = self.build()
+                TrigramSnapshot.objects.update_or_create(pk=1, defaults={
+                    'version': version,
+                    'data': zlib.compress(
+                        json.dumps([entries, postings]).encode()),
+                })
+            self.state = (entries, postings)
+            self.version = version
+
+    def match(self, query, kind, limit, extra=None):
+        """Returns the best entries of a kind sharing trigrams with a query
+
+        Args:
+            query (str): The text typed by the user
+            kind (str): 'document' or 'tag'
+            limit (int): The maximum number of entries
+            extra (str, optional): The resource type documents must
+                have
+
+        Returns:
+            list: (score, entry) tuples, best first
+        """
+        self.refresh()
+        grams = trigrams(query)
+        if not grams:
+            return []
+        entries, postings = self.state
+        hits = Counter()
+        for gram in grams:
+            hits.update(postings.get(gram, ()))
+        minimum = math.ceil(THRESHOLD * len(grams))
+        # ties go to the oldest entries
+        candidates = (
+            (count / len(grams), -i) for i, count in hits.items()
+            if count >= minimum and entries[i][0] == kind and
+            (extra is None or entries[i][3] == extra)
+        )
+        return [(score, entries[-negated])
+            for score, negated in heapq.nlargest(limit, candidates)]
+
+    def search(self, query, resource_type=None, limit=10):
+        matches = self.match(query, 'document', limit, resource_type)
+        documents = SearchDocument.objects.in_bulk(
+            [entry[1] for score, entry in matches])
+        results = []
+        for score, entry in matches:
+            # deleted since the index was built
+            if entry[1] in documents:
+                documents[entry[1]].score = score
+                results.append(documents[entry[1]])
+        return results
+
+    def tags(self, query, limit=5):
+        results = []
+        for score, (kind, pk, name, slug) in self.match(query, 'tag',
+            limit):
+            tag = Tag(pk=pk, name=name, slug=slug)
+            tag.score = score
+            results.append(tag)
+        return results
+
+    def changed(self):
+        bump_version(VERSION_NAME)
+
+
+index = TrigramIndex()
+
+
+def get_matcher():
+    """
+    Returns the matcher of the default database: pg_trgm on PostgreSQL
+    and this process's trigram index elsewhere
+    """
+    if connection.vendor == 'postgresql':
+        return PostgreSQLMatcher()
+    return index
+
+
+def search(query, resource_type=None, limit=10):
+    """Returns the documents whose titles look like a query
+
+    Args:
+        query (str): The query typed by the user
+        resource_type (str, optional): 'book' or 'video' to restrict
+            results to
+        limit (int, optional): The maximum number of documents
+
+    Returns:
+        list: SearchDocument instances with a ``score`` attribute,
+            most similar first
+    """
+    if not search_terms(query):
+        return []
+    return get_matcher().search(query, resource_type, limit)
+
+
+def tags(query, limit=5):
+    """Returns the tags whose names look like a query
+
+    Args:
+        query (str): The query typed by the user
+        limit (int, optional): The maximum number of tags
+
+    Returns:
+        list: Tag instances with a ``score`` attribute, most similar
+            first
+    """
+    if not search_terms(query):
+        return []
+    return get_matcher().tags(query, limit)
+
+
+def changed():
+    """Tells every process that titles or tags changed"""
+    get_matcher().changed()
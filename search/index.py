@@ -0,0 +1,150 @@
+from django.apps import apps
+from django.db.models import Prefetch
+
+from core.models import Tag
+from utils.cache import bump_version
+
+from . import fuzzy
+from .backends import get_backend
+from .models import SearchDocument
+
+SEARCHED_MODELS = ('books.Book', 'videos.Video')
+
+# The version bumped whenever a document changes, expiring cached
+# search results
+CATALOGUE_VERSION = 'catalogue'
+
+
+def searched_models():
+    return [apps.get_model(label) for label in SEARCHED_MODELS]
+
+
+def changed():
+    """Tells every process that documents changed"""
+    bump_version(CATALOGUE_VERSION)
+    fuzzy.changed()
+
+
+def build_document(resource):
+    """Returns an unsaved search document for a resource
+
+    The resource's category, tags and `search_related` relations
+    should be loaded beforehand.
+
+    Args:
+        resource (Resource): A book or video
+
+    Returns:
+        SearchDocument: The document holding the resource's text
+    """
+    summary = resource.summary or ''
+    body = [summary, resource.category.name]
+    body += [tag.name for tag in resource.tags.all()]
+    text = resource.get_search_text()
+    if text:
+        body.append(text)
+    return SearchDocument(
+        resource_type=resource._meta.model_name,
+        object_id=resource.pk,
+        slug=resource.slug,
+        title=resource.title,
+        summary=summary,
+        body='\n'.join(body),
+        date_posted=resource.date_posted,
+    )
+
+
+def _with_text(queryset):
+    return queryset.select_related(
+        'category', *queryset.model.search_related
+    ).prefetch_related(
+        Prefetch('tags', queryset=Tag.objects.only('name')))
+
+
+def index_resources(model, pks):
+    """Creates or updates the search documents of some resources
+
+    Args:
+        model (Model): Book or Video
+        pks (iterable): Primary keys of the resources to index
+    """
+    pks = list(pks)
+    if not pks:
+        return
+    resource_type = model._meta.model_name
+    existing = dict(SearchDocument.objects.filter(
+        resource_type=resource_type, object_id__in=pks
+    ).values_list('object_id', 'pk'))
+
+    created, updated = [], []
+    for resource in _with_text(model.objects.filter(pk__in=pks)):
+        document = build_document(resource)
+        document.pk = existing.get(resource.pk)
+        (created if document.pk is None else updated).append(document)
+    SearchDocument.objects.bulk_create(created)
+    SearchDocument.objects.bulk_update(updated,
+        ['slug', 'title', 'summary', 'body', 'date_posted'])
+    get_backend().index_documents(
+        [document.pk for document in created + updated if document.pk])
+    changed()
+
+
+def remove_resources(model, pks):
+    """Deletes the search documents of some resources
+
+    Args:
+        model (Model): Book or Video
+        pks (iterable): Primary keys of the deleted resources
+    """
+    SearchDocument.objects.filter(resource_type=model._meta.model_name,
+        object_id__in=list(pks)).delete()
+    changed()
+
+
+def rebuild(batch_size=500):
+    """Replaces every search document with one built from scratch
+
+    Args:
+        batch_size (int, optional): Number of resources read and
+            written per query
+
+    Returns:
+        dict: The number of documents indexed keyed by resource type
+    """
+    SearchDocument.objects.all().delete()
+    counts = {}
+    for model in searched_models():
+        resources = _with_text(model.objects.order_by('pk'))
+        counts[model._meta.model_name] = 0
+        last_pk = 0
+        while True:
+            batch = list(resources.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            documents = SearchDocument.objects.bulk_create(
+                [build_document(resource) for resource in batch])
+            get_backend().index_documents(
+                [document.pk for document in documents if document.pk])
+            counts[model._meta.model_name] += len(batch)
+    changed()
+    return counts
+
+
+def search(query, resource_type=None, limit=20, offset=0):
+    """Returns the documents matching a query, best match first
+
+    The documents are matched, ranked and paged by the full-text
+    index of the database in a single query.
+
+    Args:
+        query (str): The query typed by the user
+        resource_type (str, optional): 'book' or 'video' to restrict
+            results to. Defaults to every type of resource.
+        limit (int, optional): The maximum number of documents
+        offset (int, optional): The number of documents to skip
+
+    Returns:
+        list: SearchDocument instances with a ``score`` attribute
+    """
+    return get_backend().search(query, resource_type, limit, offset)
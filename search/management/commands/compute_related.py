@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from search import related
+
+
+class Command(BaseCommand):
+    help = ('Computes the related books and videos shown on detail '
+        'pages from the tags they share. Only resources whose tags '
+        'changed since the last run, and the lists they affect, are '
+        'computed unless --full is given. Schedule it periodically.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+            help='Compute every resource, as needed after changing the '
+                'count or metric')
+        parser.add_argument('--count', type=int, default=related.NEIGHBOURS,
+            help='Number of neighbours stored per resource')
+        parser.add_argument('--metric', choices=related.METRICS,
+            default='cosine', help='How shared tags are scored')
+        parser.add_argument('--batch-size', type=int, default=100,
+            help='Number of resources scored at once')
+
+    def handle(self, *args, **options):
+        counts = related.compute(full=options['full'],
+            count=options['count'], metric=options['metric'],
+            batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            'Computed {computed} of {resources} resources'.format(
+                **counts)))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from search import index
+
+
+class Command(BaseCommand):
+    help = ('Rebuilds the full-text search index of books and videos. '
+        'Run it after the search migrations are first applied and after '
+        'bulk operations that bypass model signals.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+            help='Number of resources indexed per query')
+
+    def handle(self, *args, **options):
+        counts = index.rebuild(batch_size=options['batch_size'])
+        for resource_type, count in counts.items():
+            self.stdout.write('{}: {}'.format(resource_type, count))
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
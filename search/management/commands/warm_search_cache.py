@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from search import cache
+from search.views import SearchView
+
+
+class Command(BaseCommand):
+    help = ('Caches the first page of results of the most popular '
+        'search queries and deletes the counts too old to rank them. '
+        'Cron runs it with --if-stale (see cron.yaml) to warm the '
+        'cache after each deploy or catalogue change.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=50,
+            help='Number of queries warmed')
+        parser.add_argument('--days', type=int, default=cache.POPULAR_DAYS,
+            help='Number of days of searches ranking the queries')
+        parser.add_argument('--if-stale', action='store_true',
+            help='Do nothing unless the deploy or catalogue changed '
+                'since the cache was last warmed')
+
+    def handle(self, *args, **options):
+        if options['if_stale'] and cache.is_warm():
+            self.stdout.write('The search cache is already warm')
+            return
+        pruned = cache.prune(options['days'])
+        # the search page fetches one extra result to find out if
+        # there is another page
+        warmed = cache.warm(SearchView.paginate_by + 1,
+            limit=options['limit'], days=options['days'])
+        self.stdout.write(self.style.SUCCESS(
+            'Warmed {} queries, deleted {} old counts'.format(
+                warmed, pruned)))
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource_type', models.CharField(help_text='The model name of the resource', max_length=20)),
+                ('object_id', models.PositiveIntegerField()),
+                ('slug', models.SlugField()),
+                ('title', models.CharField(max_length=50)),
+                ('summary', models.TextField(blank=True)),
+                ('body', models.TextField(blank=True, help_text='The summary, category name and tag names')),
+                ('date_posted', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='searchdocument',
+            constraint=models.UniqueConstraint(fields=('resource_type', 'object_id'), name='search_document_unique_resource'),
+        ),
+    ]
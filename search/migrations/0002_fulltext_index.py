@@ -0,0 +1,75 @@
+from django.db import migrations
+
+TABLE = 'search_searchdocument'
+
+POSTGRESQL_VECTOR = (
+    "setweight(to_tsvector('english'::regconfig, title), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, body), 'B')"
+)
+
+# Statements creating and dropping the full-text index of each vendor
+FULLTEXT_INDEXES = {
+    'postgresql': (
+        ['CREATE INDEX {0}_fts ON {0} USING GIN (({1}))'.format(
+            TABLE, POSTGRESQL_VECTOR)],
+        ['DROP INDEX {}_fts'.format(TABLE)],
+    ),
+    'mysql': (
+        ['ALTER TABLE {0} ADD FULLTEXT INDEX {0}_fts (title, body)'.format(
+            TABLE)],
+        ['ALTER TABLE {0} DROP INDEX {0}_fts'.format(TABLE)],
+    ),
+    'sqlite': (
+        [
+            # an external content table, so the text isn't stored twice
+            "CREATE VIRTUAL TABLE {0}_fts USING fts5(title, body, "
+            "content='{0}', content_rowid='id', "
+            "tokenize='porter unicode61')".format(TABLE),
+            'CREATE TRIGGER {0}_fts_insert AFTER INSERT ON {0} BEGIN '
+            'INSERT INTO {0}_fts(rowid, title, body) '
+            'VALUES (new.id, new.title, new.body); END'.format(TABLE),
+            'CREATE TRIGGER {0}_fts_delete AFTER DELETE ON {0} BEGIN '
+            "INSERT INTO {0}_fts({0}_fts, rowid, title, body) "
+            "VALUES ('delete', old.id, old.title, old.body); "
+            'END'.format(TABLE),
+            'CREATE TRIGGER {0}_fts_update AFTER UPDATE ON {0} BEGIN '
+            "INSERT INTO {0}_fts({0}_fts, rowid, title, body) "
+            "VALUES ('delete', old.id, old.title, old.body); "
+            'INSERT INTO {0}_fts(rowid, title, body) '
+            'VALUES (new.id, new.title, new.body); END'.format(TABLE),
+        ],
+        [
+            'DROP TRIGGER {}_fts_update'.format(TABLE),
+            'DROP TRIGGER {}_fts_delete'.format(TABLE),
+            'DROP TRIGGER {}_fts_insert'.format(TABLE),
+            'DROP TABLE {}_fts'.format(TABLE),
+        ],
+    ),
+}
+
+
+def run_statements(schema_editor, forwards):
+    statements = FULLTEXT_INDEXES.get(schema_editor.connection.vendor)
+    if statements is None:
+        return
+    for sql in statements[0 if forwards else 1]:
+        schema_editor.execute(sql)
+
+
+def create_fulltext_index(apps, schema_editor):
+    run_statements(schema_editor, forwards=True)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    run_statements(schema_editor, forwards=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0002_fulltext_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedResources',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource_type', models.CharField(help_text='The model name of the resource', max_length=20)),
+                ('object_id', models.PositiveIntegerField()),
+                ('related', models.JSONField(default=list, help_text='[resource type, id, similarity] lists, best first')),
+                ('tags_changed', models.DateTimeField(blank=True, help_text='When the tags changed since the neighbours were computed', null=True)),
+                ('date_computed', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'related resources',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='relatedresources',
+            index=models.Index(fields=['tags_changed'], name='search_related_changed_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='relatedresources',
+            constraint=models.UniqueConstraint(fields=('resource_type', 'object_id'), name='search_related_unique_resource'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:47
+
+from django.db import migrations, models
+
+# Indexes backing the word_similarity (<%) operator of fuzzy matching.
+# Other databases use the in-memory index of search.fuzzy instead.
+TRIGRAM_INDEXES = [
+    ('search', 'SearchDocument', 'title'),
+    ('core', 'Tag', 'name'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for app_label, model_name, column in TRIGRAM_INDEXES:
+        table = apps.get_model(app_label, model_name)._meta.db_table
+        schema_editor.execute(
+            'CREATE INDEX {0}_{1}_trgm ON {0} USING GIN '
+            '({1} gin_trgm_ops)'.format(table, column))
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for app_label, model_name, column in TRIGRAM_INDEXES:
+        table = apps.get_model(app_label, model_name)._meta.db_table
+        schema_editor.execute(
+            'DROP INDEX {}_{}_trgm'.format(table, column))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_counter'),
+        ('search', '0003_related_resources'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrigramSnapshot',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.CharField(help_text='The fuzzy index version the snapshot was built at', max_length=32)),
+                ('data', models.BinaryField()),
+                ('date_built', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
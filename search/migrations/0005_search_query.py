@@ -0,0 +1,34 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0004_trigram_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchQuery',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(help_text='The normalized query', max_length=100)),
+                ('resource_type', models.CharField(blank=True, help_text='The resource type searched, blank for every type', max_length=20)),
+                ('day', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'search queries',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='searchquery',
+            index=models.Index(fields=['day'], name='search_query_day_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='searchquery',
+            constraint=models.UniqueConstraint(fields=('query', 'resource_type', 'day'), name='search_query_unique_day'),
+        ),
+    ]
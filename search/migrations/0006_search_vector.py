@@ -0,0 +1,45 @@
+from django.db import migrations
+
+TABLE = 'search_searchdocument'
+
+POSTGRESQL_VECTOR = (
+    "setweight(to_tsvector('english'::regconfig, title), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, body), 'B')"
+)
+
+
+def store_search_vectors(apps, schema_editor):
+    # the ranking reads a stored tsvector instead of parsing the text
+    # of every matching document, which holds whole books
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'ALTER TABLE {} ADD COLUMN search_vector tsvector'.format(TABLE))
+    schema_editor.execute('UPDATE {} SET search_vector = {}'.format(
+        TABLE, POSTGRESQL_VECTOR))
+    schema_editor.execute('DROP INDEX {}_fts'.format(TABLE))
+    schema_editor.execute(
+        'CREATE INDEX {0}_fts ON {0} USING GIN (search_vector)'.format(
+            TABLE))
+
+
+def drop_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX {}_fts'.format(TABLE))
+    schema_editor.execute(
+        'ALTER TABLE {} DROP COLUMN search_vector'.format(TABLE))
+    schema_editor.execute(
+        'CREATE INDEX {0}_fts ON {0} USING GIN (({1}))'.format(
+            TABLE, POSTGRESQL_VECTOR))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0005_search_query'),
+    ]
+
+    operations = [
+        migrations.RunPython(store_search_vectors, drop_search_vectors),
+    ]
@@ -0,0 +1,114 @@
+from django.db import models
+from django.urls import reverse
+
+
+class SearchDocument(models.Model):
+    """
+    The searchable text of a book or video.
+
+    Documents are kept in sync with the resources by signals and hold
+    everything a search result shows, so results are read from the
+    full-text index without touching the resource tables. The index
+    itself is created per database vendor by the migrations.
+    """
+    resource_type = models.CharField(max_length=20,
+        help_text='The model name of the resource')
+    object_id = models.PositiveIntegerField()
+    slug = models.SlugField()
+    title = models.CharField(max_length=50)
+    summary = models.TextField(blank=True)
+    body = models.TextField(blank=True,
+        help_text='The summary, category name and tag names')
+    date_posted = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['resource_type', 'object_id'],
+                name='search_document_unique_resource'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+    def get_absolute_url(self):
+        # resource URL names match their model names
+        return reverse(self.resource_type, kwargs={'slug': self.slug})
+
+
+class RelatedResources(models.Model):
+    """
+    The books and videos sharing the most tags with a book or video.
+
+    Neighbours are computed offline by the ``compute_related`` command
+    and stored as a list so that a detail page reads them in one query.
+    Signals mark the resources whose tags change, and the next run
+    recomputes them along with the neighbour lists they affect.
+    """
+    resource_type = models.CharField(max_length=20,
+        help_text='The model name of the resource')
+    object_id = models.PositiveIntegerField()
+    related = models.JSONField(default=list,
+        help_text='[resource type, id, similarity] lists, best first')
+    tags_changed = models.DateTimeField(null=True, blank=True,
+        help_text='When the tags changed since the neighbours were '
+            'computed')
+    date_computed = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'related resources'
+        constraints = [
+            models.UniqueConstraint(fields=['resource_type', 'object_id'],
+                name='search_related_unique_resource'),
+        ]
+        indexes = [
+            models.Index(fields=['tags_changed'],
+                name='search_related_changed_idx'),
+        ]
+
+    def __str__(self):
+        return '{} {}'.format(self.resource_type, self.object_id)
+
+
+class TrigramSnapshot(models.Model):
+    """
+    The trigram index of titles and tags used for fuzzy matching on
+    databases without pg_trgm.
+
+    Processes load the latest snapshot into memory rather than each
+    rebuilding the index from every document.
+    """
+    version = models.CharField(max_length=32,
+        help_text='The fuzzy index version the snapshot was built at')
+    data = models.BinaryField()
+    date_built = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.version
+
+
+class SearchQuery(models.Model):
+    """
+    How many times a query was searched on a day.
+
+    The counts of recent days rank the queries whose results are
+    warmed in the cache by the ``warm_search_cache`` command.
+    """
+    query = models.CharField(max_length=100,
+        help_text='The normalized query')
+    resource_type = models.CharField(max_length=20, blank=True,
+        help_text='The resource type searched, blank for every type')
+    day = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'search queries'
+        constraints = [
+            models.UniqueConstraint(fields=['query', 'resource_type', 'day'],
+                name='search_query_unique_day'),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='search_query_day_idx'),
+        ]
+
+    def __str__(self):
+        return self.query
@@ -0,0 +1,251 @@
+from collections import defaultdict
+
+import numpy as np
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from scipy import sparse
+
+from core.fragments import card_queryset
+
+from .index import searched_models
+from .models import RelatedResources
+
+# The number of neighbours stored per resource
+NEIGHBOURS = 10
+
+# The number of neighbours shown on detail pages
+SHOWN = 4
+
+METRICS = ('cosine', 'jaccard')
+
+
+def build_matrix():
+    """Builds the resource by tag matrix of every book and video
+
+    Returns:
+        tuple: The (resource type, id) key of each row and a sparse
+            matrix holding 1 where a resource has a tag
+    """
+    keys, rows, tags = [], [], []
+    for model in searched_models():
+        name = model._meta.model_name
+        pks = model.objects.order_by('pk').values_list('pk', flat=True)
+        position = {pk: len(keys) + i for i, pk in enumerate(pks)}
+        keys += [(name, pk) for pk in position]
+        for pk, tag in model.tags.through.objects.values_list(name, 'tag'):
+            # tagged after the resources were read
+            if pk in position:
+                rows.append(position[pk])
+                tags.append(tag)
+    tag_ids, columns = np.unique(np.array(tags, dtype=np.int64),
+        return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, columns)),
+        shape=(len(keys), len(tag_ids)))
+    return keys, matrix
+
+
+def similarities(matrix, rows, metric='cosine'):
+    """Scores some resources against every resource by shared tags
+
+    Args:
+        matrix (csr_matrix): A matrix from `build_matrix`
+        rows (list): The rows of the resources to score
+        metric (str, optional): 'cosine' or 'jaccard'
+
+    Returns:
+        csr_matrix: The similarity of each of the rows to each
+            resource, 0 where they share no tag
+    """
+    sizes = np.asarray(matrix.sum(axis=1)).ravel()
+    shared = (matrix[rows] @ matrix.T).tocoo()
+    left, right = sizes[rows][shared.row], sizes[shared.col]
+    if metric == 'jaccard':
+        scores = shared.data / (left + right - shared.data)
+    else:
+        scores = shared.data / np.sqrt(left * right)
+    return sparse.csr_matrix((scores, (shared.row, shared.col)),
+        shape=shared.shape)
+
+
+def top_neighbours(matrix, rows, count=NEIGHBOURS, metric='cosine'):
+    """Finds the most similar resources to some resources
+
+    Args:
+        matrix (csr_matrix): A matrix from `build_matrix`
+        rows (list): The rows of the resources
+        count (int, optional): The number of neighbours per resource
+        metric (str, optional): 'cosine' or 'jaccard'
+
+    Returns:
+        list: For each row, (row, similarity) tuples best first,
+            leaving out resources sharing no tag
+    """
+    count = min(count, matrix.shape[0] - 1)
+    if count < 1:
+        return [[] for row in rows]
+    scores = similarities(matrix, rows, metric).toarray()
+    scores[np.arange(len(rows)), rows] = 0
+    best = np.argpartition(-scores, count - 1, axis=1)[:, :count]
+    best_scores = np.take_along_axis(scores, best, axis=1)
+    # ties go to books before videos, then the oldest
+    order = np.lexsort((best, -best_scores))
+    best = np.take_along_axis(best, order, axis=1)
+    best_scores = np.take_along_axis(best_scores, order, axis=1)
+    return [
+        [(int(column), float(score))
+            for column, score in zip(columns, row_scores) if score > 0]
+        for columns, row_scores in zip(best, best_scores)
+    ]
+
+
+def compute(full=False, count=NEIGHBOURS, metric='cosine',
+    batch_size=100):
+    """Computes and stores the neighbours of books and videos
+
+    Unless full is True, only the resources whose tags changed or that
+    have no neighbours yet are computed, along with the resources
+    whose neighbours they join or leave.
+
+    Args:
+        full (bool, optional): Whether to compute every resource, as
+            needed after changing the count or metric
+        count (int, optional): The number of neighbours per resource
+        metric (str, optional): 'cosine' or 'jaccard'
+        batch_size (int, optional): Number of resources scored at once
+
+    Returns:
+        dict: The number of resources and how many were computed
+    """
+    started = timezone.now()
+    keys, matrix = build_matrix()
+    position = {key: row for row, key in enumerate(keys)}
+    stored = {
+        (resource_type, object_id): (pk, related, changed)
+        for pk, resource_type, object_id, related, changed in
+        RelatedResources.objects.values_list('pk', 'resource_type',
+            'object_id', 'related', 'tags_changed')
+    }
+
+    if full:
+        targets = set(range(len(keys)))
+    else:
+        targets = {position[key] for key, (pk, related, changed) in
+            stored.items() if changed is not None and key in position}
+        targets |= {row for row, key in enumerate(keys)
+            if key not in stored}
+        changed = sorted(targets)
+        best = np.zeros(len(keys))
+        for start in range(0, len(changed), batch_size):
+            best = np.maximum(best, similarities(matrix,
+                changed[start:start + batch_size], metric).max(
+                    axis=0).toarray().ravel())
+        changed = set(changed)
+        for key, (pk, related, tags_changed) in stored.items():
+            row = position.get(key)
+            if row is None or row in targets:
+                continue
+            lowest = related[-1][2] if len(related) >= count else 0
+            listed = [position.get(tuple(neighbour[:2]))
+                for neighbour in related]
+            # a changed resource may now rank among its neighbours or
+            # drop out of them, and deleted ones must be replaced
+            if best[row] > lowest or any(neighbour is None or
+                neighbour in changed for neighbour in listed):
+                targets.add(row)
+
+    targets = sorted(targets)
+    for start in range(0, len(targets), batch_size):
+        rows = targets[start:start + batch_size]
+        created, updated = [], []
+        for row, neighbours in zip(rows,
+            top_neighbours(matrix, rows, count, metric)):
+            resource_type, object_id = keys[row]
+            related = RelatedResources(
+                pk=stored.get(keys[row], (None,))[0],
+                resource_type=resource_type,
+                object_id=object_id,
+                related=[list(keys[neighbour]) + [round(score, 4)]
+                    for neighbour, score in neighbours],
+                date_computed=timezone.now(),
+            )
+            (created if related.pk is None else updated).append(related)
+        RelatedResources.objects.bulk_create(created)
+        RelatedResources.objects.bulk_update(updated,
+            ['related', 'date_computed'])
+
+    # changes made during the run are computed by the next one
+    RelatedResources.objects.filter(
+        tags_changed__lte=started).update(tags_changed=None)
+    RelatedResources.objects.filter(pk__in=[
+        pk for key, (pk, related, changed) in stored.items()
+        if key not in position
+    ]).delete()
+    return {'resources': len(keys), 'computed': len(targets)}
+
+
+def mark_changed(model, pks):
+    """Marks resources whose tags changed for the next computation
+
+    Args:
+        model (Model): Book or Video
+        pks (iterable): Primary keys of the resources
+    """
+    RelatedResources.objects.filter(resource_type=model._meta.model_name,
+        object_id__in=list(pks)).update(tags_changed=timezone.now())
+
+
+def remove(model, pks):
+    """Deletes the neighbours of deleted resources
+
+    Args:
+        model (Model): Book or Video
+        pks (iterable): Primary keys of the resources
+    """
+    RelatedResources.objects.filter(resource_type=model._meta.model_name,
+        object_id__in=list(pks)).delete()
+
+
+def _stored(queryset, field):
+    return Subquery(RelatedResources.objects.filter(
+        resource_type=queryset.model._meta.model_name,
+        object_id=OuterRef('pk'),
+    ).values(field)[:1])
+
+
+def with_related(queryset):
+    """
+    Annotates resources with their stored neighbours as
+    ``related_list`` and the time they were computed as
+    ``related_computed``, read in the same query
+    """
+    return queryset.annotate(
+        related_list=_stored(queryset, 'related'),
+        related_computed=_stored(queryset, 'date_computed'),
+    )
+
+
+def load(related, limit=SHOWN):
+    """Fetches the resources of a stored neighbour list
+
+    Args:
+        related (list): The ``related`` list of a RelatedResources
+        limit (int, optional): The number of neighbours to fetch
+
+    Returns:
+        list: Book and Video instances in the order of the list,
+            leaving out deleted ones
+    """
+    pks = defaultdict(list)
+    for resource_type, pk, score in (related or [])[:limit]:
+        pks[resource_type].append(pk)
+    found = {}
+    for model in searched_models():
+        name = model._meta.model_name
+        if pks[name]:
+            for resource in card_queryset(model.objects.filter(
+                pk__in=pks[name])):
+                found[(name, resource.pk)] = resource
+    return [found[(resource_type, pk)]
+        for resource_type, pk, score in (related or [])[:limit]
+        if (resource_type, pk) in found]
@@ -0,0 +1,169 @@
+from django.apps import apps
+from django.conf import settings
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+    pre_delete)
+from django.dispatch import receiver
+
+from . import fuzzy, index, related, typeahead
+
+
+@receiver(post_save, sender='books.Book')
+@receiver(post_save, sender='videos.Video')
+def index_resource(sender, instance, raw=False, **kwargs):
+    """Indexes a saved resource"""
+    if not raw:
+        index.index_resources(sender, [instance.pk])
+
+
+@receiver(post_delete, sender='books.Book')
+@receiver(post_delete, sender='videos.Video')
+def remove_resource(sender, instance, **kwargs):
+    """Removes a deleted resource from the index"""
+    index.remove_resources(sender, [instance.pk])
+    related.remove(sender, [instance.pk])
+
+
+@receiver(post_save, sender='books.BookText')
+@receiver(post_delete, sender='books.BookText')
+def index_book_text(sender, instance, raw=False, **kwargs):
+    """Reindexes a book whose text was extracted or deleted"""
+    if not raw:
+        index.index_resources(apps.get_model('books.Book'),
+            [instance.book_id])
+
+
+def _index_group(field, instance):
+    for model in index.searched_models():
+        index.index_resources(model, model.objects.filter(
+            **{field: instance}).values_list('pk', flat=True))
+
+
+@receiver(post_save, sender='core.Category')
+def index_category_resources(sender, instance, created, raw=False,
+    **kwargs):
+    """Reindexes the resources in a renamed category"""
+    if not created and not raw:
+        _index_group('category', instance)
+
+
+@receiver(post_save, sender='core.Tag')
+def index_tag_resources(sender, instance, created, raw=False, **kwargs):
+    """Reindexes the resources with a renamed tag"""
+    if not created and not raw:
+        _index_group('tags', instance)
+
+
+@receiver(post_save, sender='core.Tag')
+@receiver(post_delete, sender='core.Tag')
+def publish_fuzzy_tag_change(sender, instance, raw=False, **kwargs):
+    """Updates the fuzzy matching of tag names"""
+    if not raw:
+        fuzzy.changed()
+
+
+@receiver(pre_delete, sender='core.Tag')
+def collect_tag_resources(sender, instance, **kwargs):
+    """Remembers the resources of a tag about to be deleted"""
+    instance._search_resources = {
+        model: list(model.objects.filter(tags=instance).values_list(
+            'pk', flat=True))
+        for model in index.searched_models()
+    }
+
+
+@receiver(post_delete, sender='core.Tag')
+def index_deleted_tag_resources(sender, instance, **kwargs):
+    """Reindexes the resources of a deleted tag"""
+    for model, pks in getattr(instance, '_search_resources', {}).items():
+        index.index_resources(model, pks)
+        related.mark_changed(model, pks)
+
+
+@receiver(m2m_changed, sender='books.Book_tags')
+@receiver(m2m_changed, sender='videos.Video_tags')
+def index_tagged_resources(sender, instance, action, reverse, model,
+    pk_set, **kwargs):
+    """
+    Reindexes resources whose tags change and marks their related
+    resources for recomputation
+    """
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            index.index_resources(type(instance), [instance.pk])
+            related.mark_changed(type(instance), [instance.pk])
+        return
+
+    # the instance is a tag and model is the resource model
+    if action == 'pre_clear':
+        instance._search_cleared = list(model.objects.filter(
+            tags=instance).values_list('pk', flat=True))
+    elif action == 'post_clear':
+        pks = getattr(instance, '_search_cleared', [])
+        index.index_resources(model, pks)
+        related.mark_changed(model, pks)
+    elif action in ('post_add', 'post_remove'):
+        index.index_resources(model, pk_set)
+        related.mark_changed(model, pk_set)
+
+
+@receiver(post_save, sender='books.Book')
+@receiver(post_save, sender='videos.Video')
+@receiver(post_save, sender='core.Category')
+@receiver(post_save, sender='core.Tag')
+@receiver(post_delete, sender='books.Book')
+@receiver(post_delete, sender='videos.Video')
+@receiver(post_delete, sender='core.Category')
+@receiver(post_delete, sender='core.Tag')
+def publish_typeahead_change(sender, instance, **kwargs):
+    """Updates the typeahead suggestion of a changed object"""
+    typeahead.record_changes(sender._meta.model_name, [instance.pk])
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def publish_author_change(sender, instance, update_fields=None,
+    **kwargs):
+    """Updates the typeahead suggestion of a renamed author"""
+    # logging in saves last_login only
+    if update_fields and not {'first_name', 'last_name'} & set(
+        update_fields):
+        return
+    typeahead.record_changes('author', [instance.pk])
+
+
+@receiver(pre_delete, sender='books.Book')
+@receiver(pre_delete, sender='videos.Video')
+def collect_typeahead_authors(sender, instance, **kwargs):
+    """Remembers the authors of a resource about to be deleted"""
+    instance._typeahead_authors = list(
+        instance.authors.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender='books.Book')
+@receiver(post_delete, sender='videos.Video')
+def publish_deleted_authors(sender, instance, **kwargs):
+    """Drops authors left without resources from the suggestions"""
+    typeahead.record_changes('author',
+        getattr(instance, '_typeahead_authors', []))
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def publish_deleted_author(sender, instance, **kwargs):
+    typeahead.record_changes('author', [instance.pk])
+
+
+@receiver(m2m_changed, sender='books.Book_authors')
+@receiver(m2m_changed, sender='videos.Video_authors')
+def publish_authorship_change(sender, instance, action, reverse, model,
+    pk_set, **kwargs):
+    """Adds or drops authors as they gain or lose their resources"""
+    if reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            typeahead.record_changes('author', [instance.pk])
+    elif action == 'pre_clear':
+        instance._typeahead_cleared = list(
+            instance.authors.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        typeahead.record_changes('author',
+            getattr(instance, '_typeahead_cleared', []))
+    elif action in ('post_add', 'post_remove'):
+        typeahead.record_changes('author', pk_set)
@@ -0,0 +1,150 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from books.models import Book
+from core.models import Category
+from search import cache as search_cache
+from search.models import SearchQuery
+
+
+class SearchCacheTestCase(TestCase):
+    """
+    Tests for caching search results
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.agribusiness = Category.objects.create(
+            name='Agribusiness',
+            slug='agribusiness'
+        )
+        cls.handbook = Book.objects.create(
+            title='The Hydroponics handbook',
+            category=cls.agribusiness,
+            slug='the-hydroponics-handbook',
+            file_upload='book.pdf'
+        )
+
+    def setUp(self):
+        cache.clear()
+        search_cache.result_stats.reset()
+
+    def test_normalize_query(self):
+        """
+        Test that queries are lowercased and stripped of punctuation
+        """
+        self.assertEqual(search_cache.normalize_query(' Fish,  FARMING! '),
+            'fish farming')
+        self.assertEqual(search_cache.normalize_query('?!'), '')
+
+    def test_results_cached(self):
+        """
+        Test that results are read from the cache without the body
+        """
+        results = search_cache.search('hydroponics')
+        with self.assertNumQueries(0):
+            cached = search_cache.search('HYDROPONICS')
+        self.assertEqual(cached, results)
+        self.assertEqual(cached[0].title, 'The Hydroponics handbook')
+        self.assertEqual(cached[0].score, results[0].score)
+        self.assertEqual(cached[0].get_deferred_fields(), {'body'})
+        self.assertEqual(search_cache.result_stats.stats()['hits'], 1)
+
+    def test_filters_cached_separately(self):
+        """
+        Test that the resource type and page are part of the key
+        """
+        search_cache.search('hydroponics')
+        self.assertEqual(search_cache.search('hydroponics', 'video'), [])
+        self.assertEqual(search_cache.search('hydroponics', offset=1), [])
+
+    def test_catalogue_change_expires_results(self):
+        """
+        Test that changing a book expires the cached results
+        """
+        search_cache.search('hydroponics')
+        Book.objects.create(
+            title='Hydroponics on a budget',
+            category=self.agribusiness,
+            slug='hydroponics-on-a-budget',
+            file_upload='book.pdf'
+        )
+        self.assertEqual(len(search_cache.search('hydroponics')), 2)
+        self.assertEqual(search_cache.result_stats.stats()['misses'], 2)
+
+
+class PopularQueriesTestCase(TestCase):
+    """
+    Tests for counting searches and warming the popular queries
+    """
+    @classmethod
+    def setUpTestData(cls):
+        agribusiness = Category.objects.create(
+            name='Agribusiness',
+            slug='agribusiness'
+        )
+        Book.objects.create(
+            title='The Hydroponics handbook',
+            category=agribusiness,
+            slug='the-hydroponics-handbook',
+            file_upload='book.pdf'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.counter = search_cache.QueryCounter(flush_interval=60)
+
+    def test_counts_flushed(self):
+        """
+        Test that counts are kept in memory and added to the day's
+        counts when flushed
+        """
+        with self.assertNumQueries(0):
+            self.counter.add('Hydroponics')
+            self.counter.add('hydroponics!')
+            self.counter.add('poultry', 'video')
+            self.counter.add('  ')
+        self.counter.flush()
+        self.counter.add('hydroponics')
+        self.counter.flush()
+        self.assertEqual(search_cache.top_queries(), [
+            ('hydroponics', None, 3),
+            ('poultry', 'video', 1),
+        ])
+
+    def test_old_counts_ignored(self):
+        """
+        Test that only recent days rank the queries and that older
+        counts are pruned
+        """
+        today = timezone.localdate()
+        SearchQuery.objects.create(query='poultry', count=5,
+            day=today - timedelta(days=7))
+        SearchQuery.objects.create(query='hydroponics', count=1,
+            day=today)
+        self.assertEqual(search_cache.top_queries(),
+            [('hydroponics', None, 1)])
+        self.assertEqual(search_cache.prune(), 1)
+
+    def test_warm_search_cache_command(self):
+        """
+        Test that the command warms the popular queries once per
+        catalogue version
+        """
+        SearchQuery.objects.create(query='hydroponics', count=3,
+            day=timezone.localdate())
+        out = StringIO()
+        call_command('warm_search_cache', '--if-stale', stdout=out)
+        self.assertIn('Warmed 1 queries', out.getvalue())
+        self.assertTrue(search_cache.is_warm())
+        with self.assertNumQueries(0):
+            results = search_cache.search('hydroponics', limit=11)
+        self.assertEqual(len(results), 1)
+
+        out = StringIO()
+        call_command('warm_search_cache', '--if-stale', stdout=out)
+        self.assertIn('already warm', out.getvalue())
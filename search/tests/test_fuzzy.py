@@ -0,0 +1,106 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from books.models import Book
+from core.models import Category, Tag
+from search import fuzzy
+from search.models import TrigramSnapshot
+from videos.models import Video
+
+
+class TrigramsTestCase(TestCase):
+    """
+    Tests for splitting text into trigrams
+    """
+    def test_trigrams(self):
+        """
+        Test that words are padded and normalized like pg_trgm's
+        """
+        self.assertEqual(fuzzy.trigrams('Café!'),
+            {'  c', ' ca', 'caf', 'afe', 'fe '})
+        self.assertEqual(fuzzy.trigrams('?!'), set())
+
+
+class TrigramIndexTestCase(TestCase):
+    """
+    Tests for fuzzy matching with the in-memory trigram index
+    """
+    @classmethod
+    def setUpTestData(cls):
+        agribusiness = Category.objects.create(
+            name='Agribusiness',
+            slug='agribusiness'
+        )
+        cls.hydroponics = Tag.objects.create(
+            name='Hydroponics',
+            slug='hydroponics'
+        )
+        cls.handbook = Book.objects.create(
+            title='The Hydroponics handbook',
+            category=agribusiness,
+            slug='the-hydroponics-handbook',
+            file_upload='book.pdf'
+        )
+        cls.mungu = Video.objects.create(
+            title='Mungu ni mwema',
+            category=agribusiness,
+            slug='mungu-ni-mwema',
+            url='https://youtu.be/rAKLiE658m0'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.index = fuzzy.TrigramIndex(refresh_interval=0)
+
+    def test_misspelt_titles_matched(self):
+        """
+        Test that titles are found despite typos and ranked by how
+        many of the query's trigrams they share
+        """
+        results = self.index.search('hydroponcs')
+        self.assertEqual([result.slug for result in results],
+            ['the-hydroponics-handbook'])
+        self.assertEqual(results[0].score, 9 / 11)
+        self.assertEqual(self.index.search('mungo mwena')[0].slug,
+            'mungu-ni-mwema')
+        self.assertEqual(self.index.search('prayer'), [])
+
+    def test_resource_type_filter(self):
+        """
+        Test that matches can be restricted to a resource type
+        """
+        self.assertEqual(self.index.search('hydroponcs', 'video'), [])
+
+    def test_misspelt_tags_matched(self):
+        """
+        Test that tags are matched without reading the database
+        """
+        self.index.refresh()
+        with self.assertNumQueries(0):
+            tags = self.index.tags('hydroponix')
+        self.assertEqual(tags, [self.hydroponics])
+        self.assertEqual(tags[0].slug, 'hydroponics')
+
+    def test_snapshot_loaded(self):
+        """
+        Test that other processes load the persisted index instead of
+        building their own
+        """
+        self.index.refresh()
+        self.assertEqual(TrigramSnapshot.objects.get().version,
+            self.index.version)
+        other = fuzzy.TrigramIndex()
+        with self.assertNumQueries(1):
+            other.refresh()
+        self.assertEqual(other.state, self.index.state)
+
+    def test_changes_picked_up(self):
+        """
+        Test that the index is rebuilt once titles change
+        """
+        self.index.refresh()
+        self.handbook.title = 'Aquaponics at home'
+        self.handbook.save()
+        self.assertEqual(self.index.search('hydroponcs'), [])
+        self.assertEqual(self.index.search('aquaponix')[0].slug,
+            'the-hydroponics-handbook')
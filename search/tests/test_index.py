@@ -0,0 +1,131 @@
+from django.core.management import call_command
+from django.test import TestCase
+
+from books.models import Book
+from core.models import Category, Tag
+from search import index
+from search.models import SearchDocument
+from videos.models import Video
+
+
+class SearchIndexTestCase(TestCase):
+    """
+    Tests for keeping the search index in sync and querying it
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.agribusiness = Category.objects.create(
+            name='Agribusiness',
+            slug='agribusiness'
+        )
+        cls.spiritual = Category.objects.create(
+            name='Spiritual',
+            slug='spiritual'
+        )
+        cls.hydroponics = Tag.objects.create(
+            name='Hydroponics',
+            slug='hydroponics'
+        )
+        cls.handbook = Book.objects.create(
+            title='The Hydroponics handbook',
+            summary='A guide to growing crops in water',
+            category=cls.agribusiness,
+            slug='the-hydroponics-handbook',
+            cover_image='book-cover.jpg',
+            file_upload='book.pdf'
+        )
+        cls.farming = Book.objects.create(
+            title='Farming on a budget',
+            summary='Includes a chapter on hydroponics',
+            category=cls.agribusiness,
+            slug='farming-on-a-budget',
+            cover_image='book-cover.jpg',
+            file_upload='book.pdf'
+        )
+        cls.the_gift = Video.objects.create(
+            title='The Gift',
+            summary='Explains how to receive the free gift of salvation',
+            category=cls.spiritual,
+            slug='the-gift',
+            url='https://youtu.be/rAKLiE658m0'
+        )
+
+    def titles(self, query, **kwargs):
+        return [document.title for document in index.search(query, **kwargs)]
+
+    def test_saved_resources_indexed(self):
+        """
+        Test that creating resources creates their search documents
+        """
+        self.assertEqual(SearchDocument.objects.count(), 3)
+        self.assertEqual(self.titles('salvation'), ['The Gift'])
+
+    def test_results_ranked(self):
+        """
+        Test that matches in the title rank above matches in the body
+        """
+        self.assertEqual(self.titles('hydroponics'),
+            ['The Hydroponics handbook', 'Farming on a budget'])
+
+    def test_results_filtered_and_paged(self):
+        """
+        Test that results can be restricted to a type and paged
+        """
+        self.assertEqual(self.titles('hydroponics', resource_type='video'),
+            [])
+        self.assertEqual(self.titles('hydroponics', limit=1, offset=1),
+            ['Farming on a budget'])
+
+    def test_all_words_must_match(self):
+        """
+        Test that every word of the query must match and that
+        punctuation is not read as query syntax
+        """
+        self.assertEqual(self.titles('hydroponics budget'),
+            ['Farming on a budget'])
+        self.assertEqual(self.titles('"budget" -(farming*'),
+            ['Farming on a budget'])
+        self.assertEqual(self.titles('  '), [])
+
+    def test_category_and_tags_indexed(self):
+        """
+        Test that category and tag names are searchable and kept in
+        sync when they change
+        """
+        self.assertEqual(self.titles('spiritual'), ['The Gift'])
+
+        self.the_gift.tags.add(self.hydroponics)
+        self.assertIn('The Gift', self.titles('hydroponics'))
+
+        self.hydroponics.name = 'Aquaponics'
+        self.hydroponics.save()
+        self.assertEqual(self.titles('aquaponics'), ['The Gift'])
+
+        self.hydroponics.delete()
+        self.assertEqual(self.titles('aquaponics'), [])
+
+        self.spiritual.name = 'Devotional'
+        self.spiritual.save()
+        self.assertEqual(self.titles('devotional'), ['The Gift'])
+
+    def test_updated_and_deleted_resources(self):
+        """
+        Test that edits and deletions reach the index
+        """
+        self.farming.title = 'Farming on a shoestring'
+        self.farming.save()
+        self.assertEqual(self.titles('shoestring'),
+            ['Farming on a shoestring'])
+
+        self.farming.delete()
+        self.assertEqual(self.titles('shoestring'), [])
+        self.assertEqual(SearchDocument.objects.count(), 2)
+
+    def test_rebuild_command(self):
+        """
+        Test that the rebuild command recreates every document
+        """
+        SearchDocument.objects.all().delete()
+        call_command('rebuild_search_index', stdout=open('/dev/null', 'w'))
+        self.assertEqual(SearchDocument.objects.count(), 3)
+        self.assertEqual(self.titles('salvation'), ['The Gift'])
@@ -0,0 +1,176 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from books.models import Book
+from core.models import Category, Tag
+from search import related
+from search.models import RelatedResources
+from videos.models import Video
+
+
+class RelatedResourcesTestCase(TestCase):
+    """
+    Tests for computing the related resources of books and videos
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.agribusiness = Category.objects.create(
+            name='Agribusiness',
+            slug='agribusiness'
+        )
+        cls.tags = {
+            name: Tag.objects.create(name=name.title(), slug=name)
+            for name in ('farming', 'fish', 'poultry', 'finance', 'prayer')
+        }
+        cls.resources = {}
+        for slug, tags in (
+            ('fish-farming', ['farming', 'fish', 'poultry']),
+            ('pond-design', ['farming', 'fish']),
+            ('poultry-finance', ['poultry', 'finance']),
+            ('daily-prayer', ['prayer']),
+        ):
+            cls.resources[slug] = Book.objects.create(
+                title=slug.replace('-', ' ').title(),
+                category=cls.agribusiness,
+                slug=slug,
+                file_upload='book.pdf'
+            )
+            cls.resources[slug].tags.add(*[cls.tags[tag] for tag in tags])
+        for slug, tags in (
+            ('tilapia-farming', ['farming', 'fish', 'poultry']),
+            ('farm-accounts', ['finance']),
+        ):
+            cls.resources[slug] = Video.objects.create(
+                title=slug.replace('-', ' ').title(),
+                category=cls.agribusiness,
+                slug=slug,
+                url='https://youtu.be/rAKLiE658m0'
+            )
+            cls.resources[slug].tags.add(*[cls.tags[tag] for tag in tags])
+
+    def neighbours(self):
+        slugs = {(type(resource)._meta.model_name, resource.pk): slug
+            for slug, resource in self.resources.items()}
+        return {
+            slugs[(row.resource_type, row.object_id)]:
+                [slugs[(resource_type, pk)]
+                    for resource_type, pk, score in row.related]
+            for row in RelatedResources.objects.all()
+        }
+
+    def test_compute(self):
+        """
+        Test that neighbours are ordered by the cosine similarity of
+        their tags and that resources sharing no tag are left out
+        """
+        counts = related.compute()
+        self.assertEqual(counts, {'resources': 6, 'computed': 6})
+        neighbours = self.neighbours()
+        self.assertEqual(neighbours['fish-farming'],
+            ['tilapia-farming', 'pond-design', 'poultry-finance'])
+        self.assertEqual(neighbours['farm-accounts'], ['poultry-finance'])
+        self.assertEqual(neighbours['daily-prayer'], [])
+
+        row = RelatedResources.objects.get(resource_type='book',
+            object_id=self.resources['fish-farming'].pk)
+        self.assertEqual([score for *key, score in row.related],
+            [1.0, 0.8165, 0.4082])
+
+    def test_jaccard(self):
+        """
+        Test that neighbours can be scored by Jaccard similarity
+        """
+        related.compute(metric='jaccard')
+        row = RelatedResources.objects.get(resource_type='book',
+            object_id=self.resources['fish-farming'].pk)
+        self.assertEqual([score for *key, score in row.related],
+            [1.0, 0.6667, 0.25])
+
+    def test_incremental_compute(self):
+        """
+        Test that changing tags only recomputes the resources it
+        affects, with the same result as computing everything
+        """
+        related.compute()
+        prayer = RelatedResources.objects.get(resource_type='book',
+            object_id=self.resources['daily-prayer'].pk)
+
+        self.resources['farm-accounts'].tags.add(self.tags['fish'])
+        self.assertEqual(related.compute(),
+            {'resources': 6, 'computed': 5})
+        incremental = self.neighbours()
+        self.assertEqual(incremental['farm-accounts'],
+            ['pond-design', 'poultry-finance', 'fish-farming',
+                'tilapia-farming'])
+        self.assertEqual(RelatedResources.objects.get(
+            pk=prayer.pk).date_computed, prayer.date_computed)
+
+        related.compute(full=True)
+        self.assertEqual(self.neighbours(), incremental)
+        self.assertEqual(related.compute(),
+            {'resources': 6, 'computed': 0})
+
+    def test_deleted_resource(self):
+        """
+        Test that deleting a resource drops its neighbours and
+        removes it from the neighbours of others
+        """
+        related.compute()
+        self.resources.pop('tilapia-farming').delete()
+        self.assertFalse(RelatedResources.objects.filter(
+            resource_type='video').exclude(
+                object_id=self.resources['farm-accounts'].pk).exists())
+
+        related.compute()
+        self.assertEqual(self.neighbours()['fish-farming'],
+            ['pond-design', 'poultry-finance'])
+
+    def test_compute_related_command(self):
+        """
+        Test that the command reports how many resources it computed
+        """
+        out = StringIO()
+        call_command('compute_related', stdout=out)
+        self.assertIn('Computed 6 of 6 resources', out.getvalue())
+
+    def test_load_prefetches_card_relations(self):
+        """
+        Test that the tags and authors of related resources are loaded
+        with them, for the cards missing from the cache
+        """
+        related.compute()
+        row = RelatedResources.objects.get(resource_type='book',
+            object_id=self.resources['fish-farming'].pk)
+        resources = related.load(row.related)
+        self.assertEqual(len(resources), 3)
+        with self.assertNumQueries(0):
+            for resource in resources:
+                list(resource.tags.all())
+                list(resource.authors.all())
+
+    def test_detail_page(self):
+        """
+        Test that detail pages show their related resources
+        """
+        cache.clear()
+        related.compute()
+        user = get_user_model().objects.create_user(
+            first_name = 'Kelvin',
+            email='kelvin@murage.com',
+            password='kelvinpassword'
+        )
+        self.client.force_login(user)
+        response = self.client.get('/books/fish-farming/')
+        self.assertEqual(response.context['related_resources'][:2],
+            [self.resources['tilapia-farming'],
+                self.resources['pond-design']])
+        self.assertContains(response, 'You may also like')
+        self.assertContains(response, 'Tilapia Farming')
+
+        response = self.client.get('/books/daily-prayer/')
+        self.assertEqual(response.context['related_resources'], [])
+        self.assertNotContains(response, 'You may also like')
@@ -0,0 +1,147 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from books.models import Book
+from core.models import Category, Tag
+from search import typeahead
+
+
+class TypeaheadIndexTestCase(TestCase):
+    """
+    Tests for the in-memory typeahead index
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.kelvin = get_user_model().objects.create_user(
+            first_name = 'Kelvin',
+            last_name = 'Murage',
+            email='kelvin@murage.com',
+            password='kelvinpassword'
+        )
+        cls.agribusiness = Category.objects.create(
+            name='Agribusiness',
+            slug='agribusiness'
+        )
+        cls.hydroponics = Tag.objects.create(
+            name='Hydroponics',
+            slug='hydroponics'
+        )
+        cls.handbook = Book.objects.create(
+            title='The Hydroponics handbook',
+            category=cls.agribusiness,
+            slug='the-hydroponics-handbook',
+            file_upload='book.pdf'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.index = typeahead.TypeaheadIndex()
+
+    def labels(self, query):
+        return [(result['kind'], result['label'])
+            for result in self.index.suggest(query)]
+
+    def test_prefix_of_any_word_matches(self):
+        """
+        Test that typing the start of any word of a label suggests it
+        """
+        self.assertEqual(self.labels('hydro'), [
+            ('tag', 'Hydroponics'),
+            ('book', 'The Hydroponics handbook'),
+        ])
+        self.assertEqual(self.labels('Hand'),
+            [('book', 'The Hydroponics handbook')])
+        self.assertEqual(self.labels('AGRI'),
+            [('category', 'Agribusiness')])
+        self.assertEqual(self.labels('handbooks'), [])
+        self.assertEqual(self.labels(' '), [])
+
+    def test_urls(self):
+        """
+        Test that resources link to their pages and groups don't
+        """
+        tag, book = self.index.suggest('hydroponics')
+        self.assertIsNone(tag['url'])
+        self.assertEqual(book['url'], '/books/the-hydroponics-handbook/')
+
+    def test_answered_without_queries(self):
+        """
+        Test that an up to date index is queried without the database
+        """
+        self.index.suggest('hydro')
+        with self.assertNumQueries(0):
+            self.index.suggest('hydro')
+
+    def test_changes_applied_incrementally(self):
+        """
+        Test that changes published by signals are replayed without
+        rebuilding the index
+        """
+        self.index.suggest('hydro')
+        book = Book.objects.create(
+            title='Hydroponics for beginners',
+            category=self.agribusiness,
+            slug='hydroponics-for-beginners',
+            file_upload='book.pdf'
+        )
+        self.hydroponics.name = 'Soilless farming'
+        self.hydroponics.save()
+        self.handbook.delete()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.labels('hydro'),
+                [('book', 'Hydroponics for beginners')])
+        self.assertEqual(self.labels('farm'),
+            [('tag', 'Soilless farming')])
+
+        book.title = 'Growing without soil'
+        book.save()
+        self.assertEqual(self.labels('hydro'), [])
+        self.assertEqual(self.labels('grow'),
+            [('book', 'Growing without soil')])
+
+    def test_authors_suggested(self):
+        """
+        Test that only users who authored resources are suggested
+        """
+        self.index.suggest('kel')
+        self.assertEqual(self.labels('kel'), [])
+        self.handbook.authors.add(self.kelvin)
+        self.assertEqual(self.labels('murage'),
+            [('author', 'Kelvin Murage')])
+        self.assertEqual(self.index.suggest('murage')[0]['url'],
+            '/authors/{}/'.format(self.kelvin.pk))
+        self.handbook.authors.clear()
+        self.assertEqual(self.labels('kel'), [])
+
+    def test_rebuilt_when_changes_are_lost(self):
+        """
+        Test that the index is rebuilt when it can't replay the
+        changes it missed
+        """
+        self.index.suggest('hydro')
+        Book.objects.create(
+            title='Hydroponics for beginners',
+            category=self.agribusiness,
+            slug='hydroponics-for-beginners',
+            file_upload='book.pdf'
+        )
+        cache.delete(typeahead.CHANGE_KEY.format(
+            cache.get(typeahead.VERSION_KEY)))
+        with self.assertNumQueries(5):
+            self.assertEqual(len(self.labels('hydro')), 3)
+
+    def test_rebuilt_when_old(self):
+        """
+        Test that the index is rebuilt after max_age seconds even when
+        no change reached it
+        """
+        self.index.suggest('hydro')
+        # a change made by a process whose cache this one doesn't see
+        Book.objects.filter(pk=self.handbook.pk).update(
+            title='Growing without soil')
+        self.assertEqual(len(self.labels('hydro')), 2)
+        self.index.built -= self.index.max_age
+        self.assertEqual(self.labels('grow'),
+            [('book', 'Growing without soil')])
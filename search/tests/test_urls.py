@@ -0,0 +1,14 @@
+from django.test import SimpleTestCase
+from django.urls import resolve, reverse
+
+
+class SearchURLsTestCase(SimpleTestCase):
+    """
+    Test URL configuration of search
+    """
+    def test_search_url(self):
+        """
+        Test that the search URL resolves to the search view
+        """
+        self.assertEqual(resolve(reverse('search')).func.__name__,
+            'SearchView')
@@ -0,0 +1,164 @@
+import os
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from books.models import Book
+from core.models import Category, Tag
+from search import cache as search_cache
+from search import fuzzy
+
+
+class SearchViewTestCase(TestCase):
+    """
+    Tests for the search view
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            first_name = 'Kelvin',
+            email='kelvin@murage.com',
+            password='kelvinpassword'
+        )
+        agribusiness = Category.objects.create(
+            name='Agribusiness',
+            slug='agribusiness'
+        )
+        for i in range(12):
+            Book.objects.create(
+                title='Hydroponics {}'.format(i),
+                category=agribusiness,
+                slug='hydroponics-{}'.format(i),
+                cover_image='book-cover.jpg',
+                file_upload='book.pdf'
+            )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        cache.clear()
+        # keep search counts in memory
+        search_cache.counter.counts.clear()
+        search_cache.counter.flushed = time.monotonic()
+
+    def test_redirect_if_not_logged_in(self):
+        """
+        Test that the search page requires login
+        """
+        self.client.logout()
+        response = self.client.get('/search/?q=hydroponics')
+        self.assertRedirects(response,
+            '/accounts/login/?next=/search/%3Fq%3Dhydroponics')
+
+    def test_search_results(self):
+        """
+        Test that results are read in a single query and paged
+        """
+        # the session and user are loaded before the search query, and
+        # the profile picture variants after it
+        with self.assertNumQueries(4):
+            response = self.client.get('/search/?q=hydroponics')
+        self.assertTemplateUsed(response, 'search/search.html')
+        self.assertEqual(len(response.context['results']), 10)
+        self.assertTrue(response.context['has_next'])
+        self.assertContains(response, '/books/hydroponics-11/')
+
+        response = self.client.get('/search/?q=hydroponics&page=2')
+        self.assertEqual(len(response.context['results']), 2)
+        self.assertFalse(response.context['has_next'])
+
+    def test_cached_results(self):
+        """
+        Test that queries differing only in case and spacing share
+        their cached results and that the first page is counted
+        """
+        self.client.get('/search/?q=hydroponics')
+        with self.assertNumQueries(2):
+            response = self.client.get('/search/?q=%20Hydroponics%20')
+        self.assertEqual(len(response.context['results']), 10)
+        self.assertContains(response, '/books/hydroponics-11/')
+
+        self.client.get('/search/?q=hydroponics&page=2')
+        self.assertEqual(
+            search_cache.counter.counts[('hydroponics', '')], 2)
+
+    def test_invalid_page(self):
+        """
+        Test that invalid page numbers are not found
+        """
+        response = self.client.get('/search/?q=hydroponics&page=zero')
+        self.assertEqual(response.status_code, 404)
+
+    def test_similar_titles_suggested(self):
+        """
+        Test that misspelt queries without exact matches show the
+        most similar titles instead
+        """
+        cache.clear()
+        fuzzy.index.checked = None
+        response = self.client.get('/search/?q=hydroponcs')
+        self.assertTrue(response.context['fuzzy'])
+        self.assertEqual(len(response.context['results']), 10)
+        self.assertContains(response, 'Did you mean')
+
+        response = self.client.get('/search/?q=hydroponics')
+        self.assertFalse(response.context['fuzzy'])
+
+
+    def test_similar_tags_link_searched_type(self):
+        """
+        Test that suggested tags link to the list of the resource type
+        searched
+        """
+        Tag.objects.create(name='Hydroponics', slug='hydroponics')
+        cache.clear()
+        fuzzy.index.checked = None
+        response = self.client.get('/search/?q=hydroponcs&type=video')
+        self.assertContains(response, 'href="/videos/tag/hydroponics/"')
+        self.assertNotContains(response, '/books/tag/hydroponics/')
+        response = self.client.get('/search/?q=hydroponcs')
+        self.assertContains(response, 'href="/books/tag/hydroponics/"')
+
+class ComputeRelatedCronTestCase(TestCase):
+    """
+    Tests for computing related resources from App Engine cron
+    """
+    url = '/search/cron/related/'
+
+    @mock.patch.dict(os.environ, {'GAE_APPLICATION': 'ndovu'})
+    def test_related_computed(self):
+        """
+        Test that the command is run for cron requests only
+        """
+        with mock.patch('search.views.call_command') as command:
+            refused = self.client.get(self.url)
+            response = self.client.get(self.url,
+                HTTP_X_APPENGINE_CRON='true')
+        self.assertEqual(refused.status_code, 403)
+        self.assertEqual(response.status_code, 200)
+        command.assert_called_once_with('compute_related',
+            stdout=mock.ANY, stderr=mock.ANY)
+
+
+class WarmCacheCronTestCase(TestCase):
+    """
+    Tests for warming the search cache from App Engine cron
+    """
+    url = '/search/cron/warm/'
+
+    @mock.patch.dict(os.environ, {'GAE_APPLICATION': 'ndovu'})
+    def test_stale_cache_warmed(self):
+        """
+        Test that the command is run for cron requests only, and only
+        warms a stale cache
+        """
+        with mock.patch('search.views.call_command') as command:
+            refused = self.client.get(self.url)
+            response = self.client.get(self.url,
+                HTTP_X_APPENGINE_CRON='true')
+        self.assertEqual(refused.status_code, 403)
+        self.assertEqual(response.status_code, 200)
+        command.assert_called_once_with('warm_search_cache', '--if-stale',
+            stdout=mock.ANY, stderr=mock.ANY)
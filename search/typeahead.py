@@ -0,0 +1,245 @@
+import bisect
+import re
+import threading
+import time
+import unicodedata
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Q
+from django.urls import reverse
+
+VERSION_KEY = 'typeahead:version'
+
+CHANGE_KEY = 'typeahead:change:{}'
+
+# Changes are kept long enough for idle processes to catch up; a
+# process that falls further behind rebuilds its index instead
+CHANGELOG_TIMEOUT = 60 * 60
+
+MAX_CHANGES = 500
+
+# Indexes are rebuilt at least this often, bounding how long a process
+# that missed changes keeps suggesting stale entries
+REBUILD_INTERVAL = 15 * 60
+
+
+def normalize(text):
+    """Lowercases text and strips its accents and punctuation
+
+    Args:
+        text (str): The text to normalize
+
+    Returns:
+        str: The words of the text separated by single spaces
+    """
+    text = unicodedata.normalize('NFKD', text.casefold())
+    text = ''.join(
+        char for char in text if not unicodedata.combining(char))
+    return ' '.join(re.findall(r'\w+', text))
+
+
+def _load_resources(label):
+    def load(pks=None):
+        queryset = apps.get_model(label).objects.only('title', 'slug')
+        if pks is not None:
+            queryset = queryset.filter(pk__in=pks)
+        return {resource.pk: (resource.title, resource.get_absolute_url())
+            for resource in queryset.order_by()}
+    return load
+
+
+def _load_groups(label):
+    def load(pks=None):
+        queryset = apps.get_model(label).objects.values_list('pk', 'name')
+        if pks is not None:
+            queryset = queryset.filter(pk__in=pks)
+        return {pk: (name, None) for pk, name in queryset.order_by()}
+    return load
+
+
+def _load_authors(pks=None):
+    queryset = get_user_model().objects.filter(
+        Q(books_book_author__isnull=False) |
+        Q(videos_video_author__isnull=False)
+    ).distinct().values_list('pk', 'first_name', 'last_name')
+    if pks is not None:
+        queryset = queryset.filter(pk__in=pks)
+    return {
+        pk: ('{} {}'.format(first_name, last_name).strip(),
+            reverse('author', kwargs={'pk': pk}))
+        for pk, first_name, last_name in queryset.order_by()
+    }
+
+
+# Loads the (label, URL) entries of each kind of suggestion, for
+# every object or for the given primary keys only. Objects without a
+# page of their own have no URL and are searched for instead.
+SOURCES = {
+    'book': _load_resources('books.Book'),
+    'video': _load_resources('videos.Video'),
+    'category': _load_groups('core.Category'),
+    'tag': _load_groups('core.Tag'),
+    'author': _load_authors,
+}
+
+
+def _keys(label):
+    """
+    Returns the index keys of a label, one starting at each word so
+    that any word of a title can be typed first
+    """
+    words = normalize(label).split()
+    return [' '.join(words[i:]) for i in range(len(words))]
+
+
+class TypeaheadIndex:
+    """
+    Answers prefix queries from a sorted list held in memory.
+
+    The list holds a ``(key, kind, pk)`` tuple for every word of every
+    suggestion, so a query is a binary search followed by a scan of
+    the matching keys. It is built from the database on first use.
+
+    Model signals publish each change under an increasing version in
+    the shared cache. Before answering, the index compares its version
+    with the shared one and replays the changes it missed, or rebuilds
+    when they are no longer available. Up to date, a query costs one
+    cache read and no database queries.
+
+    Every ``max_age`` seconds the index is rebuilt whatever the
+    version, in case changes were published while the cache was
+    unreachable or lost.
+
+    Args:
+        max_age (int, optional): Seconds between forced rebuilds
+    """
+    def __init__(self, max_age=REBUILD_INTERVAL):
+        self.max_age = max_age
+        self.version = None
+        # when the index was last built from the database
+        self.built = None
+        # the sorted keys and the entries by (kind, pk), swapped
+        # together so that readers never see them half updated
+        self.state = ([], {})
+        self.lock = threading.Lock()
+
+    def build(self):
+        keys, entries = [], {}
+        for kind, load in SOURCES.items():
+            for pk, (label, url) in load().items():
+                entries[(kind, pk)] = (label, url)
+                keys += [(key, kind, pk) for key in _keys(label)]
+        keys.sort()
+        return keys, entries
+
+    def apply(self, changes):
+        keys, entries = list(self.state[0]), dict(self.state[1])
+        for kind, changed in changes:
+            for pk, entry in changed.items():
+                old = entries.pop((kind, pk), None)
+                if old is not None:
+                    for key in _keys(old[0]):
+                        i = bisect.bisect_left(keys, (key, kind, pk))
+                        if i < len(keys) and keys[i] == (key, kind, pk):
+                            del keys[i]
+                if entry is not None:
+                    entries[(kind, pk)] = entry
+                    for key in _keys(entry[0]):
+                        bisect.insort(keys, (key, kind, pk))
+        return keys, entries
+
+    def expired(self):
+        return self.built is not None and \
+            time.monotonic() - self.built >= self.max_age
+
+    def refresh(self):
+        """Brings the index up to date with the shared version"""
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            # a time based start keeps a lost counter from restarting
+            # at a version some process already has
+            cache.add(VERSION_KEY, int(time.time() * 1000), None)
+            version = cache.get(VERSION_KEY)
+        if version == self.version and not self.expired():
+            return
+
+        with self.lock:
+            expired = self.expired()
+            if version == self.version and not expired:
+                return
+            changes = None
+            if self.version is not None and not expired and \
+                0 < version - self.version <= MAX_CHANGES:
+                keys = [CHANGE_KEY.format(number)
+                    for number in range(self.version + 1, version + 1)]
+                found = cache.get_many(keys)
+                if len(found) == len(keys):
+                    changes = [found[key] for key in keys]
+            if changes is None:
+                self.state = self.build()
+                self.built = time.monotonic()
+            else:
+                self.state = self.apply(changes)
+            self.version = version
+
+    def suggest(self, query, limit=10):
+        """Returns the suggestions starting with what was typed
+
+        Args:
+            query (str): The text typed so far
+            limit (int, optional): The maximum number of suggestions
+
+        Returns:
+            list: Dicts holding the kind, label and URL (or None) of
+                each suggestion
+        """
+        self.refresh()
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        keys, entries = self.state
+        results, seen = [], set()
+        i = bisect.bisect_left(keys, (prefix,))
+        while i < len(keys) and len(results) < limit:
+            key, kind, pk = keys[i]
+            if not key.startswith(prefix):
+                break
+            if (kind, pk) not in seen:
+                seen.add((kind, pk))
+                label, url = entries[(kind, pk)]
+                results.append({'kind': kind, 'label': label, 'url': url})
+            i += 1
+        return results
+
+
+index = TypeaheadIndex()
+
+
+def suggest(query, limit=10):
+    """Returns suggestions from this process's typeahead index"""
+    return index.suggest(query, limit)
+
+
+def record_changes(kind, pks):
+    """Publishes the current entries of some objects to every process
+
+    Objects that no longer exist, or are no longer suggested, are
+    published as removed.
+
+    Args:
+        kind (str): A key of `SOURCES`
+        pks (iterable): Primary keys of the changed objects
+    """
+    pks = set(pks)
+    if not pks:
+        return
+    entries = SOURCES[kind](pks)
+    try:
+        version = cache.incr(VERSION_KEY)
+    except ValueError:
+        # the counter was lost, so every process will rebuild
+        return
+    cache.set(CHANGE_KEY.format(version),
+        (kind, {pk: entries.get(pk) for pk in pks}), CHANGELOG_TIMEOUT)
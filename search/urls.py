@@ -0,0 +1,10 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path('', views.SearchView.as_view(), name='search'),
+    path('cron/related/', views.compute_related_cron,
+        name='related_cron'),
+    path('cron/warm/', views.warm_cache_cron, name='search_warm_cron'),
+]
@@ -0,0 +1,88 @@
+from io import StringIO
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.management import call_command
+from django.http import Http404, HttpResponse
+from django.views.generic import TemplateView
+
+from core.decorators import app_engine_cron
+
+from . import cache, fuzzy
+
+
+class SearchView(LoginRequiredMixin, TemplateView):
+    """
+    Creates the search results page for books and videos.
+
+    Results are cached, and searches on the first page are counted so
+    that the popular queries can be warmed in the cache.
+
+    When nothing matches a query exactly, the titles and tags that
+    look most like it are shown instead, to catch misspellings.
+    """
+    template_name = 'search/search.html'
+    paginate_by = 10
+    resource_types = ('book', 'video')
+
+    def get_page_number(self):
+        try:
+            number = int(self.request.GET.get('page', 1))
+        except ValueError:
+            raise Http404('That page number is not an integer')
+        if number < 1:
+            raise Http404('That page number is less than 1')
+        return number
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '').strip()
+        resource_type = self.request.GET.get('type')
+        if resource_type not in self.resource_types:
+            resource_type = None
+        number = self.get_page_number()
+
+        # fetch one extra result to find out if there is another page
+        results = cache.search(query, resource_type,
+            limit=self.paginate_by + 1,
+            offset=(number - 1) * self.paginate_by)
+        if number == 1:
+            cache.counter.add(query, resource_type)
+        context.update({
+            'query': query,
+            'resource_type': resource_type,
+            'results': results[:self.paginate_by],
+            'page_number': number,
+            'has_next': len(results) > self.paginate_by,
+            'fuzzy': False,
+        })
+        if query and number == 1 and not results:
+            context.update({
+                'results': fuzzy.search(query, resource_type,
+                    limit=self.paginate_by),
+                'similar_tags': fuzzy.tags(query),
+                'fuzzy': True,
+            })
+        return context
+
+
+@app_engine_cron
+def compute_related_cron(request):
+    """
+    Computes the related resources of the books and videos whose tags
+    changed, requested by App Engine cron (see cron.yaml)
+    """
+    out = StringIO()
+    call_command('compute_related', stdout=out, stderr=out)
+    return HttpResponse(out.getvalue(), content_type='text/plain')
+
+
+@app_engine_cron
+def warm_cache_cron(request):
+    """
+    Warms the cache with the popular searches once a deploy or a
+    catalogue change made it stale, requested by App Engine cron (see
+    cron.yaml)
+    """
+    out = StringIO()
+    call_command('warm_search_cache', '--if-stale', stdout=out, stderr=out)
+    return HttpResponse(out.getvalue(), content_type='text/plain')
@@ -0,0 +1,40 @@
+// Suggests titles, categories, tags and authors in the navbar search
+// box as the member types. Picking a book or video opens it; any other
+// suggestion is searched for.
+(function () {
+  var input = document.getElementById('navbar-search');
+  if (!input) {
+    return;
+  }
+  var list = document.getElementById(input.getAttribute('list'));
+  var urls = {};
+  var timer = null;
+
+  function show(results) {
+    list.innerHTML = '';
+    urls = {};
+    results.forEach(function (result) {
+      var option = document.createElement('option');
+      option.value = result.label;
+      option.label = result.kind;
+      list.appendChild(option);
+      if (result.url) {
+        urls[result.label] = result.url;
+      }
+    });
+  }
+
+  input.addEventListener('input', function () {
+    if (urls[input.value]) {
+      window.location = urls[input.value];
+      return;
+    }
+    clearTimeout(timer);
+    timer = setTimeout(function () {
+      var url = input.dataset.suggestUrl + '?q=' + encodeURIComponent(input.value);
+      fetch(url, {credentials: 'same-origin'})
+        .then(function (response) { return response.json(); })
+        .then(function (data) { show(data.results || []); });
+    }, 100);
+  });
+})();
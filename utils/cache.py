@@ -0,0 +1,129 @@
+import threading
+import time
+import uuid
+
+from django.core.cache import cache
+
+
+def get_version(name):
+    """Returns the current version token of a named resource
+
+    Tokens are random rather than sequential so that a version lost
+    to cache eviction is never reused.
+
+    Args:
+        name (str): The name of the versioned resource
+
+    Returns:
+        str: The version token
+    """
+    key = 'version:{}'.format(name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(name):
+    """Replaces the version token of a named resource
+
+    Args:
+        name (str): The name of the versioned resource
+
+    Returns:
+        str: The new version token
+    """
+    version = uuid.uuid4().hex
+    cache.set('version:{}'.format(name), version, timeout=None)
+    return version
+
+
+class HitCounter:
+    """Counts the hits and misses of a cache layer
+
+    The counts are kept in the shared cache so that they add up
+    across processes. Each process buffers its counts and adds them
+    to the shared cache at most every ``flush_interval`` seconds, so
+    that counting costs no cache write on most lookups. Every counter
+    created is registered so that the statistics can be reported in
+    one place.
+
+    Args:
+        name (str): A unique name for the cache layer
+        flush_interval (float, optional): Seconds counts are buffered
+    """
+    registry = {}
+
+    def __init__(self, name, flush_interval=10):
+        self.name = name
+        self.keys = ('stats:{}:hits'.format(name),
+            'stats:{}:misses'.format(name))
+        self.flush_interval = flush_interval
+        # hits and misses not yet added to the shared cache
+        self.pending = [0, 0]
+        self.flushed = time.monotonic()
+        self.lock = threading.Lock()
+        HitCounter.registry[name] = self
+
+    def _incr(self, key, delta):
+        if delta and not cache.add(key, delta, timeout=None):
+            try:
+                cache.incr(key, delta)
+            except ValueError:
+                # the key expired between add() and incr()
+                cache.set(key, delta, timeout=None)
+
+    def _count(self, index, count):
+        if not count:
+            return
+        with self.lock:
+            self.pending[index] += count
+            due = time.monotonic() - self.flushed >= self.flush_interval
+        if due:
+            self.flush()
+
+    def hit(self, count=1):
+        self._count(0, count)
+
+    def miss(self, count=1):
+        self._count(1, count)
+
+    def flush(self):
+        """Adds the buffered counts of this process to the shared cache"""
+        with self.lock:
+            pending, self.pending = self.pending, [0, 0]
+            self.flushed = time.monotonic()
+        for key, delta in zip(self.keys, pending):
+            self._incr(key, delta)
+
+    def stats(self):
+        """Returns the hits, misses and hit ratio of the cache layer
+
+        Counts buffered by other processes are left out until they
+        are flushed.
+
+        Returns:
+            dict: The hits, misses and ratio (None before any lookup)
+        """
+        self.flush()
+        counts = cache.get_many(self.keys)
+        hits = counts.get(self.keys[0], 0)
+        misses = counts.get(self.keys[1], 0)
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'ratio': hits / lookups if lookups else None,
+        }
+
+    def reset(self):
+        with self.lock:
+            self.pending = [0, 0]
+        cache.delete_many(self.keys)
+
+    @classmethod
+    def all_stats(cls):
+        """Returns the statistics of every registered cache layer"""
+        return {name: counter.stats()
+            for name, counter in sorted(cls.registry.items())}
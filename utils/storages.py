@@ -1,4 +1,211 @@
+import hashlib
+import os
+import pathlib
+import posixpath
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.utils import validate_file_name
 from storages.backends.gcloud import GoogleCloudStorage
+from storages.utils import clean_name
+
+from .cache import HitCounter
+
+signed_url_stats = HitCounter('signed_urls')
+
+metadata_stats = HitCounter('storage_metadata')
+
+# The metadata of a file only changes when it is saved or deleted,
+# which updates the cache, so entries only expire to bound staleness
+# after changes made outside the storage class
+METADATA_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+class SignedURLCache:
+    """Remembers signed URLs until shortly before they expire
+
+    URLs are kept in a least recently used dict in front of the shared
+    cache, so that most are found without a network round trip and
+    the rest are signed once for every process.
+
+    Args:
+        prefix (str): The prefix of the keys in the shared cache
+        max_size (int, optional): The number of URLs kept in memory
+    """
+    def __init__(self, prefix, max_size=2048):
+        self.prefix = prefix
+        self.max_size = max_size
+        # URL and expiry time keyed by file name
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def key(self, name):
+        return '{}:{}'.format(self.prefix,
+            hashlib.md5(name.encode()).hexdigest())
+
+    def _remember(self, name, url, expires):
+        with self.lock:
+            self.entries[name] = (url, expires)
+            self.entries.move_to_end(name)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def get_many(self, names, margin):
+        """Returns the cached URLs of some files
+
+        Args:
+            names (list): The names of the files
+            margin (float): Seconds before their expiry after which
+                URLs are no longer returned
+
+        Returns:
+            dict: The URLs still valid for the margin keyed by name
+        """
+        deadline = time.time() + margin
+        urls = {}
+        with self.lock:
+            for name in names:
+                entry = self.entries.get(name)
+                if entry is not None and entry[1] > deadline:
+                    self.entries.move_to_end(name)
+                    urls[name] = entry[0]
+        keys = {self.key(name): name for name in names if name not in urls}
+        for key, (url, expires) in cache.get_many(keys).items():
+            if expires > deadline:
+                urls[keys[key]] = url
+                self._remember(keys[key], url, expires)
+        return urls
+
+    def set_many(self, urls, expires, margin):
+        """Caches the URLs of some files
+
+        Args:
+            urls (dict): The URLs keyed by file name
+            expires (float): When the URLs expire, as a timestamp
+            margin (float): Seconds before expiry the URLs are dropped
+        """
+        for name, url in urls.items():
+            self._remember(name, url, expires)
+        timeout = int(expires - margin - time.time())
+        if timeout > 0:
+            cache.set_many({self.key(name): (url, expires)
+                for name, url in urls.items()}, timeout)
+
+
+class CachedMetadataMixin:
+    """Caches the metadata lookups of a storage
+
+    ``exists``, ``size``, ``get_modified_time`` and ``url`` each cost
+    a network round trip on remote storages. Their results are kept in
+    the shared cache for ``metadata_timeout`` seconds, and saving or
+    deleting a file through the storage updates them right away. Names
+    found free are looked up again every time, so that a file saved
+    meanwhile is never overwritten.
+
+    Storages that don't overwrite files get a random suffix on names
+    already taken, rather than probing for a free name in a loop.
+    """
+    metadata_timeout = METADATA_CACHE_TIMEOUT
+
+    def metadata_key(self, kind, name):
+        """Returns the cache key of some metadata of a file"""
+        return 'storage:{}:{}:{}'.format(type(self).__name__, kind,
+            hashlib.md5('{}/{}'.format(getattr(self, 'location', ''),
+                clean_name(name)).encode()).hexdigest())
+
+    def _cached(self, kind, name, lookup, timeout=None):
+        key = self.metadata_key(kind, name)
+        value = cache.get(key)
+        if value is not None:
+            metadata_stats.hit()
+            return value
+        metadata_stats.miss()
+        value = lookup(name)
+        cache.set(key, value,
+            self.metadata_timeout if timeout is None else timeout)
+        return value
+
+    def exists(self, name):
+        # only files known to exist are cached, as another instance may
+        # save a file under a name this one found free
+        key = self.metadata_key('exists', name)
+        if cache.get(key):
+            metadata_stats.hit()
+            return True
+        metadata_stats.miss()
+        exists = super().exists(name)
+        if exists:
+            cache.set(key, True, self.metadata_timeout)
+        return exists
+
+    def size(self, name):
+        return self._cached('size', name, super().size)
+
+    def get_modified_time(self, name):
+        return self._cached('modified', name, super().get_modified_time)
+
+    def url(self, name, *args, **kwargs):
+        if args or kwargs:
+            return super().url(name, *args, **kwargs)
+        # signed URLs must not be cached past their expiry
+        return self._cached('url', name, super().url,
+            getattr(self, 'url_max_age', None))
+
+    def forget(self, name):
+        """Drops the cached metadata of a file"""
+        cache.delete_many([self.metadata_key(kind, name)
+            for kind in ('exists', 'size', 'modified', 'url')])
+
+    def _save(self, name, content):
+        name = super()._save(name, content)
+        self.forget(name)
+        metadata = {self.metadata_key('exists', name): True}
+        size = getattr(content, 'size', None)
+        if size is not None:
+            metadata[self.metadata_key('size', name)] = size
+        cache.set_many(metadata, self.metadata_timeout)
+        return name
+
+    def delete(self, name):
+        super().delete(name)
+        self.forget(name)
+
+    def get_available_name(self, name, max_length=None):
+        if getattr(self, 'file_overwrite', False):
+            return super().get_available_name(name, max_length)
+        name = clean_name(name)
+        directory, filename = posixpath.split(name)
+        if '..' in pathlib.PurePosixPath(directory).parts:
+            raise SuspiciousFileOperation(
+                "Detected path traversal attempt in '{}'".format(directory))
+        validate_file_name(filename)
+        if (max_length is None or len(name) <= max_length) and \
+            not self.exists(name):
+            return name
+        # a random suffix rarely collides, so one lookup of the new
+        # name guards against it instead of probing a sequence
+        root, extension = os.path.splitext(filename)
+        while True:
+            suffix = '_' + secrets.token_hex(6)
+            if max_length is not None:
+                excess = len(posixpath.join(directory,
+                    root + suffix + extension)) - max_length
+                if excess > 0:
+                    root = root[:-excess]
+                    if not root:
+                        raise SuspiciousFileOperation(
+                            'Storage can not find an available filename '
+                            'for "{}". Please make sure that the '
+                            'corresponding file field allows sufficient '
+                            '"max_length".'.format(name))
+            candidate = posixpath.join(directory, root + suffix + extension)
+            if not self.exists(candidate):
+                return candidate
 
 
 class StaticRootGoogleCloudStorage(GoogleCloudStorage):
@@ -6,6 +213,89 @@ class StaticRootGoogleCloudStorage(GoogleCloudStorage):
     default_acl = "publicRead"
 
 
-class MediaRootGoogleCloudStorage(GoogleCloudStorage):
+class MediaRootGoogleCloudStorage(CachedMetadataMixin, GoogleCloudStorage):
+    """
+    Stores uploaded files in the media folder of the bucket, caching
+    their metadata.
+
+    Unless the bucket is public, URLs are signed with GS_EXPIRATION
+    lifetimes and reused from a SignedURLCache until
+    ``signed_url_margin`` before they expire, since signing is CPU
+    heavy RSA work. Every URL returned is thus valid for at least the
+    margin, which pages caching URLs must not outlive.
+    """
     location = "media"
     file_overwrite = False
+    signed_url_margin = timedelta(hours=1)
+    url_cache = SignedURLCache('signed-url')
+
+    @property
+    def signs_urls(self):
+        return self.querystring_auth and self.default_acl != 'publicRead'
+
+    @property
+    def url_max_age(self):
+        """
+        Seconds every URL returned now stays valid, or None if URLs
+        don't expire
+        """
+        if not self.signs_urls:
+            return None
+        return int(self.signed_url_margin.total_seconds())
+
+    def url(self, name, parameters=None):
+        if parameters:
+            return super().url(name, parameters)
+        if not self.signs_urls:
+            return super().url(name)
+        return self.urls([name])[name]
+
+    def urls(self, names):
+        """Returns the URLs of many files, only signing those not cached
+
+        Args:
+            names (iterable): The names of the files
+
+        Returns:
+            dict: The URLs keyed by file name
+        """
+        names = list(dict.fromkeys(names))
+        if not self.signs_urls:
+            return {name: GoogleCloudStorage.url(self, name)
+                for name in names}
+        margin = self.signed_url_margin.total_seconds()
+        urls = self.url_cache.get_many(names, margin)
+        missing = [name for name in names if name not in urls]
+        signed_url_stats.hit(len(urls))
+        signed_url_stats.miss(len(missing))
+        if missing:
+            expires = time.time() + self.expiration.total_seconds()
+            signed = {name: GoogleCloudStorage.url(self, name)
+                for name in missing}
+            self.url_cache.set_many(signed, expires, margin)
+            urls.update(signed)
+        return urls
+
+    def signed_url(self, name, expiration, filename=None, inline=False):
+        """Returns a URL to a file that stops working after a while
+
+        Args:
+            name (str): The name of the file
+            expiration (int): Seconds the URL stays valid
+            filename (str, optional): The name the file is downloaded
+                as
+            inline (bool, optional): Whether the browser may display
+                the file rather than save it
+
+        Returns:
+            str: The signed URL
+        """
+        blob = self.bucket.blob(self._normalize_name(clean_name(name)))
+        params = {
+            'expiration': timedelta(seconds=expiration),
+            'version': 'v4',
+        }
+        if filename:
+            params['response_disposition'] = '{}; filename="{}"'.format(
+                'inline' if inline else 'attachment', filename)
+        return blob.generate_signed_url(**params)
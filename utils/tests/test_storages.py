@@ -0,0 +1,210 @@
+from datetime import timedelta
+from unittest import mock
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.test import SimpleTestCase
+from google.oauth2 import service_account
+
+import utils.test
+from utils.storages import (CachedMetadataMixin, MediaRootGoogleCloudStorage,
+    SignedURLCache, metadata_stats, signed_url_stats)
+
+
+def make_credentials():
+    """Returns service account credentials signing URLs offline"""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return service_account.Credentials.from_service_account_info({
+        'type': 'service_account',
+        'client_email': 'media@waves.iam.gserviceaccount.com',
+        'private_key': key.private_bytes(serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()).decode(),
+        'token_uri': 'https://oauth2.googleapis.com/token',
+    })
+
+
+class SignedURLsTestCase(SimpleTestCase):
+    """
+    Tests for reusing the signed URLs of media files
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.credentials = make_credentials()
+
+    def setUp(self):
+        cache.clear()
+        signed_url_stats.reset()
+        self.storage = self.make_storage()
+
+    def make_storage(self, **kwargs):
+        storage = MediaRootGoogleCloudStorage(bucket_name='waves',
+            project_id='waves', credentials=self.credentials, **kwargs)
+        storage.url_cache = SignedURLCache('test-signed-url')
+        return storage
+
+    def test_urls_signed(self):
+        """
+        Test that URLs of private files are signed
+        """
+        url = self.storage.url('book_covers/guide.jpg')
+        self.assertTrue(url.startswith(
+            'https://storage.googleapis.com/waves/media/book_covers/'
+            'guide.jpg?X-Goog-Algorithm=GOOG4-RSA-SHA256'))
+        self.assertEqual(self.storage.url_max_age, 60 * 60)
+
+    def test_download_urls_name_the_file(self):
+        """
+        Test that download URLs keep the file name, displaying the file
+        only when asked
+        """
+        url = self.storage.signed_url('books/guide.pdf', 300,
+            filename='guide.pdf', inline=True)
+        self.assertIn('response-content-disposition=inline%3B%20'
+            'filename%3D%22guide.pdf%22', url)
+        url = self.storage.signed_url('books/guide.pdf', 300,
+            filename='guide.pdf')
+        self.assertIn('response-content-disposition=attachment%3B', url)
+
+    def test_urls_reused(self):
+        """
+        Test that URLs are signed once, for every process
+        """
+        urls = self.storage.urls(['a.jpg', 'b.jpg', 'a.jpg'])
+        self.assertEqual(list(urls), ['a.jpg', 'b.jpg'])
+        with mock.patch('storages.backends.gcloud.Blob.generate_signed_url'
+            ) as sign:
+            self.assertEqual(self.storage.urls(['a.jpg', 'b.jpg']), urls)
+            # another process shares the signed URLs through the cache
+            other = self.make_storage()
+            self.assertEqual(other.url('a.jpg'), urls['a.jpg'])
+        sign.assert_not_called()
+        self.assertEqual(signed_url_stats.stats(),
+            {'hits': 3, 'misses': 2, 'ratio': 0.6})
+
+    def test_urls_signed_again_before_expiry(self):
+        """
+        Test that URLs are no longer reused within the margin before
+        they expire
+        """
+        storage = self.make_storage(expiration=timedelta(minutes=90))
+        url = storage.url('a.jpg')
+        expires = storage.url_cache.entries['a.jpg'][1]
+        with mock.patch('utils.storages.time.time',
+            return_value=expires - 61 * 60):
+            self.assertEqual(storage.url('a.jpg'), url)
+        self.assertEqual(signed_url_stats.stats()['misses'], 1)
+        with mock.patch('utils.storages.time.time',
+            return_value=expires - 59 * 60):
+            storage.url('a.jpg')
+        self.assertEqual(signed_url_stats.stats()['misses'], 2)
+
+    def test_least_recently_used_dropped(self):
+        """
+        Test that the URLs kept in memory are bounded
+        """
+        self.storage.url_cache.max_size = 2
+        self.storage.urls(['a.jpg', 'b.jpg'])
+        self.storage.url('a.jpg')
+        self.storage.url('c.jpg')
+        self.assertEqual(list(self.storage.url_cache.entries),
+            ['a.jpg', 'c.jpg'])
+
+    def test_public_bucket(self):
+        """
+        Test that URLs of public files are neither signed nor cached
+        """
+        storage = self.make_storage(default_acl='publicRead')
+        self.assertEqual(storage.urls(['a.jpg']), {
+            'a.jpg': 'https://storage.googleapis.com/waves/media/a.jpg'})
+        self.assertIsNone(storage.url_max_age)
+        self.assertEqual(storage.url_cache.entries, {})
+
+
+class CachedFileSystemStorage(CachedMetadataMixin, FileSystemStorage):
+    """A local storage caching its metadata"""
+
+
+class CachedMetadataTestCase(SimpleTestCase):
+    """
+    Tests for caching the metadata of stored files
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        utils.test.set_up_test_files()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        utils.test.tear_down_test_files()
+
+    def setUp(self):
+        cache.clear()
+        metadata_stats.reset()
+        self.storage = CachedFileSystemStorage()
+
+    def test_metadata_cached(self):
+        """
+        Test that metadata is looked up in the storage once
+        """
+        name = self.storage.save('cached/guide.txt', ContentFile(b'guide'))
+        metadata_stats.reset()
+        with mock.patch.object(FileSystemStorage, 'exists',
+            return_value=False) as exists, \
+            mock.patch.object(FileSystemStorage, 'size') as size:
+            self.assertTrue(self.storage.exists(name))
+            self.assertEqual(self.storage.size(name), 5)
+            self.assertFalse(self.storage.exists('cached/missing.txt'))
+            self.assertFalse(self.storage.exists('cached/missing.txt'))
+        size.assert_not_called()
+        # missing files may be saved by another process at any time
+        self.assertEqual(exists.call_count, 2)
+        modified = self.storage.get_modified_time(name)
+        self.assertEqual(self.storage.get_modified_time(name), modified)
+        self.assertEqual(self.storage.url(name), '/media/cached/guide.txt')
+        stats = metadata_stats.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (3, 4))
+
+    def test_delete_invalidates(self):
+        """
+        Test that deleting a file updates its cached metadata
+        """
+        name = self.storage.save('cached/old.txt', ContentFile(b'old'))
+        self.assertEqual(self.storage.size(name), 3)
+        self.storage.delete(name)
+        self.assertFalse(self.storage.exists(name))
+        self.storage.save(name, ContentFile(b'newer'))
+        self.assertEqual(self.storage.size(name), 5)
+
+    def test_available_name_without_probing(self):
+        """
+        Test that taken names get a random suffix after one lookup
+        """
+        name = self.storage.save('cached/taken.txt', ContentFile(b'1'))
+        self.assertEqual(self.storage.get_available_name(
+            'cached/free.txt'), 'cached/free.txt')
+        with mock.patch.object(FileSystemStorage, 'exists',
+            return_value=False) as exists:
+            other = self.storage.save(name, ContentFile(b'2'))
+        exists.assert_called_once_with(other)
+        self.assertRegex(other, r'^cached/taken_[0-9a-f]{12}\.txt$')
+        self.assertEqual(len(self.storage.get_available_name(name,
+            max_length=25)), 25)
+
+    def test_names_saved_elsewhere_not_overwritten(self):
+        """
+        Test that a name found free is checked again before it is
+        used, in case another process saved a file under it
+        """
+        self.assertFalse(self.storage.exists('cached/shared.txt'))
+        # saved by a process whose cache updates this one doesn't see
+        FileSystemStorage().save('cached/shared.txt', ContentFile(b'1'))
+        name = self.storage.save('cached/shared.txt', ContentFile(b'2'))
+        self.assertNotEqual(name, 'cached/shared.txt')
+        with self.storage.open('cached/shared.txt') as file:
+            self.assertEqual(file.read(), b'1')
@@ -0,0 +1,56 @@
+import hashlib
+
+from django.core.files.uploadhandler import StopFutureHandlers
+from django.test import SimpleTestCase
+
+from utils.uploads import (HashingMemoryFileUploadHandler,
+    HashingTemporaryFileUploadHandler)
+
+CONTENT = b'%PDF-1.4 a small book' * 100
+
+
+class HashingUploadHandlersTestCase(SimpleTestCase):
+    """
+    Tests for hashing uploads as they are received
+    """
+    def receive(self, handler, content, chunk_size=256):
+        try:
+            handler.new_file('file_upload', 'guide.pdf', 'application/pdf',
+                len(content))
+        except StopFutureHandlers:
+            # raised by the handler that keeps the upload
+            pass
+        for start in range(0, len(content), chunk_size):
+            handler.receive_data_chunk(content[start:start + chunk_size],
+                start)
+        return handler.file_complete(len(content))
+
+    def test_memory_upload_hashed(self):
+        """
+        Test that uploads kept in memory carry their checksum
+        """
+        handler = HashingMemoryFileUploadHandler()
+        handler.handle_raw_input(None, {}, len(CONTENT), None)
+        file = self.receive(handler, CONTENT)
+        self.assertEqual(file.sha256, hashlib.sha256(CONTENT).hexdigest())
+        self.assertEqual(file.read(), CONTENT)
+
+    def test_temporary_upload_hashed(self):
+        """
+        Test that uploads streamed to disk carry their checksum
+        """
+        file = self.receive(HashingTemporaryFileUploadHandler(), CONTENT)
+        self.assertEqual(file.sha256, hashlib.sha256(CONTENT).hexdigest())
+        file.close()
+
+    def test_large_upload_passed_on(self):
+        """
+        Test that the memory handler neither keeps nor hashes uploads
+        too big for it
+        """
+        handler = HashingMemoryFileUploadHandler()
+        with self.settings(FILE_UPLOAD_MAX_MEMORY_SIZE=10):
+            handler.handle_raw_input(None, {}, len(CONTENT), None)
+        self.assertIsNone(self.receive(handler, CONTENT))
+        self.assertEqual(handler.checksum.hexdigest(),
+            hashlib.sha256().hexdigest())
@@ -0,0 +1,38 @@
+import hashlib
+
+from django.core.files.uploadhandler import (MemoryFileUploadHandler,
+    TemporaryFileUploadHandler)
+
+
+class HashingUploadMixin:
+    """Computes the SHA-256 checksum of uploads as their chunks arrive
+
+    The checksum is set as the ``sha256`` attribute of the uploaded
+    file, so that it never has to be read again to be hashed.
+    """
+    def new_file(self, *args, **kwargs):
+        # set first, as the memory handler raises StopFutureHandlers
+        self.checksum = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        # the memory handler passes on uploads too big for it
+        if getattr(self, 'activated', True):
+            self.checksum.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.sha256 = self.checksum.hexdigest()
+        return file
+
+
+class HashingMemoryFileUploadHandler(HashingUploadMixin,
+    MemoryFileUploadHandler):
+    """Keeps small uploads in memory, hashing them"""
+
+
+class HashingTemporaryFileUploadHandler(HashingUploadMixin,
+    TemporaryFileUploadHandler):
+    """Streams large uploads to a temporary file, hashing them"""
@@ -0,0 +1,43 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from videos.models import Video
+
+
+class Command(BaseCommand):
+    help = ('Stores the backend, video ID, thumbnail URL and embed URL '
+        'of videos saved before they were computed on save.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+            help='Recompute the fields of every video')
+        parser.add_argument('--workers', type=int, default=8,
+            help='Number of videos looked up concurrently')
+        parser.add_argument('--batch-size', type=int, default=100,
+            help='Number of videos updated per query')
+
+    def handle(self, *args, **options):
+        videos = Video.objects.only('pk', 'url').order_by('pk')
+        if not options['all']:
+            videos = videos.filter(Q(embed_url='') | Q(thumbnail_url=''))
+        fields = ['backend', 'video_id', 'thumbnail_url', 'embed_url']
+        updated = 0
+        last_pk = 0
+
+        # thumbnail lookups may be network bound so they run in threads
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            while True:
+                batch = list(
+                    videos.filter(pk__gt=last_pk)[:options['batch_size']])
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+
+                list(pool.map(Video.update_embed_fields, batch))
+                Video.objects.bulk_update(batch, fields)
+                updated += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            'Updated {} videos'.format(updated)))
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0002_resource_posted_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='backend',
+            field=models.CharField(blank=True, editable=False, max_length=30),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='embed_url',
+            field=models.URLField(blank=True, editable=False, verbose_name='embed URL'),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='thumbnail_url',
+            field=models.URLField(blank=True, editable=False, verbose_name='thumbnail URL'),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='video_id',
+            field=models.CharField(blank=True, editable=False, max_length=50, verbose_name='video ID'),
+        ),
+    ]
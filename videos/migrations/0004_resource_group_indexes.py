@@ -0,0 +1,36 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:28
+
+from django.db import migrations, models
+
+# The through table's unique index is led by video_id, so filtering by
+# tag used the single-column tag_id index and then read every row for
+# its video_id. Leading with tag_id and covering video_id makes the filter
+# an index range scan that joins to the videos by primary key.
+TAG_INDEX = models.Index(fields=['tag', 'video'],
+    name='videos_video_tags_tag_idx')
+
+
+def add_tag_index(apps, schema_editor):
+    through = apps.get_model('videos', 'Video').tags.through
+    schema_editor.add_index(through, TAG_INDEX)
+
+
+def remove_tag_index(apps, schema_editor):
+    through = apps.get_model('videos', 'Video').tags.through
+    schema_editor.remove_index(through, TAG_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0003_video_embed_fields'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['category', 'date_posted', 'id'], name='videos_video_cat_posted_idx'),
+        ),
+        # auto-created through tables can't declare Meta.indexes
+        migrations.RunPython(add_tag_index, remove_tag_index),
+    ]
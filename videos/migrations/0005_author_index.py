@@ -0,0 +1,30 @@
+from django.db import migrations, models
+
+# The through table's unique index is led by video_id, so listing an
+# author's videos used the single-column user_id index and then read
+# every row for its video_id. Leading with user_id and covering video_id
+# makes it an index range scan, like the tag index.
+AUTHOR_INDEX = models.Index(fields=['user', 'video'],
+    name='videos_video_authors_user_idx')
+
+
+def add_author_index(apps, schema_editor):
+    through = apps.get_model('videos', 'Video').authors.through
+    schema_editor.add_index(through, AUTHOR_INDEX)
+
+
+def remove_author_index(apps, schema_editor):
+    through = apps.get_model('videos', 'Video').authors.through
+    schema_editor.remove_index(through, AUTHOR_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0004_resource_group_indexes'),
+    ]
+
+    operations = [
+        # auto-created through tables can't declare Meta.indexes
+        migrations.RunPython(add_author_index, remove_author_index),
+    ]
@@ -1,5 +1,7 @@
+import requests
 from django.db import models
 from django.urls import reverse
+from embed_video.backends import EmbedVideoException, detect_backend
 
 from core.models import Resource
 
@@ -9,6 +11,47 @@ class Video(Resource):
     Model for videos
     """
     url = models.URLField('URL', help_text='Enter the video URL here')
+    backend = models.CharField(max_length=30, blank=True, editable=False)
+    video_id = models.CharField('video ID', max_length=50, blank=True,
+        editable=False)
+    thumbnail_url = models.URLField('thumbnail URL', blank=True,
+        editable=False)
+    embed_url = models.URLField('embed URL', blank=True, editable=False)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember the URL the embed fields were computed from
+        instance._saved_url = instance.__dict__.get('url')
+        return instance
+
+    def save(self, *args, **kwargs):
+        if self.url != getattr(self, '_saved_url', None) or \
+            not self.embed_url:
+            self.update_embed_fields()
+        super().save(*args, **kwargs)
+        self._saved_url = self.url
+
+    def update_embed_fields(self):
+        """
+        Parses the video URL once and stores the backend, video ID,
+        thumbnail URL and embed URL so that templates don't have to
+        """
+        try:
+            backend = detect_backend(self.url)
+            self.backend = backend.backend
+            self.video_id = backend.code
+            self.embed_url = backend.url
+        except EmbedVideoException:
+            self.backend = self.video_id = self.embed_url = ''
+            self.thumbnail_url = ''
+            return
+
+        # some backends look the thumbnail up over the network
+        try:
+            self.thumbnail_url = backend.thumbnail or ''
+        except (EmbedVideoException, requests.RequestException):
+            self.thumbnail_url = ''
 
     def get_absolute_url(self):
         return reverse('video', kwargs={'slug': self.slug})
@@ -1,4 +1,7 @@
+from io import StringIO
+
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
 from django.utils import timezone
 
@@ -184,3 +187,58 @@ class VideoModelTestCase(ResourceModelsTestCase):
         self.assertEqual(last_edit__meta.verbose_name, 'last edit')
         self.assertEqual(last_edit__meta.null, False)
         self.assertEqual(last_edit__meta.blank, True)
+
+
+class VideoEmbedFieldsTestCase(ResourceModelsTestCase):
+    """
+    Tests for the embed fields computed when a Video is saved
+    """
+    def test_embed_fields_computed_on_save(self):
+        """
+        Test that saving a video stores its backend, ID, thumbnail
+        and embed URLs
+        """
+        self.assertEqual(self.video.backend, 'YoutubeBackend')
+        self.assertEqual(self.video.video_id, 'rAKLiE658m0')
+        self.assertEqual(self.video.thumbnail_url,
+            'https://img.youtube.com/vi/rAKLiE658m0/hqdefault.jpg')
+        self.assertEqual(self.video.embed_url,
+            'https://www.youtube.com/embed/rAKLiE658m0?wmode=opaque')
+
+    def test_embed_fields_follow_url_changes(self):
+        """
+        Test that changing the URL recomputes the embed fields
+        """
+        video = Video.objects.get(pk=self.video.pk)
+        video.url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+        video.save()
+        video.refresh_from_db()
+        self.assertEqual(video.video_id, 'dQw4w9WgXcQ')
+        self.assertEqual(video.embed_url,
+            'https://www.youtube.com/embed/dQw4w9WgXcQ?wmode=opaque')
+
+    def test_unknown_backend(self):
+        """
+        Test that URLs of unsupported sites leave the embed
+        fields empty
+        """
+        self.video.url = 'https://example.com/video'
+        self.video.save()
+        self.assertEqual(self.video.backend, '')
+        self.assertEqual(self.video.embed_url, '')
+
+    def test_backfill_video_embeds_command(self):
+        """
+        Test that the backfill command computes the embed fields of
+        existing videos
+        """
+        Video.objects.update(backend='', video_id='', thumbnail_url='',
+            embed_url='')
+        out = StringIO()
+        call_command('backfill_video_embeds', stdout=out)
+        self.assertIn('Updated 1 videos', out.getvalue())
+
+        self.video.refresh_from_db()
+        self.assertEqual(self.video.video_id, 'rAKLiE658m0')
+        self.assertEqual(self.video.embed_url,
+            'https://www.youtube.com/embed/rAKLiE658m0?wmode=opaque')
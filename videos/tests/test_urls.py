@@ -23,3 +23,16 @@ class VideoURLsTestCase(TestCase):
             kwargs={'slug': 'the-gift'}))
         self.assertEqual(video_details.func.__name__,
             'VideoDetailView')
+
+    def test_video_group_list_urls(self):
+        """
+        Test that the URLs for videos in a category or with a tag
+        resolve to the video list view
+        """
+        category_list = resolve(reverse('videos_category',
+            kwargs={'category': 'spiritual'}))
+        self.assertEqual(category_list.func.__name__, 'VideoListView')
+        self.assertEqual(category_list.kwargs, {'category': 'spiritual'})
+        tag_list = resolve(reverse('videos_tag', kwargs={'tag': 'faith'}))
+        self.assertEqual(tag_list.func.__name__, 'VideoListView')
+        self.assertEqual(tag_list.kwargs, {'tag': 'faith'})
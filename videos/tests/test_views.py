@@ -2,6 +2,7 @@ from shutil import copy, rmtree
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import RequestFactory, TestCase, tag
 
 from core.models import Category, Tag
@@ -163,6 +164,38 @@ class VideoListViewTestCase(VideoViewsTestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTrue(len(response.context['video_list']) == 2)
 
+    def test_video_list_query_count_is_constant(self):
+        """
+        Test that the video list view loads categories, tags and
+        authors eagerly so every page costs the same number of
+        queries regardless of how many videos it shows
+        """
+        self.client.login(email = 'christine@kyalo.com',
+            password = 'christinepassword'
+        )
+        cache.clear()
+        # session, user, edit times, count, videos, tags, authors, facet
+        # counts and profile picture variants
+        with self.assertNumQueries(9):
+            response = self.client.get('/videos/')
+            self.assertTrue(len(response.context['video_list']) == 9)
+        # the count, facet counts and profile picture variants are
+        # shared through the cache
+        with self.assertNumQueries(6):
+            response = self.client.get('/videos/'+'?page=2')
+            self.assertTrue(len(response.context['video_list']) == 2)
+
+    def test_video_cards_use_stored_thumbnails(self):
+        """
+        Test that the video cards render the stored thumbnail URLs
+        """
+        self.client.login(email = 'christine@kyalo.com',
+            password = 'christinepassword'
+        )
+        response = self.client.get('/videos/')
+        self.assertContains(response,
+            'src="https://img.youtube.com/vi/rAKLiE658m0/hqdefault.jpg"')
+
 
 class VideoDetailViewTestCase(VideoViewsTestCase):
     """
@@ -189,3 +222,15 @@ class VideoDetailViewTestCase(VideoViewsTestCase):
         response = self.client.get('/videos/the-gift/')
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed('core/resource_list.html')
+
+    def test_video_detail_not_modified(self):
+        """
+        Test that revisiting an unchanged video page returns a 304
+        """
+        self.client.login(email = 'christine@kyalo.com',
+            password = 'christinepassword'
+        )
+        response = self.client.get('/videos/the-gift/')
+        revisit = self.client.get('/videos/the-gift/',
+            HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revisit.status_code, 304)
@@ -4,5 +4,9 @@ from . import views
 
 urlpatterns = [
     path('', views.VideoListView.as_view(), name='videos'),
+    path('category/<slug:category>/', views.VideoListView.as_view(),
+        name='videos_category'),
+    path('tag/<slug:tag>/', views.VideoListView.as_view(),
+        name='videos_tag'),
     path('<slug:slug>/', views.VideoDetailView.as_view(), name='video')
 ]
\ No newline at end of file
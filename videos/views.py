@@ -1,24 +1,22 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import DetailView, ListView
 
+from core.views import ResourceDetailMixin, ResourceListMixin
+
 from .models import Video
 
 
-class VideoListView(LoginRequiredMixin, ListView):
+class VideoListView(LoginRequiredMixin, ResourceListMixin, ListView):
     """
     Creates the video list page
     """
     model = Video
-    template_name = 'core/resource_list.html'
     paginate_by = 9
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['resources'] = 'videos'
-        return context
+    resources = 'videos'
+    count_strategy = 'estimate'
 
 
-class VideoDetailView(LoginRequiredMixin, DetailView):
+class VideoDetailView(LoginRequiredMixin, ResourceDetailMixin, DetailView):
     """
     Creates the video detail pages
     """